@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+"""Measures the client-side cost of streaming a large file out of a
+``PFSFile``, i.e. what ``Client.get_file()`` returns, with the gRPC stream
+replaced by pre-built messages.
+
+Each read pattern runs in its own process so that the reported peak RSS is
+its own. No cluster is required. Example::
+
+    python benchmarks/bench_download.py --size-mb 2048
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+from google.protobuf import wrappers_pb2
+
+from python_pachyderm import PFSFile
+
+READ_SIZE = 1024 * 1024
+MODES = ("copyfileobj", "readinto", "read1", "read_all")
+
+
+def messages(size: int, message_size: int):
+    payload = os.urandom(message_size)
+    for _ in range(size // message_size):
+        yield wrappers_pb2.BytesValue(value=payload)
+
+
+def run(mode: str, size: int, message_size: int) -> dict:
+    file = PFSFile(messages(size, message_size))
+    received = 0
+    start = time.perf_counter()
+    with open(os.devnull, "wb") as sink:
+        if mode == "copyfileobj":
+            shutil.copyfileobj(file, sink, READ_SIZE)
+            received = size
+        elif mode == "readinto":
+            buffer = memoryview(bytearray(READ_SIZE))
+            while True:
+                n = file.readinto(buffer)
+                if not n:
+                    break
+                sink.write(buffer[:n])
+                received += n
+        elif mode == "read1":
+            while True:
+                chunk = file.read1()
+                if not chunk:
+                    break
+                sink.write(chunk)
+                received += len(chunk)
+        else:
+            received = len(file.read())
+    elapsed = time.perf_counter() - start
+
+    return {
+        "bytes": received,
+        "seconds": elapsed,
+        "GB/s": received / elapsed / 1024**3,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument(
+        "--message-mb",
+        type=int,
+        default=19,
+        help="payload size of each GetFile message (pachd sends up to ~19MB)",
+    )
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    size = args.size_mb * 1024**2
+    message_size = args.message_mb * 1024**2
+
+    if args.mode is not None:
+        result = run(args.mode, size, message_size)
+        print(
+            "{:<12} {:>8.2f} GB/s {:>8.3f} s {:>8.0f} MB max RSS".format(
+                args.mode, result["GB/s"], result["seconds"], result["max_rss_mb"]
+            )
+        )
+        return
+
+    for mode in MODES:
+        subprocess.run(
+            [sys.executable, __file__, "--mode", mode]
+            + ["--size-mb", str(args.size_mb), "--message-mb", str(args.message_mb)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
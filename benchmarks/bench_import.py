@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""Measures how long it takes to import python_pachyderm, and to import and
+construct a ``Client``, each in a fresh interpreter using ``-X importtime``.
+
+No cluster is required. Example::
+
+    python benchmarks/bench_import.py --runs 10 --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = {
+    "import": "import python_pachyderm",
+    "client": "from python_pachyderm import Client; Client('localhost', 30650)",
+}
+
+
+def importtime(statement: str) -> dict:
+    """Runs `statement` in a fresh interpreter, and returns the self time of
+    each imported module in microseconds, plus the total under ``"total"``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    times = {"total": 0}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us)
+        times["total"] += int(self_us)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=10, help="list the N slowest modules to import"
+    )
+    args = parser.parse_args()
+
+    for name, statement in STATEMENTS.items():
+        runs = [importtime(statement) for _ in range(args.runs)]
+        total = statistics.median(run["total"] for run in runs) / 1000
+        print("{:<8} {:>8.1f} ms  ({})".format(name, total, statement))
+
+    slowest = sorted(runs[-1].items(), key=lambda item: -item[1])[1 : args.top + 1]
+    print("\nslowest modules for {!r}:".format(name))
+    for module, self_us in slowest:
+        print("  {:>8.1f} ms  {}".format(self_us / 1000, module))
+
+
+if __name__ == "__main__":
+    main()
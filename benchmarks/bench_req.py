@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""Measures the per-call overhead of ``Client._req`` and of the equivalent
+mixin method, against an in-process gRPC server that answers immediately.
+
+No cluster is required. Example::
+
+    python benchmarks/bench_req.py --calls 20000
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+from google.protobuf import empty_pb2
+
+from python_pachyderm import Client
+from python_pachyderm.service import Service
+from python_pachyderm.proto.v2.version.versionpb import version_pb2, version_pb2_grpc
+
+
+class VersionServicer(version_pb2_grpc.APIServicer):
+    def GetVersion(self, request, context):
+        return version_pb2.Version(major=2)
+
+
+def timed(fn, calls: int) -> float:
+    """Returns the mean time per call, in microseconds."""
+    fn()  # warm up: connect and resolve stubs
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    server = grpc.server(ThreadPoolExecutor(max_workers=4))
+    version_pb2_grpc.add_APIServicer_to_server(VersionServicer(), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    try:
+        client = Client("localhost", port, auth_token="token")
+        empty = empty_pb2.Empty()
+        cases = {
+            "mixin": client.get_remote_version,
+            "_req": lambda: client._req(Service.VERSION, "GetVersion", req=empty),
+        }
+        for name, fn in cases.items():
+            print("{:<8} {:>8.1f} us/call".format(name, timed(fn, args.calls)))
+        client.close()
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
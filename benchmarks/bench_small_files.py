@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Measures the client-side cost of uploading many small files, i.e. building
+and serializing the ModifyFile requests for them, with
+``ModifyFileClient.put_file_from_bytes()`` (one operation per file, each
+deleting the file before writing it) and with the small-file fast path
+``ModifyFileClient.append_files_from_bytes()``.
+
+No cluster is required. Example::
+
+    python benchmarks/bench_small_files.py --count 1000000 --size 1024
+"""
+
+import argparse
+import os
+import resource
+import time
+
+from python_pachyderm import ModifyFileClient
+
+
+def per_file(mfc: ModifyFileClient, files) -> None:
+    for path, data in files:
+        mfc.put_file_from_bytes(path, data)
+
+
+def new_files(mfc: ModifyFileClient, files) -> None:
+    mfc.append_files_from_bytes(files)
+
+
+def run(enqueue, count: int, size: int) -> dict:
+    data = os.urandom(size)
+    files = ((f"/small/file-{i:08d}", data) for i in range(count))
+    mfc = ModifyFileClient(("bench", "master"))
+
+    messages = 0
+    sent = 0
+    start = time.perf_counter()
+    enqueue(mfc, files)
+    for req in mfc._reqs():
+        sent += len(req.SerializeToString())
+        messages += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": messages,
+        "bytes": sent,
+        "seconds": elapsed,
+        "files/s": count / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--size", type=int, default=1024, help="bytes per file")
+    args = parser.parse_args()
+
+    for name, enqueue in (("per_file", per_file), ("new_files", new_files)):
+        result = run(enqueue, args.count, args.size)
+        print(
+            "{:<10} {:>10} msgs {:>8.2f} msgs/file {:>10.0f} files/s {:>8.1f} s".format(
+                name,
+                result["messages"],
+                result["messages"] / args.count,
+                result["files/s"],
+                result["seconds"],
+            )
+        )
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS: {rss:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+"""Measures the client-side cost of turning local files into ModifyFile
+requests, i.e. reading, chunking and serializing the ``AddFile`` messages that
+``ModifyFileClient.put_file_from_filepath()`` sends to pachd.
+
+No cluster is required. Example::
+
+    python benchmarks/bench_upload.py --size-mb 256
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from python_pachyderm import ModifyFileClient
+
+
+def make_text_corpus(path: str, size: int) -> None:
+    """Writes ~80 byte lines of printable text."""
+    rng = random.Random(0)
+    line = bytes(rng.randrange(32, 127) for _ in range(79)) + b"\n"
+    with open(path, "wb") as f:
+        for _ in range(size // len(line)):
+            f.write(line)
+
+
+def make_binary_corpus(path: str, size: int) -> None:
+    """Writes random bytes, 1/16 of which are newlines (0x0A)."""
+    block = bytearray(os.urandom(1024 * 1024))
+    for i in range(0, len(block), 16):
+        block[i] = 0x0A
+    with open(path, "wb") as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+
+
+def run(local_path: str) -> dict:
+    mfc = ModifyFileClient(("bench", "master"))
+    mfc.put_file_from_filepath("/bench.dat", local_path)
+
+    messages = 0
+    sent = 0
+    start = time.perf_counter()
+    for req in mfc._reqs():
+        sent += len(req.SerializeToString())
+        messages += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": messages,
+        "bytes": sent,
+        "seconds": elapsed,
+        "MB/s": sent / elapsed / 1024**2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=128)
+    args = parser.parse_args()
+    size = args.size_mb * 1024**2
+
+    with tempfile.TemporaryDirectory() as d:
+        for name, make_corpus in (
+            ("text", make_text_corpus),
+            ("binary", make_binary_corpus),
+        ):
+            path = os.path.join(d, name)
+            make_corpus(path, size)
+            result = run(path)
+            print(
+                "{:<8} {:>10} msgs {:>10.1f} MB/s {:>8.3f} s".format(
+                    name, result["messages"], result["MB/s"], result["seconds"]
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
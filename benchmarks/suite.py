@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+
+"""Runs the client hot-path benchmarks against an in-process fake pachd
+(``python_pachyderm.testing.FakePachd``) and reports throughput, p50/p99
+latency and peak RSS for each.
+
+Each benchmark runs in its own process so that its peak RSS is its own.
+Results can be stored as JSON and compared against an earlier run, e.g. of
+another version. No cluster is required. Examples::
+
+    python benchmarks/suite.py --output results/7.6.0.json
+    python benchmarks/suite.py --compare results/7.6.0.json
+    python benchmarks/suite.py --only walk_file list_file --scale 0.01
+
+``--scale`` multiplies the size of every benchmark; at 1.0 the listing
+benchmarks walk 1M entries.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+import python_pachyderm
+from python_pachyderm.cache import FileCache
+from python_pachyderm.pfs import Commit, commit_from
+from python_pachyderm.testing import FakePachd
+
+KB = 1024
+MB = 1024 * KB
+# A benchmark counts as a regression if it is this much slower than before.
+REGRESSION_THRESHOLD = 0.10
+
+
+class Recorder:
+    """Records the latency of each operation of a benchmark."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.items = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def record(self, seconds: float, items: int = 1, size: int = 0) -> None:
+        """Records one operation that took `seconds`. The latency of an
+        operation over several `items` (e.g. files, or entries of a listing)
+        is recorded per item.
+        """
+        self.latencies.append(seconds / items)
+        self.items += items
+        self.bytes += size
+        self.seconds += seconds
+
+    @contextmanager
+    def op(self, items: int = 1, size: int = 0):
+        """Times the operation in the ``with`` block."""
+        start = time.perf_counter()
+        yield
+        self.record(time.perf_counter() - start, items, size)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "items": self.items,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "items_per_second": self.items / self.seconds,
+            "mb_per_second": self.bytes / self.seconds / MB,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+
+
+def bench_put_file_bytes(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """put_file_bytes of 1MB files into an open commit."""
+    client = pachd.client()
+    client.create_repo("bench")
+    data = os.urandom(MB)
+    with client.commit("bench", "master") as commit:
+        for i in range(max(int(200 * scale), 10)):
+            with r.op(size=len(data)):
+                client.put_file_bytes(commit, f"/file-{i}", data)
+
+
+def bench_put_files(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """put_files of a directory of 64KB files, with 4 streams."""
+    client = pachd.client()
+    client.create_repo("bench")
+    count = max(int(1000 * scale), 10)
+    with tempfile.TemporaryDirectory() as d:
+        for i in range(count):
+            with open(os.path.join(d, f"file-{i}"), "wb") as f:
+                f.write(os.urandom(64 * KB))
+        for _ in range(3):
+            with client.commit("bench", "master") as commit:
+                with r.op(items=count, size=count * 64 * KB):
+                    python_pachyderm.put_files(client, d, commit, "/", parallelism=4)
+
+
+def bench_modify_file_small(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """One ModifyFileClient writing 10k 1KB files."""
+    client = pachd.client()
+    client.create_repo("bench")
+    count = max(int(10_000 * scale), 100)
+    data = os.urandom(KB)
+    for _ in range(3):
+        with r.op(items=count, size=count * len(data)):
+            with client.modify_file_client(("bench", "master")) as mfc:
+                for i in range(count):
+                    mfc.put_file_from_bytes(f"/small/file-{i}", data)
+
+
+def bench_modify_file_streaming(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """As modify_file_small, but streaming with a 16MB buffer."""
+    client = pachd.client()
+    client.create_repo("bench")
+    count = max(int(10_000 * scale), 100)
+    data = os.urandom(KB)
+    for _ in range(3):
+        with r.op(items=count, size=count * len(data)):
+            with client.modify_file_client(
+                ("bench", "master"), streaming=True, max_buffer_bytes=16 * MB
+            ) as mfc:
+                for i in range(count):
+                    mfc.put_file_from_bytes(f"/small/file-{i}", data)
+
+
+def bench_append_files(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """As modify_file_small, with append_files_from_bytes."""
+    client = pachd.client()
+    client.create_repo("bench")
+    count = max(int(10_000 * scale), 100)
+    data = os.urandom(KB)
+    for n in range(3):
+        files = [(f"/small-{n}/file-{i}", data) for i in range(count)]
+        with r.op(items=count, size=count * len(data)):
+            with client.modify_file_client(("bench", "master")) as mfc:
+                mfc.append_files_from_bytes(files)
+
+
+def _get_file(read_size: int) -> Callable:
+    def bench(pachd: FakePachd, scale: float, r: Recorder) -> None:
+        size = max(int(256 * MB * scale), 4 * MB)
+        commit = pachd.pfs.add_files("bench", "master", [("/big", os.urandom(size))])
+        client = pachd.client()
+        for _ in range(3):
+            with client.get_file(commit, "/big") as file:
+                while True:
+                    start = time.perf_counter()
+                    chunk = file.read(read_size)
+                    if not chunk:
+                        break
+                    r.record(time.perf_counter() - start, size=len(chunk))
+
+    bench.__doc__ = f"PFSFile.read({read_size}) of a 256MB file."
+    return bench
+
+
+def bench_get_file_cached(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """get_file(...).read() of 1MB files, served from a warm FileCache."""
+    count = max(int(200 * scale), 10)
+    data = os.urandom(MB)
+    files = [(f"/file-{i}", data) for i in range(count)]
+    commit = pachd.pfs.add_files("bench", "master", files)
+    with tempfile.TemporaryDirectory() as d:
+        client = pachd.client(file_cache=FileCache(d, max_bytes=2 * count * MB))
+        for path, _ in files:
+            client.get_file(commit, path).read()
+        for _ in range(3):
+            for path, _ in files:
+                with r.op(size=len(data)):
+                    client.get_file(commit, path).read()
+
+
+def _populate_flat(pachd: FakePachd, scale: float):
+    count = max(int(1_000_000 * scale), 1000)
+    files = ((f"/flat/file-{i:08d}", b"") for i in range(count))
+    return pachd.pfs.add_files("bench", "master", files), count
+
+
+def bench_walk_file(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """walk_file over a directory of 1M files."""
+    commit, count = _populate_flat(pachd, scale)
+    client = pachd.client()
+    for _ in range(3):
+        with r.op(items=count + 1):
+            for _ in client.walk_file(commit, "/flat"):
+                pass
+
+
+def bench_list_file(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """list_file over a directory of 1M files."""
+    commit, count = _populate_flat(pachd, scale)
+    client = pachd.client()
+    for _ in range(3):
+        with r.op(items=count):
+            for _ in client.list_file(commit, "/flat"):
+                pass
+
+
+def bench_commit_from(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """commit_from of tuples, dicts and Commits. No server involved."""
+    commits = [
+        ("foo", "master"),
+        ("foo", "467c580611234cdb8cc9758c7aa96087"),
+        {"repo": "foo", "branch": "master"},
+        Commit(repo="foo", branch="master"),
+    ]
+    batch = 1000
+    for _ in range(max(int(100 * scale), 10)):
+        with r.op(items=batch * len(commits)):
+            for _ in range(batch):
+                for commit in commits:
+                    commit_from(commit)
+
+
+def bench_commit_churn(pachd: FakePachd, scale: float, r: Recorder) -> None:
+    """start_commit followed by finish_commit."""
+    client = pachd.client()
+    client.create_repo("bench")
+    for _ in range(max(int(2000 * scale), 100)):
+        with r.op():
+            commit = client.start_commit("bench", "master")
+            client.finish_commit(commit)
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "put_file_bytes": bench_put_file_bytes,
+    "put_files": bench_put_files,
+    "modify_file_small": bench_modify_file_small,
+    "modify_file_streaming": bench_modify_file_streaming,
+    "append_files": bench_append_files,
+    "get_file_read_4k": _get_file(4 * KB),
+    "get_file_read_64k": _get_file(64 * KB),
+    "get_file_read_1m": _get_file(MB),
+    "get_file_read_all": _get_file(-1),
+    "get_file_cached": bench_get_file_cached,
+    "walk_file": bench_walk_file,
+    "list_file": bench_list_file,
+    "commit_from": bench_commit_from,
+    "commit_churn": bench_commit_churn,
+}
+
+
+def run_one(name: str, scale: float) -> dict:
+    recorder = Recorder()
+    with FakePachd() as pachd:
+        BENCHMARKS[name](pachd, scale, recorder)
+    return recorder.summary()
+
+
+def compare(results: dict, baseline: dict) -> bool:
+    """Prints how `results` compare to `baseline`, and returns whether any
+    benchmark regressed.
+    """
+    regressed = False
+    print(
+        "\nversus {} ({}):".format(
+            baseline["python_pachyderm"], baseline.get("timestamp", "?")
+        )
+    )
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = before["items_per_second"] / result["items_per_second"] - 1
+        flag = ""
+        if change > REGRESSION_THRESHOLD:
+            flag, regressed = "  REGRESSION", True
+        print("  {:<20} {:>+7.1%} time per item{}".format(name, change, flag))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, metavar="NAME")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--compare", help="a JSON results file to compare against")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        json.dump(run_one(args.run, args.scale), sys.stdout)
+        return
+
+    results = {
+        "python_pachyderm": python_pachyderm.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": args.scale,
+        "results": {},
+    }
+    print(
+        "{:<20} {:>12} {:>10} {:>10} {:>10} {:>10}".format(
+            "benchmark", "items/s", "MB/s", "p50 ms", "p99 ms", "RSS MB"
+        )
+    )
+    for name in args.only or BENCHMARKS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--run", name, "--scale", str(args.scale)],
+            check=True,
+            stdout=subprocess.PIPE,
+        ).stdout
+        result = results["results"][name] = json.loads(out)
+        print(
+            "{:<20} {:>12.1f} {:>10.1f} {:>10.3f} {:>10.3f} {:>10.0f}".format(
+                name,
+                result["items_per_second"],
+                result["mb_per_second"],
+                result["p50_ms"],
+                result["p99_ms"],
+                result["max_rss_mb"],
+            )
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f)):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
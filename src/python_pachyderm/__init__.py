@@ -5,15 +5,39 @@ from google.protobuf.internal.enum_type_wrapper import (
     EnumTypeWrapper as _EnumTypeWrapper,
 )
 
-from .mixin.pfs import PFSFile, ModifyFileClient
-from .client import Client, ConfigError, BadClusterDeploymentID
-from .datum_batching import batch_all_datums
-from .util import (
-    put_files,
-    parse_json_pipeline_spec,
-    parse_dict_pipeline_spec,
-)
-from grpc import RpcError
+# The public names are imported on first access (PEP 562), so that importing
+# python_pachyderm does not pay for gRPC and the generated protobuf modules
+# until they are used.
+_LAZY_ATTRIBUTES = {
+    "Client": ".client",
+    "ConfigError": ".client",
+    "BadClusterDeploymentID": ".client",
+    "ChannelOptions": ".service",
+    "PFSFile": ".mixin.pfs",
+    "ModifyFileClient": ".mixin.pfs",
+    "FileSetRenewer": ".mixin.pfs",
+    "batch_all_datums": ".datum_batching",
+    "put_files": ".util",
+    "get_files": ".util",
+    "sync_dir": ".util",
+    "parse_json_pipeline_spec": ".util",
+    "parse_dict_pipeline_spec": ".util",
+    "RpcError": "grpc",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 # Python version compatibility.
 try:
@@ -28,10 +52,14 @@ __pdoc__ = {"proto": False}
 
 __all__ = [
     "Client",
+    "ChannelOptions",
     "RpcError",
     "put_files",
+    "get_files",
+    "sync_dir",
     "PFSFile",
     "ModifyFileClient",
+    "FileSetRenewer",
     "parse_json_pipeline_spec",
     "parse_dict_pipeline_spec",
     "ConfigError",
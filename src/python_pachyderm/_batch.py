@@ -0,0 +1,39 @@
+"""
+Pipelined unary calls. Issuing many independent unary calls one after the
+other costs a round trip each; keeping several in flight at once on the
+same channel (and so the same HTTP/2 connection) costs about one round trip
+per `concurrency` calls instead.
+"""
+from collections import deque
+from typing import Deque, Iterable, List
+
+import grpc
+
+# The default number of calls the batch helpers keep in flight.
+DEFAULT_CONCURRENCY = 32
+
+
+def call_many(
+    method: grpc.UnaryUnaryMultiCallable, requests: Iterable, concurrency: int
+) -> List:
+    """Calls the unary `method` once per request, with up to `concurrency`
+    calls in flight, and returns the responses in the order of `requests`.
+    If a call fails, the calls still in flight are cancelled and its error is
+    raised.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    responses = []
+    in_flight: Deque[grpc.Future] = deque()
+    try:
+        for request in requests:
+            if len(in_flight) >= concurrency:
+                responses.append(in_flight.popleft().result())
+            in_flight.append(method.future(request))
+        while in_flight:
+            responses.append(in_flight.popleft().result())
+    except BaseException:
+        for future in in_flight:
+            future.cancel()
+        raise
+    return responses
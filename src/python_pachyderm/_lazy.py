@@ -0,0 +1,62 @@
+"""
+Deferred imports. The generated protobuf modules make up most of the time
+it takes to import python_pachyderm, so the modules for each service are only
+imported once that service is used.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """A stand-in for a module that is imported the first time one of its
+    attributes is accessed.
+    """
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def _load(self) -> types.ModuleType:
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return module
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Returns the module `name` if it is already imported, otherwise a
+    :class:`.LazyModule` for it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+class lazy_stub:
+    """A class attribute that creates a gRPC stub on the instance's
+    ``_channel`` the first time it is accessed, and caches it on the
+    instance.
+
+    Examples
+    --------
+    >>> class VersionMixin:
+    >>>     __stub = lazy_stub(version_pb2_grpc, "APIStub")
+    """
+
+    def __init__(self, grpc_module: types.ModuleType, stub_name: str):
+        self.grpc_module = grpc_module
+        self.stub_name = stub_name
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        stub = getattr(self.grpc_module, self.stub_name)(instance._channel)
+        instance.__dict__[self.name] = stub
+        return stub
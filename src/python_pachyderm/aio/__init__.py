@@ -0,0 +1,14 @@
+"""
+An asyncio client for Pachyderm, built on ``grpc.aio``.
+
+>>> from python_pachyderm.aio import AsyncClient
+>>> async with AsyncClient() as client:
+>>>     await client.create_repo("foo")
+"""
+from .client import AsyncClient
+from .mixin.pfs import AsyncPFSFile
+
+__all__ = [
+    "AsyncClient",
+    "AsyncPFSFile",
+]
@@ -0,0 +1,326 @@
+import json
+import os
+import ssl
+from typing import Optional, TextIO
+
+import grpc
+
+from python_pachyderm.client import BadClusterDeploymentID, Client, ConfigError
+from python_pachyderm.errors import AuthServiceNotActivated
+from python_pachyderm.interceptor import AsyncMetadataClientInterceptor, MetadataType
+from python_pachyderm.service import ChannelOptions
+from .mixin.admin import AsyncAdminMixin
+from .mixin.auth import AsyncAuthMixin
+from .mixin.debug import AsyncDebugMixin
+from .mixin.enterprise import AsyncEnterpriseMixin
+from .mixin.health import AsyncHealthMixin
+from .mixin.identity import AsyncIdentityMixin
+from .mixin.license import AsyncLicenseMixin
+from .mixin.pfs import AsyncPFSMixin
+from .mixin.pps import AsyncPPSMixin
+from .mixin.transaction import AsyncTransactionMixin
+from .mixin.version import AsyncVersionMixin
+
+
+class AsyncClient(
+    AsyncAdminMixin,
+    AsyncAuthMixin,
+    AsyncDebugMixin,
+    AsyncEnterpriseMixin,
+    AsyncHealthMixin,
+    AsyncIdentityMixin,
+    AsyncLicenseMixin,
+    AsyncPFSMixin,
+    AsyncPPSMixin,
+    AsyncTransactionMixin,
+    AsyncVersionMixin,
+    object,
+):
+    """An asyncio counterpart of :class:`.Client`, built on ``grpc.aio``.
+    Initialize an instance with ``python_pachyderm.aio.AsyncClient()``.
+
+    Unary methods are coroutines and streaming methods return async
+    iterators, so many requests can be in flight over the one channel
+    without a thread per request. The worker API is not available.
+
+    The client must be created and used from within a running event loop,
+    and should be closed when no longer needed.
+
+    Examples
+    --------
+    >>> async with python_pachyderm.aio.AsyncClient() as client:
+    >>>     infos = await asyncio.gather(
+    >>>         *(client.inspect_repo(name) for name in ("foo", "bar"))
+    >>>     )
+    """
+
+    def __init__(
+        self,
+        host: str = None,
+        port: int = None,
+        auth_token: str = None,
+        root_certs: bytes = None,
+        transaction_id: str = None,
+        tls: bool = None,
+        use_default_host: bool = True,
+        channel_options: ChannelOptions = None,
+    ):
+        """
+        Creates an async Pachyderm client. Arguments and config file lookup
+        are the same as for :class:`.Client`.
+
+        Parameters
+        ----------
+        host : str, optional
+            The pachd host. Default is 'localhost', which is used with
+            ``pachctl port-forward``.
+        port : int, optional
+            The port to connect to. Default is 30650.
+        auth_token : str, optional
+            The authentication token. Used if authentication is enabled on the
+            cluster.
+        root_certs : bytes, optional
+            The PEM-encoded root certificates as byte string.
+        transaction_id : str, optional
+            The ID of the transaction to run operations on.
+        tls : bool, optional
+            Whether TLS should be used. If `root_certs` are specified, they are
+            used. Otherwise, we use the certs provided by certifi.
+        use_default_host : bool, optional
+            Whether to replicate `pachctl` behavior of searching for config.
+        channel_options : ChannelOptions, optional
+            Settings for the gRPC channel. ``streaming_compression`` is not
+            supported by ``grpc.aio``, and is ignored.
+        """
+
+        if root_certs is not None:
+            if not isinstance(root_certs, bytes):
+                raise TypeError(
+                    f"expected root_certs as bytes, found: {type(root_certs)}"
+                )
+            if not root_certs.startswith(ssl.PEM_HEADER.encode()):
+                raise ValueError(
+                    "root_certs must be in PEM format -- PEM header not found."
+                )
+
+        if host is None and port is None and use_default_host:
+            config = Client._check_for_config()
+
+            if config is not None:
+                (
+                    host,
+                    port,
+                    _,
+                    auth_token,
+                    root_certs,
+                    transaction_id,
+                    tls,
+                ) = Client._parse_config(config)
+
+        host = host or "localhost"
+        port = port or 30650
+
+        if auth_token is None:
+            auth_token = os.environ.get("PACH_PYTHON_AUTH_TOKEN")
+
+        if tls is None:
+            tls = root_certs is not None
+        if tls and root_certs is None:
+            import certifi
+
+            with open(certifi.where(), "rb") as f:
+                root_certs = f.read()
+
+        self.address = "{}:{}".format(host, port)
+        self.root_certs = root_certs
+        self._auth_token = auth_token
+        self._transaction_id = transaction_id
+        self._metadata = self._build_metadata()
+        self.channel_options = channel_options or ChannelOptions()
+        # The interceptor reads self._metadata on every call, so changing the
+        # auth token or transaction does not require a new channel.
+        self._channel = _create_channel(
+            self.address,
+            self.root_certs,
+            options=self.channel_options.to_grpc_options(),
+            compression=self.channel_options.compression,
+            interceptors=[AsyncMetadataClientInterceptor(lambda: self._metadata)],
+        )
+        super().__init__()  # Initialize all the Mixin classes.
+
+    @classmethod
+    def new_in_cluster(
+        cls,
+        auth_token: str = None,
+        transaction_id: str = None,
+        channel_options: ChannelOptions = None,
+    ) -> "AsyncClient":
+        """Creates an async Pachyderm client that operates within a Pachyderm
+        cluster. See :meth:`.Client.new_in_cluster`.
+        """
+        if (
+            "PACHD_PEER_SERVICE_HOST" in os.environ
+            and "PACHD_PEER_SERVICE_PORT" in os.environ
+        ):
+            host = os.environ["PACHD_PEER_SERVICE_HOST"]
+            port = int(os.environ["PACHD_PEER_SERVICE_PORT"])
+        else:
+            host = os.environ["PACHD_SERVICE_HOST"]
+            port = int(os.environ["PACHD_SERVICE_PORT"])
+
+        return cls(
+            host=host,
+            port=port,
+            auth_token=auth_token,
+            transaction_id=transaction_id,
+            use_default_host=False,
+            channel_options=channel_options,
+        )
+
+    @classmethod
+    def new_from_pachd_address(
+        cls,
+        pachd_address: str,
+        auth_token: str = None,
+        root_certs: bytes = None,
+        transaction_id: str = None,
+        channel_options: ChannelOptions = None,
+    ) -> "AsyncClient":
+        """Creates an async Pachyderm client from a given pachd address.
+        See :meth:`.Client.new_from_pachd_address`.
+        """
+        u = Client._parse_address(pachd_address)
+
+        return cls(
+            host=u.hostname,
+            port=u.port,
+            auth_token=auth_token,
+            root_certs=root_certs,
+            transaction_id=transaction_id,
+            tls=u.scheme == "grpcs" or u.scheme == "https",
+            use_default_host=False,
+            channel_options=channel_options,
+        )
+
+    @classmethod
+    async def new_from_config(
+        cls, config_file: TextIO, channel_options: ChannelOptions = None
+    ) -> "AsyncClient":
+        """Creates an async Pachyderm client from a config file-like object.
+        This is a coroutine, as the cluster deployment ID (if set in the
+        config) is checked against the cluster.
+        See :meth:`.Client.new_from_config`.
+        """
+        if config_file is None:
+            raise ConfigError("no config object provided")
+
+        config = json.load(config_file)
+        (
+            _,
+            _,
+            pachd_address,
+            auth_token,
+            root_certs,
+            transaction_id,
+            _,
+        ) = Client._parse_config(config)
+
+        client = cls.new_from_pachd_address(
+            pachd_address,
+            auth_token=auth_token,
+            root_certs=root_certs,
+            transaction_id=transaction_id,
+            channel_options=channel_options,
+        )
+
+        context = Client._get_active_context(config)
+        expected_deployment_id = context.get("cluster_deployment_id")
+        if expected_deployment_id:
+            cluster_info = await client.inspect_cluster()
+            if cluster_info.deployment_id != expected_deployment_id:
+                await client.close()
+                raise BadClusterDeploymentID(
+                    expected_deployment_id, cluster_info.deployment_id
+                )
+
+        return client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, val, tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the underlying channel, cancelling any in-flight calls."""
+        await self._channel.close()
+
+    @property
+    def auth_token(self):
+        return self._auth_token
+
+    @auth_token.setter
+    def auth_token(self, value):
+        self._auth_token = value
+        self._metadata = self._build_metadata()
+
+    @property
+    def transaction_id(self):
+        return self._transaction_id
+
+    @transaction_id.setter
+    def transaction_id(self, value):
+        self._transaction_id = value
+        self._metadata = self._build_metadata()
+
+    def _build_metadata(self):
+        metadata = []
+        if self._auth_token is not None:
+            metadata.append(("authn-token", self._auth_token))
+        if self._transaction_id is not None:
+            metadata.append(("pach-transaction", self._transaction_id))
+        return metadata
+
+    async def delete_all(self) -> None:
+        """Delete all repos, commits, files, pipelines, and jobs. This resets
+        the cluster to its initial state.
+        """
+        try:
+            await self.delete_all_identity()
+        except AuthServiceNotActivated:
+            pass
+
+        try:
+            await self.deactivate_auth()
+        except AuthServiceNotActivated:
+            pass
+
+        try:
+            await self.delete_all_license()
+        except AuthServiceNotActivated:
+            pass
+
+        await self.delete_all_pipelines()
+        await self.delete_all_repos()
+        await self.delete_all_transactions()
+
+
+def _create_channel(
+    address: str,
+    root_certs: Optional[bytes],
+    options: MetadataType,
+    compression: Optional[grpc.Compression] = None,
+    interceptors=None,
+) -> grpc.aio.Channel:
+    if root_certs is not None:
+        ssl = grpc.ssl_channel_credentials(root_certificates=root_certs)
+        return grpc.aio.secure_channel(
+            address,
+            ssl,
+            options=options,
+            compression=compression,
+            interceptors=interceptors,
+        )
+    return grpc.aio.insecure_channel(
+        address, options=options, compression=compression, interceptors=interceptors
+    )
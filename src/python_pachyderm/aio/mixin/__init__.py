@@ -0,0 +1,6 @@
+"""
+Exposes an async mixin for each pachyderm service. Like the mixins in
+``python_pachyderm.mixin``, these should not be used directly; instead, use
+``python_pachyderm.aio.AsyncClient()``. Each method is the async counterpart
+of the method with the same name on ``python_pachyderm.Client``.
+"""
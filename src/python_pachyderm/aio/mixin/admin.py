@@ -0,0 +1,19 @@
+import grpc
+from google.protobuf import empty_pb2
+
+from python_pachyderm.proto.v2.admin import admin_pb2, admin_pb2_grpc
+
+
+class AsyncAdminMixin:
+    """An async mixin for admin-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = admin_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def inspect_cluster(self) -> admin_pb2.ClusterInfo:
+        """Inspects a cluster. See :meth:`.AdminMixin.inspect_cluster`."""
+        message = empty_pb2.Empty()
+        return await self.__stub.InspectCluster(message)
@@ -0,0 +1,159 @@
+from typing import Dict, List
+
+import grpc
+
+from python_pachyderm.errors import AuthServiceNotActivated
+from python_pachyderm.proto.v2.auth import auth_pb2, auth_pb2_grpc
+
+
+class AsyncAuthMixin:
+    """An async mixin for auth-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = auth_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def activate_auth(self, root_token: str = None) -> str:
+        """Activates auth on the cluster.
+        See :meth:`.AuthMixin.activate_auth`.
+        """
+        message = auth_pb2.ActivateRequest(root_token=root_token)
+        return (await self.__stub.Activate(message)).pach_token
+
+    async def deactivate_auth(self) -> None:
+        """Deactivates auth. See :meth:`.AuthMixin.deactivate_auth`.
+
+        Raises
+        ------
+        AuthServiceNotActivated
+        """
+        message = auth_pb2.DeactivateRequest()
+        try:
+            await self.__stub.Deactivate(message)
+        except grpc.RpcError as err:
+            raise AuthServiceNotActivated.try_from(err)
+
+    async def get_auth_configuration(self) -> auth_pb2.OIDCConfig:
+        """Gets the auth configuration.
+        See :meth:`.AuthMixin.get_auth_configuration`.
+        """
+        message = auth_pb2.GetConfigurationRequest()
+        return (await self.__stub.GetConfiguration(message)).configuration
+
+    async def set_auth_configuration(self, configuration: auth_pb2.OIDCConfig) -> None:
+        """Sets the auth configuration.
+        See :meth:`.AuthMixin.set_auth_configuration`.
+        """
+        message = auth_pb2.SetConfigurationRequest(configuration=configuration)
+        await self.__stub.SetConfiguration(message)
+
+    async def get_role_binding(
+        self, resource: auth_pb2.Resource
+    ) -> Dict[str, auth_pb2.Roles]:
+        """Returns the current set of role bindings to the resource specified.
+        See :meth:`.AuthMixin.get_role_binding`.
+        """
+        message = auth_pb2.GetRoleBindingRequest(resource=resource)
+        return (await self.__stub.GetRoleBinding(message)).binding.entries
+
+    async def modify_role_binding(
+        self, resource: auth_pb2.Resource, principal: str, roles: List[str] = None
+    ) -> None:
+        """Sets the roles for a given principal on a resource.
+        See :meth:`.AuthMixin.modify_role_binding`.
+        """
+        message = auth_pb2.ModifyRoleBindingRequest(
+            resource=resource, principal=principal, roles=roles
+        )
+        await self.__stub.ModifyRoleBinding(message)
+
+    async def get_oidc_login(self) -> auth_pb2.GetOIDCLoginResponse:
+        """Gets the OIDC login configuration.
+        See :meth:`.AuthMixin.get_oidc_login`.
+        """
+        message = auth_pb2.GetOIDCLoginRequest()
+        return await self.__stub.GetOIDCLogin(message)
+
+    async def authenticate_oidc(self, oidc_state: str) -> str:
+        """Authenticates a user to the Pachyderm cluster via OIDC.
+        See :meth:`.AuthMixin.authenticate_oidc`.
+        """
+        message = auth_pb2.AuthenticateRequest(oidc_state=oidc_state)
+        return (await self.__stub.Authenticate(message)).pach_token
+
+    async def authenticate_id_token(self, id_token: str) -> str:
+        """Authenticates a user to the Pachyderm cluster using an ID token
+        issued by the OIDC provider.
+        See :meth:`.AuthMixin.authenticate_id_token`.
+        """
+        message = auth_pb2.AuthenticateRequest(id_token=id_token)
+        return (await self.__stub.Authenticate(message)).pach_token
+
+    async def authorize(
+        self,
+        resource: auth_pb2.Resource,
+        permissions: List["auth_pb2.Permission"] = None,
+    ) -> auth_pb2.AuthorizeResponse:
+        """Tests a list of permissions that the user might have on a resource.
+        See :meth:`.AuthMixin.authorize`.
+        """
+        message = auth_pb2.AuthorizeRequest(resource=resource, permissions=permissions)
+        return await self.__stub.Authorize(message)
+
+    async def who_am_i(self) -> auth_pb2.WhoAmIResponse:
+        """Returns info about the user tied to this `AsyncClient`.
+        See :meth:`.AuthMixin.who_am_i`.
+        """
+        message = auth_pb2.WhoAmIRequest()
+        return await self.__stub.WhoAmI(message)
+
+    async def get_roles_for_permission(
+        self, permission: auth_pb2.Permission
+    ) -> List[auth_pb2.Role]:
+        """Returns a list of all roles that have the specified permission.
+        See :meth:`.AuthMixin.get_roles_for_permission`.
+        """
+        message = auth_pb2.GetRolesForPermissionRequest(permission=permission)
+        return (await self.__stub.GetRolesForPermission(message)).roles
+
+    async def get_robot_token(self, robot: str, ttl: int = None) -> str:
+        """Gets a new auth token for a robot user.
+        See :meth:`.AuthMixin.get_robot_token`.
+        """
+        message = auth_pb2.GetRobotTokenRequest(robot=robot, ttl=ttl)
+        return (await self.__stub.GetRobotToken(message)).token
+
+    async def revoke_auth_token(self, token: str) -> None:
+        """Revokes an auth token. See :meth:`.AuthMixin.revoke_auth_token`."""
+        message = auth_pb2.RevokeAuthTokenRequest(token=token)
+        await self.__stub.RevokeAuthToken(message)
+
+    async def set_groups_for_user(self, username: str, groups: List[str]) -> None:
+        """Sets the group membership for a user.
+        See :meth:`.AuthMixin.set_groups_for_user`.
+        """
+        message = auth_pb2.SetGroupsForUserRequest(username=username, groups=groups)
+        await self.__stub.SetGroupsForUser(message)
+
+    async def modify_members(
+        self, group: str, add: List[str] = None, remove: List[str] = None
+    ) -> None:
+        """Adds and/or removes members of a group.
+        See :meth:`.AuthMixin.modify_members`.
+        """
+        message = auth_pb2.ModifyMembersRequest(group=group, add=add, remove=remove)
+        await self.__stub.ModifyMembers(message)
+
+    async def get_groups(self) -> List[str]:
+        """Gets a list of groups this user belongs to.
+        See :meth:`.AuthMixin.get_groups`.
+        """
+        message = auth_pb2.GetGroupsRequest()
+        return (await self.__stub.GetGroups(message)).groups
+
+    async def get_users(self, group: str) -> List[str]:
+        """Gets users in a group. See :meth:`.AuthMixin.get_users`."""
+        message = auth_pb2.GetUsersRequest(group=group)
+        return (await self.__stub.GetUsers(message)).usernames
@@ -0,0 +1,86 @@
+from typing import AsyncIterator, List
+
+import grpc
+from google.protobuf import duration_pb2
+
+from python_pachyderm.proto.v2.debug import debug_pb2, debug_pb2_grpc
+from python_pachyderm.proto.v2.pps import pps_pb2
+
+
+class AsyncDebugMixin:
+    """An async mixin for debug-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = debug_pb2_grpc.DebugStub(self._channel)
+        super().__init__()
+
+    async def dump(
+        self,
+        system: debug_pb2.System = None,
+        pipelines: List[pps_pb2.Pipeline] = None,
+        input_repos: bool = False,
+        timeout: duration_pb2.Duration = None,
+    ) -> AsyncIterator[debug_pb2.DumpChunk]:
+        """Collect a standard set of debugging information using the DumpV2
+        API. See :meth:`.DebugMixin.dump`.
+
+        Examples
+        --------
+        >>> async for b in client.dump():
+        >>>     print(b)
+        """
+        message = debug_pb2.DumpV2Request(
+            system=system,
+            pipelines=pipelines or [],
+        )
+        if system is None and not pipelines:
+            message = await self.get_dump_template()
+        if input_repos:
+            message.input_repos = input_repos
+        if timeout:
+            message.timeout = timeout
+        async for item in self.__stub.DumpV2(message):
+            yield item
+
+    async def get_dump_template(
+        self, filters: List[str] = None
+    ) -> debug_pb2.DumpV2Request:
+        """Generate a template request to be used by the DumpV2 API.
+        See :meth:`.DebugMixin.get_dump_template`.
+        """
+        message = debug_pb2.GetDumpV2TemplateRequest(filters=filters or [])
+        return (await self.__stub.GetDumpV2Template(message)).request
+
+    async def profile_cpu(
+        self, duration: duration_pb2.Duration, filter: debug_pb2.Filter = None
+    ) -> AsyncIterator[bytes]:
+        """Gets a CPU profile. See :meth:`.DebugMixin.profile_cpu`."""
+        message = debug_pb2.ProfileRequest(
+            filter=filter,
+            profile=debug_pb2.Profile(name="cpu", duration=duration),
+        )
+        async for item in self.__stub.Profile(message):
+            yield item.value
+
+    async def binary(self, filter: debug_pb2.Filter = None) -> AsyncIterator[bytes]:
+        """Gets the pachd binary. See :meth:`.DebugMixin.binary`."""
+        message = debug_pb2.BinaryRequest(filter=filter)
+        async for item in self.__stub.Binary(message):
+            yield item.value
+
+    async def set_log_level(
+        self,
+        pachyderm_level: debug_pb2.SetLogLevelRequest.LogLevel = None,
+        grpc_level: debug_pb2.SetLogLevelRequest.LogLevel = None,
+        duration: duration_pb2.Duration = None,
+        recurse: bool = True,
+    ) -> debug_pb2.SetLogLevelResponse:
+        """Sets the logging level of either pachyderm or grpc.
+        See :meth:`.DebugMixin.set_log_level`.
+        """
+        message = debug_pb2.SetLogLevelRequest(duration=duration, recurse=recurse)
+        message.pachyderm = pachyderm_level
+        message.grpc = grpc_level
+        return await self.__stub.SetLogLevel(message)
@@ -0,0 +1,64 @@
+import grpc
+
+from python_pachyderm.proto.v2.enterprise import enterprise_pb2, enterprise_pb2_grpc
+
+
+class AsyncEnterpriseMixin:
+    """An async mixin for enterprise-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = enterprise_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def activate_enterprise(
+        self, license_server: str, id: str, secret: str
+    ) -> None:
+        """Activates enterprise by registering with a license server.
+        See :meth:`.EnterpriseMixin.activate_enterprise`.
+        """
+        message = enterprise_pb2.ActivateRequest(
+            license_server=license_server, id=id, secret=secret
+        )
+        await self.__stub.Activate(message)
+
+    async def get_enterprise_state(self) -> enterprise_pb2.GetStateResponse:
+        """Gets the current enterprise state of the cluster.
+        See :meth:`.EnterpriseMixin.get_enterprise_state`.
+        """
+        message = enterprise_pb2.GetStateRequest()
+        return await self.__stub.GetState(message)
+
+    async def deactivate_enterprise(self) -> None:
+        """Deactivates enterprise.
+        See :meth:`.EnterpriseMixin.deactivate_enterprise`.
+        """
+        message = enterprise_pb2.DeactivateRequest()
+        await self.__stub.Deactivate(message)
+
+    async def get_activation_code(self) -> enterprise_pb2.GetActivationCodeResponse:
+        """Returns the enterprise code used to activate Pachyderm Enterprise
+        in this cluster. See :meth:`.EnterpriseMixin.get_activation_code`.
+        """
+        message = enterprise_pb2.GetActivationCodeRequest()
+        return await self.__stub.GetActivationCode(message)
+
+    async def pause_enterprise(self) -> None:
+        """Pauses the cluster. See :meth:`.EnterpriseMixin.pause_enterprise`."""
+        message = enterprise_pb2.PauseRequest()
+        await self.__stub.Pause(message)
+
+    async def unpause_enterprise(self) -> None:
+        """Unpauses the cluster.
+        See :meth:`.EnterpriseMixin.unpause_enterprise`.
+        """
+        message = enterprise_pb2.UnpauseRequest()
+        await self.__stub.Unpause(message)
+
+    async def get_pause_status(self) -> enterprise_pb2.PauseStatusResponse:
+        """Gets the pause status of the cluster.
+        See :meth:`.EnterpriseMixin.get_pause_status`.
+        """
+        message = enterprise_pb2.PauseStatusRequest()
+        return await self.__stub.PauseStatus(message)
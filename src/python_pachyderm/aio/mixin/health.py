@@ -0,0 +1,19 @@
+import grpc
+from grpc_health.v1 import health_pb2, health_pb2_grpc
+
+
+class AsyncHealthMixin:
+    """An async mixin for health-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = health_pb2_grpc.HealthStub(self._channel)
+        super().__init__()
+
+    async def health_check(self) -> health_pb2.HealthCheckResponse:
+        """Returns a health check indicating if the server can handle RPCs.
+        See :meth:`.HealthMixin.health_check`.
+        """
+        message = health_pb2.HealthCheckRequest()
+        return await self.__stub.Check(message)
@@ -0,0 +1,118 @@
+from typing import List
+
+import grpc
+
+from python_pachyderm.errors import AuthServiceNotActivated
+from python_pachyderm.proto.v2.identity import identity_pb2, identity_pb2_grpc
+
+
+class AsyncIdentityMixin:
+    """An async mixin for identity-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = identity_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def set_identity_server_config(
+        self, config: identity_pb2.IdentityServerConfig
+    ) -> None:
+        """Configure the embedded identity server.
+        See :meth:`.IdentityMixin.set_identity_server_config`.
+        """
+        message = identity_pb2.SetIdentityServerConfigRequest(config=config)
+        await self.__stub.SetIdentityServerConfig(message)
+
+    async def get_identity_server_config(self) -> identity_pb2.IdentityServerConfig:
+        """Get the embedded identity server configuration.
+        See :meth:`.IdentityMixin.get_identity_server_config`.
+        """
+        message = identity_pb2.GetIdentityServerConfigRequest()
+        return (await self.__stub.GetIdentityServerConfig(message)).config
+
+    async def create_idp_connector(self, connector: identity_pb2.IDPConnector) -> None:
+        """Create an IDP connector in the identity server.
+        See :meth:`.IdentityMixin.create_idp_connector`.
+        """
+        message = identity_pb2.CreateIDPConnectorRequest(connector=connector)
+        await self.__stub.CreateIDPConnector(message)
+
+    async def list_idp_connectors(self) -> List[identity_pb2.IDPConnector]:
+        """List IDP connectors in the identity server.
+        See :meth:`.IdentityMixin.list_idp_connectors`.
+        """
+        message = identity_pb2.ListIDPConnectorsRequest()
+        return (await self.__stub.ListIDPConnectors(message)).connectors
+
+    async def update_idp_connector(self, connector: identity_pb2.IDPConnector) -> None:
+        """Update an IDP connector in the identity server.
+        See :meth:`.IdentityMixin.update_idp_connector`.
+        """
+        message = identity_pb2.UpdateIDPConnectorRequest(connector=connector)
+        await self.__stub.UpdateIDPConnector(message)
+
+    async def get_idp_connector(self, id: str) -> identity_pb2.IDPConnector:
+        """Get an IDP connector in the identity server.
+        See :meth:`.IdentityMixin.get_idp_connector`.
+        """
+        message = identity_pb2.GetIDPConnectorRequest(id=id)
+        return (await self.__stub.GetIDPConnector(message)).connector
+
+    async def delete_idp_connector(self, id: str) -> None:
+        """Delete an IDP connector in the identity server.
+        See :meth:`.IdentityMixin.delete_idp_connector`.
+        """
+        message = identity_pb2.DeleteIDPConnectorRequest(id=id)
+        await self.__stub.DeleteIDPConnector(message)
+
+    async def create_oidc_client(
+        self, client: identity_pb2.OIDCClient
+    ) -> identity_pb2.OIDCClient:
+        """Create an OIDC client in the identity server.
+        See :meth:`.IdentityMixin.create_oidc_client`.
+        """
+        message = identity_pb2.CreateOIDCClientRequest(client=client)
+        return (await self.__stub.CreateOIDCClient(message)).client
+
+    async def update_oidc_client(self, client: identity_pb2.OIDCClient) -> None:
+        """Update an OIDC client in the identity server.
+        See :meth:`.IdentityMixin.update_oidc_client`.
+        """
+        message = identity_pb2.UpdateOIDCClientRequest(client=client)
+        await self.__stub.UpdateOIDCClient(message)
+
+    async def get_oidc_client(self, id: str) -> identity_pb2.OIDCClient:
+        """Get an OIDC client in the identity server.
+        See :meth:`.IdentityMixin.get_oidc_client`.
+        """
+        message = identity_pb2.GetOIDCClientRequest(id=id)
+        return (await self.__stub.GetOIDCClient(message)).client
+
+    async def delete_oidc_client(self, id: str) -> None:
+        """Delete an OIDC client in the identity server.
+        See :meth:`.IdentityMixin.delete_oidc_client`.
+        """
+        message = identity_pb2.DeleteOIDCClientRequest(id=id)
+        await self.__stub.DeleteOIDCClient(message)
+
+    async def list_oidc_clients(self) -> List[identity_pb2.OIDCClient]:
+        """List OIDC clients in the identity server.
+        See :meth:`.IdentityMixin.list_oidc_clients`.
+        """
+        message = identity_pb2.ListOIDCClientsRequest()
+        return (await self.__stub.ListOIDCClients(message)).clients
+
+    async def delete_all_identity(self) -> None:
+        """Delete all identity service information.
+        See :meth:`.IdentityMixin.delete_all_identity`.
+
+        Raises
+        ------
+        AuthServiceNotActivated
+        """
+        message = identity_pb2.DeleteAllRequest()
+        try:
+            await self.__stub.DeleteAll(message)
+        except grpc.RpcError as err:
+            raise AuthServiceNotActivated.try_from(err)
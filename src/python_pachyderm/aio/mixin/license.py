@@ -0,0 +1,113 @@
+from typing import List
+
+import grpc
+from google.protobuf import timestamp_pb2
+
+from python_pachyderm.errors import AuthServiceNotActivated
+from python_pachyderm.proto.v2.enterprise import enterprise_pb2
+from python_pachyderm.proto.v2.license import license_pb2, license_pb2_grpc
+
+
+class AsyncLicenseMixin:
+    """An async mixin for license-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = license_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def activate_license(
+        self, activation_code: str, expires: timestamp_pb2.Timestamp = None
+    ) -> enterprise_pb2.TokenInfo:
+        """Activates the license service.
+        See :meth:`.LicenseMixin.activate_license`.
+        """
+        message = license_pb2.ActivateRequest(
+            activation_code=activation_code, expires=expires
+        )
+        return (await self.__stub.Activate(message)).info
+
+    async def add_cluster(
+        self,
+        id: str,
+        address: str,
+        secret: str = None,
+        user_address: str = None,
+        cluster_deployment_id: str = None,
+        enterprise_server: bool = False,
+    ) -> license_pb2.AddClusterResponse:
+        """Register a cluster with the license service.
+        See :meth:`.LicenseMixin.add_cluster`.
+        """
+        message = license_pb2.AddClusterRequest(
+            address=address,
+            cluster_deployment_id=cluster_deployment_id,
+            enterprise_server=enterprise_server,
+            id=id,
+            secret=secret,
+            user_address=user_address,
+        )
+        return await self.__stub.AddCluster(message)
+
+    async def update_cluster(
+        self,
+        id: str,
+        address: str,
+        user_address: str = None,
+        cluster_deployment_id: str = None,
+        secret: str = None,
+    ) -> None:
+        """Update a cluster registered with the license service.
+        See :meth:`.LicenseMixin.update_cluster`.
+        """
+        message = license_pb2.UpdateClusterRequest(
+            address=address,
+            cluster_deployment_id=cluster_deployment_id,
+            id=id,
+            user_address=user_address,
+            secret=secret,
+        )
+        await self.__stub.UpdateCluster(message)
+
+    async def delete_cluster(self, id: str) -> None:
+        """Delete a cluster registered with the license service.
+        See :meth:`.LicenseMixin.delete_cluster`.
+        """
+        message = license_pb2.DeleteClusterRequest(id=id)
+        await self.__stub.DeleteCluster(message)
+
+    async def list_clusters(self) -> List[license_pb2.ClusterStatus]:
+        """List clusters registered with the license service.
+        See :meth:`.LicenseMixin.list_clusters`.
+        """
+        message = license_pb2.ListClustersRequest()
+        return (await self.__stub.ListClusters(message)).clusters
+
+    async def get_activation_code(self) -> license_pb2.GetActivationCodeResponse:
+        """Gets the enterprise code used to activate the server.
+        See :meth:`.LicenseMixin.get_activation_code`.
+        """
+        message = license_pb2.GetActivationCodeRequest()
+        return await self.__stub.GetActivationCode(message)
+
+    async def delete_all_license(self) -> None:
+        """Remove all clusters and deactivate the license service.
+        See :meth:`.LicenseMixin.delete_all_license`.
+
+        Raises
+        ------
+        AuthServiceNotActivated
+        """
+        message = license_pb2.DeleteAllRequest()
+        try:
+            await self.__stub.DeleteAll(message)
+        except grpc.RpcError as err:
+            raise AuthServiceNotActivated.try_from(err)
+
+    async def list_user_clusters(self) -> List[license_pb2.UserClusterInfo]:
+        """Lists all clusters available to user.
+        See :meth:`.LicenseMixin.list_user_clusters`.
+        """
+        message = license_pb2.ListUserClustersRequest()
+        return (await self.__stub.ListUserClusters(message)).clusters
@@ -0,0 +1,821 @@
+import asyncio
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import wraps
+from typing import AsyncIterator, Callable, Iterator, List, Union, BinaryIO
+
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
+
+import grpc
+
+from python_pachyderm.errors import InvalidTransactionOperation
+from python_pachyderm.mixin.pfs import (
+    BUFFER_SIZE,
+    ModifyFileClient,
+    PFSTarFile,
+    _ChunkBuffer,
+)
+from python_pachyderm.pfs import commit_from, uuid_re, SubcommitType
+from python_pachyderm.proto.v2.pfs import pfs_pb2, pfs_pb2_grpc
+from google.protobuf import empty_pb2, wrappers_pb2, timestamp_pb2
+
+
+class AsyncPFSFile:
+    """Async file-like objects containing content of a file stored in PFS.
+    Returned by ``await AsyncClient.get_file()``.
+
+    Examples
+    --------
+    >>> f = await client.get_file(("montage", "master"), "/montage.png")
+    >>> content = await f.read()
+    ...
+    >>> async with await client.get_file(("montage", "master"), "/montage.png") as f:
+    >>>     async for chunk in f:
+    >>>         dest_file.write(chunk)
+
+    .. # noqa: W505
+    """
+
+    def __init__(self, stream: grpc.aio.UnaryStreamCall, first_message: bytes):
+        self._stream = stream
+        self._buffer = _ChunkBuffer()
+        self._buffer.append(first_message)
+        self._closed = False
+
+    @classmethod
+    async def open(cls, stream: grpc.aio.UnaryStreamCall) -> "AsyncPFSFile":
+        """Reads the first message of `stream` so that errors (i.e. the file
+        not existing) are raised immediately.
+        """
+        try:
+            first_message = await stream.read()
+        except grpc.RpcError as err:
+            raise ConnectionError("Error creating the AsyncPFSFile") from err
+        if first_message is grpc.aio.EOF:
+            return cls(stream, b"")
+        return cls(stream, first_message.value)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, val, tb):
+        self.close()
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        while self._buffer:
+            yield self._buffer.take(self._buffer.front())
+        while True:
+            message = await self._next_message()
+            if message is None:
+                return
+            yield message
+
+    async def _next_message(self) -> Union[bytes, None]:
+        if self._closed:
+            return None
+        try:
+            message = await self._stream.read()
+        except grpc.RpcError:
+            return None
+        if message is grpc.aio.EOF:
+            return None
+        return message.value
+
+    async def read(self, size: int = -1) -> bytes:
+        """Reads from the :class:`.AsyncPFSFile` buffer.
+
+        Parameters
+        ----------
+        size : int, optional
+            If set, the number of bytes to read from the buffer.
+
+        Returns
+        -------
+        bytes
+            Content from the stream.
+        """
+        while size < 0 or len(self._buffer) < size:
+            message = await self._next_message()
+            if message is None:
+                break
+            self._buffer.append(message)
+
+        if size < 0:
+            size = len(self._buffer)
+        return self._buffer.take(size)
+
+    def close(self) -> None:
+        """Closes the :class:`.AsyncPFSFile`."""
+        self._closed = True
+        self._stream.cancel()
+
+
+def transaction_incompatible(pfs_method: Callable) -> Callable:
+    """Decorator for marking async methods of the PFS API which are
+    not allowed to occur during a transaction."""
+
+    @wraps(pfs_method)
+    async def wrapper(client, *args, **kwargs):
+        if bool(client.transaction_id):
+            raise InvalidTransactionOperation()
+        return await pfs_method(client, *args, **kwargs)
+
+    return wrapper
+
+
+async def _iterate_in_executor(iterator: Iterator) -> AsyncIterator:
+    """Steps through a blocking iterator (i.e. one that reads local files) in
+    the default executor, so that it does not block the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    done = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+class AsyncPFSMixin:
+    """An async mixin with pfs-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = pfs_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def create_repo(
+        self,
+        repo_name: str,
+        description: str = None,
+        update: bool = False,
+        project_name: str = None,
+    ) -> None:
+        """Creates a new repo object in PFS with the given name.
+        See :meth:`.PFSMixin.create_repo`.
+        """
+        message = pfs_pb2.CreateRepoRequest(
+            description=description,
+            repo=pfs_pb2.Repo(
+                name=repo_name,
+                type="user",
+                project=pfs_pb2.Project(name=project_name),
+            ),
+            update=update,
+        )
+        await self.__stub.CreateRepo(message)
+
+    async def inspect_repo(
+        self, repo_name: str, project_name: str = None
+    ) -> pfs_pb2.RepoInfo:
+        """Inspects a repo. See :meth:`.PFSMixin.inspect_repo`."""
+        message = pfs_pb2.InspectRepoRequest(
+            repo=pfs_pb2.Repo(
+                name=repo_name,
+                type="user",
+                project=pfs_pb2.Project(name=project_name),
+            ),
+        )
+        return await self.__stub.InspectRepo(message)
+
+    def list_repo(
+        self, type: str = "user", projects_filter: List[pfs_pb2.Project] = None
+    ) -> AsyncIterator[pfs_pb2.RepoInfo]:
+        """Lists all repos in PFS. See :meth:`.PFSMixin.list_repo`.
+
+        Examples
+        --------
+        >>> async for repo_info in client.list_repo():
+        >>>     print(repo_info.repo.name)
+        """
+        if isinstance(projects_filter, Iterable):
+            projects_filter = [pfs_pb2.Project(name=p.name) for p in projects_filter]
+        message = pfs_pb2.ListRepoRequest(type=type, projects=projects_filter)
+        return self.__stub.ListRepo(message)
+
+    async def delete_repo(
+        self, repo_name: str, force: bool = False, project_name: str = None
+    ) -> None:
+        """Deletes a repo and reclaims the storage space it was using.
+        See :meth:`.PFSMixin.delete_repo`.
+        """
+        message = pfs_pb2.DeleteRepoRequest(
+            force=force,
+            repo=pfs_pb2.Repo(
+                name=repo_name,
+                type="user",
+                project=pfs_pb2.Project(name=project_name),
+            ),
+        )
+        await self.__stub.DeleteRepo(message)
+
+    async def delete_all_repos(self) -> None:
+        """Deletes all repos. See :meth:`.PFSMixin.delete_all_repos`."""
+        message = empty_pb2.Empty()
+        await self.__stub.DeleteAll(message)
+
+    async def create_project(
+        self, project_name: str, description: str = None, update: bool = False
+    ) -> None:
+        """Creates a new project with the given name.
+        See :meth:`.PFSMixin.create_project`.
+        """
+        message = pfs_pb2.CreateProjectRequest(
+            project=pfs_pb2.Project(name=project_name),
+            description=description,
+            update=update,
+        )
+        await self.__stub.CreateProject(message)
+
+    async def inspect_project(self, project_name: str) -> pfs_pb2.ProjectInfo:
+        """Inspects a project. See :meth:`.PFSMixin.inspect_project`."""
+        message = pfs_pb2.InspectProjectRequest(
+            project=pfs_pb2.Project(name=project_name)
+        )
+        return await self.__stub.InspectProject(message)
+
+    def list_project(self) -> AsyncIterator[pfs_pb2.ProjectInfo]:
+        """Lists all projects in PFS. See :meth:`.PFSMixin.list_project`."""
+        message = pfs_pb2.ListProjectRequest()
+        return self.__stub.ListProject(message)
+
+    async def delete_project(self, project_name: str, force: bool = False) -> None:
+        """Deletes a project and reclaims the storage space it was using.
+        See :meth:`.PFSMixin.delete_project`.
+        """
+        message = pfs_pb2.DeleteProjectRequest(
+            force=force,
+            project=pfs_pb2.Project(name=project_name),
+        )
+        await self.__stub.DeleteProject(message)
+
+    async def start_commit(
+        self,
+        repo_name: str,
+        branch: str,
+        parent: Union[str, SubcommitType] = None,
+        description: str = None,
+        project_name: str = None,
+    ) -> pfs_pb2.Commit:
+        """Begins the process of committing data to a repo.
+        See :meth:`.PFSMixin.start_commit`.
+        """
+        repo = pfs_pb2.Repo(
+            name=repo_name, type="user", project=pfs_pb2.Project(name=project_name)
+        )
+        if parent and isinstance(parent, str):
+            parent = pfs_pb2.Commit(
+                id=parent,
+                branch=pfs_pb2.Branch(name=None, repo=repo),
+            )
+        message = pfs_pb2.StartCommitRequest(
+            branch=pfs_pb2.Branch(name=branch, repo=repo),
+            description=description,
+            parent=commit_from(parent),
+        )
+        return await self.__stub.StartCommit(message)
+
+    async def finish_commit(
+        self,
+        commit: SubcommitType,
+        description: str = None,
+        error: str = None,
+        force: bool = False,
+    ) -> None:
+        """Ends the process of committing data to a repo and persists the
+        commit. See :meth:`.PFSMixin.finish_commit`.
+        """
+        message = pfs_pb2.FinishCommitRequest(
+            commit=commit_from(commit),
+            description=description,
+            error=error,
+            force=force,
+        )
+        await self.__stub.FinishCommit(message)
+
+    @asynccontextmanager
+    async def commit(
+        self,
+        repo_name: str,
+        branch: str,
+        parent: Union[str, SubcommitType] = None,
+        description: str = None,
+        project_name: str = None,
+    ) -> AsyncIterator[pfs_pb2.Commit]:
+        """An async context manager for running operations within a commit.
+        See :meth:`.PFSMixin.commit`.
+
+        Examples
+        --------
+        >>> async with client.commit("foo", "master") as c:
+        >>>     await client.delete_file(c, "/dir/delete_me.txt")
+        >>>     await client.put_file_bytes(c, "/new_file.txt", b"DATA")
+        """
+        commit = await self.start_commit(
+            repo_name, branch, parent, description, project_name
+        )
+        try:
+            yield commit
+        finally:
+            await self.finish_commit(commit)
+
+    async def inspect_commit(
+        self,
+        commit: Union[str, SubcommitType],
+        commit_state: pfs_pb2.CommitState = pfs_pb2.CommitState.STARTED,
+    ) -> AsyncIterator[pfs_pb2.CommitInfo]:
+        """Inspects a commit. See :meth:`.PFSMixin.inspect_commit`.
+
+        Examples
+        --------
+        >>> async for commit_info in client.inspect_commit(("foo", "master~2")):
+        >>>     print(commit_info)
+        """
+        if not isinstance(commit, str):
+            message = pfs_pb2.InspectCommitRequest(
+                commit=commit_from(commit), wait=commit_state
+            )
+            yield await self.__stub.InspectCommit(message)
+        elif uuid_re.match(commit):
+            message = pfs_pb2.InspectCommitSetRequest(
+                commit_set=pfs_pb2.CommitSet(id=commit),
+                wait=commit_state == pfs_pb2.CommitState.FINISHED,
+            )
+            async for item in self.__stub.InspectCommitSet(message):
+                yield item
+        else:
+            raise ValueError(
+                "bad argument: commit should either be a commit ID (str) or a commit-like object"
+            )
+
+    def list_commit(
+        self,
+        repo_name: str = None,
+        to_commit: SubcommitType = None,
+        from_commit: SubcommitType = None,
+        number: int = None,
+        reverse: bool = False,
+        all: bool = False,
+        origin_kind: pfs_pb2.OriginKind = pfs_pb2.OriginKind.USER,
+        started_time: datetime = None,
+        project_name: str = None,
+    ) -> Union[AsyncIterator[pfs_pb2.CommitInfo], AsyncIterator[pfs_pb2.CommitSetInfo]]:
+        """Lists commits. See :meth:`.PFSMixin.list_commit`."""
+        project = pfs_pb2.Project(name=project_name) if project_name else None
+        if repo_name is not None:
+            if started_time is not None:
+                started_time = timestamp_pb2.Timestamp.FromDatetime(started_time)
+            message = pfs_pb2.ListCommitRequest(
+                repo=pfs_pb2.Repo(
+                    name=repo_name,
+                    type="user",
+                    project=project,
+                ),
+                number=number,
+                reverse=reverse,
+                all=all,
+                origin_kind=origin_kind,
+                started_time=started_time,
+            )
+            if to_commit is not None:
+                message.to.CopyFrom(commit_from(to_commit))
+            if from_commit is not None:
+                getattr(message, "from").CopyFrom(commit_from(from_commit))
+            return self.__stub.ListCommit(message)
+        else:
+            message = pfs_pb2.ListCommitSetRequest(project=project)
+            return self.__stub.ListCommitSet(message)
+
+    async def squash_commit(self, commit_id: str) -> None:
+        """Squashes a commit into its parent.
+        See :meth:`.PFSMixin.squash_commit`.
+        """
+        message = pfs_pb2.SquashCommitSetRequest(
+            commit_set=pfs_pb2.CommitSet(id=commit_id)
+        )
+        await self.__stub.SquashCommitSet(message)
+
+    async def drop_commit(self, commit_id: str) -> None:
+        """Drops an entire commit. See :meth:`.PFSMixin.drop_commit`."""
+        message = pfs_pb2.DropCommitSetRequest(
+            commit_set=pfs_pb2.CommitSet(id=commit_id),
+        )
+        await self.__stub.DropCommitSet(message)
+
+    async def wait_commit(
+        self, commit: Union[str, SubcommitType]
+    ) -> List[pfs_pb2.CommitInfo]:
+        """Waits for the specified commit to finish.
+        See :meth:`.PFSMixin.wait_commit`.
+        """
+        return [
+            commit_info
+            async for commit_info in self.inspect_commit(
+                commit, pfs_pb2.CommitState.FINISHED
+            )
+        ]
+
+    def subscribe_commit(
+        self,
+        repo_name: str,
+        branch: str,
+        from_commit: Union[str, SubcommitType] = None,
+        state: pfs_pb2.CommitState = pfs_pb2.CommitState.STARTED,
+        all: bool = False,
+        origin_kind: pfs_pb2.OriginKind = pfs_pb2.OriginKind.USER,
+        project_name: str = None,
+    ) -> AsyncIterator[pfs_pb2.CommitInfo]:
+        """Returns all commits on the branch and then listens for new commits
+        that are created. See :meth:`.PFSMixin.subscribe_commit`.
+
+        Examples
+        --------
+        >>> async for commit_info in client.subscribe_commit("foo", "master"):
+        >>>     print(commit_info.commit.id)
+        """
+        repo = pfs_pb2.Repo(
+            name=repo_name, type="user", project=pfs_pb2.Project(name=project_name)
+        )
+        message = pfs_pb2.SubscribeCommitRequest(
+            repo=repo,
+            branch=branch,
+            state=state,
+            all=all,
+            origin_kind=origin_kind,
+        )
+        if from_commit is not None:
+            if isinstance(from_commit, str):
+                getattr(message, "from").CopyFrom(
+                    pfs_pb2.Commit(repo=repo, id=from_commit)
+                )
+            else:
+                getattr(message, "from").CopyFrom(commit_from(from_commit))
+        return self.__stub.SubscribeCommit(message)
+
+    def find_commits(
+        self, start: SubcommitType, file_path: str, limit: int = 0
+    ) -> AsyncIterator[pfs_pb2.FindCommitsResponse]:
+        """Searches for commits that reference the specified file
+        being modified in a branch. See :meth:`.PFSMixin.find_commits`.
+        """
+        message = pfs_pb2.FindCommitsRequest(
+            start=commit_from(start), file_path=file_path, limit=limit
+        )
+        return self.__stub.FindCommits(message)
+
+    async def create_branch(
+        self,
+        repo_name: str,
+        branch_name: str,
+        head_commit: SubcommitType = None,
+        provenance: List[pfs_pb2.Branch] = None,
+        trigger: pfs_pb2.Trigger = None,
+        new_commit: bool = False,
+        project_name: str = None,
+    ) -> None:
+        """Creates a new branch. See :meth:`.PFSMixin.create_branch`."""
+        message = pfs_pb2.CreateBranchRequest(
+            branch=pfs_pb2.Branch(
+                name=branch_name,
+                repo=pfs_pb2.Repo(
+                    name=repo_name,
+                    type="user",
+                    project=pfs_pb2.Project(name=project_name),
+                ),
+            ),
+            head=commit_from(head_commit),
+            new_commit_set=new_commit,
+            provenance=provenance,
+            trigger=trigger,
+        )
+        await self.__stub.CreateBranch(message)
+
+    async def inspect_branch(
+        self,
+        repo_name: str,
+        branch_name: str,
+        project_name: str = None,
+    ) -> pfs_pb2.BranchInfo:
+        """Inspects a branch. See :meth:`.PFSMixin.inspect_branch`."""
+        message = pfs_pb2.InspectBranchRequest(
+            branch=pfs_pb2.Branch(
+                name=branch_name,
+                repo=pfs_pb2.Repo(
+                    name=repo_name,
+                    type="user",
+                    project=pfs_pb2.Project(name=project_name),
+                ),
+            ),
+        )
+        return await self.__stub.InspectBranch(message)
+
+    def list_branch(
+        self,
+        repo_name: str,
+        reverse: bool = False,
+        project_name: str = None,
+    ) -> AsyncIterator[pfs_pb2.BranchInfo]:
+        """Lists the active branch objects in a repo.
+        See :meth:`.PFSMixin.list_branch`.
+        """
+        message = pfs_pb2.ListBranchRequest(
+            repo=pfs_pb2.Repo(
+                name=repo_name,
+                type="user",
+                project=pfs_pb2.Project(name=project_name),
+            ),
+            reverse=reverse,
+        )
+        return self.__stub.ListBranch(message)
+
+    async def delete_branch(
+        self,
+        repo_name: str,
+        branch_name: str,
+        force: bool = False,
+        project_name: str = None,
+    ) -> None:
+        """Deletes a branch, but leaves the commits themselves intact.
+        See :meth:`.PFSMixin.delete_branch`.
+        """
+        message = pfs_pb2.DeleteBranchRequest(
+            branch=pfs_pb2.Branch(
+                name=branch_name,
+                repo=pfs_pb2.Repo(
+                    name=repo_name,
+                    type="user",
+                    project=pfs_pb2.Project(name=project_name),
+                ),
+            ),
+            force=force,
+        )
+        await self.__stub.DeleteBranch(message)
+
+    @asynccontextmanager
+    async def modify_file_client(
+        self, commit: SubcommitType
+    ) -> AsyncIterator[ModifyFileClient]:
+        """An async context manager that gives a :class:`.ModifyFileClient`.
+        When the context manager exits, any operations enqueued from the
+        :class:`.ModifyFileClient` are executed in a single, atomic
+        ModifyFile gRPC call. Local files are read in the default executor, so
+        the upload does not block the event loop.
+        See :meth:`.PFSMixin.modify_file_client`.
+
+        Examples
+        --------
+        >>> async with client.modify_file_client(c) as mfc:
+        >>>     mfc.delete_file("/delete_me.txt")
+        >>>     mfc.put_file_from_filepath("/new_file.txt", "input.txt")
+        """
+        mfc = ModifyFileClient(commit)
+        yield mfc
+        messages = _iterate_in_executor(mfc._reqs())
+        await self.__stub.ModifyFile(messages)
+
+    @transaction_incompatible
+    async def put_file_bytes(
+        self,
+        commit: SubcommitType,
+        path: str,
+        value: Union[bytes, BinaryIO],
+        datum: str = None,
+        append: bool = False,
+    ) -> None:
+        """Uploads a PFS file from a file-like object, bytestring, or iterator
+        of bytestrings. See :meth:`.PFSMixin.put_file_bytes`.
+        """
+        async with self.modify_file_client(commit) as mfc:
+            if hasattr(value, "read"):
+                mfc.put_file_from_fileobj(path, value, datum=datum, append=append)
+            else:
+                mfc.put_file_from_bytes(path, value, datum=datum, append=append)
+
+    @transaction_incompatible
+    async def put_file_url(
+        self,
+        commit: SubcommitType,
+        path: str,
+        url: str,
+        recursive: bool = False,
+        datum: str = None,
+        append: bool = False,
+        concurrency: int = 0,
+    ) -> None:
+        """Uploads a PFS file using the content found at a URL.
+        See :meth:`.PFSMixin.put_file_url`.
+        """
+        async with self.modify_file_client(commit) as mfc:
+            mfc.put_file_from_url(
+                path,
+                url,
+                recursive=recursive,
+                datum=datum,
+                append=append,
+                concurrency=concurrency,
+            )
+
+    @transaction_incompatible
+    async def copy_file(
+        self,
+        source_commit: SubcommitType,
+        source_path: str,
+        dest_commit: SubcommitType,
+        dest_path: str,
+        datum: str = None,
+        append: bool = False,
+    ) -> None:
+        """Efficiently copies files already in PFS.
+        See :meth:`.PFSMixin.copy_file`.
+        """
+        async with self.modify_file_client(dest_commit) as mfc:
+            mfc.copy_file(
+                source_commit, source_path, dest_path, datum=datum, append=append
+            )
+
+    async def get_file(
+        self,
+        commit: SubcommitType,
+        path: str,
+        datum: str = None,
+        URL: str = None,
+        offset: int = 0,
+    ) -> AsyncPFSFile:
+        """Gets a file from PFS. See :meth:`.PFSMixin.get_file`.
+
+        Returns
+        -------
+        AsyncPFSFile
+            The contents of the file in an async file-like object.
+        """
+        message = pfs_pb2.GetFileRequest(
+            file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
+            URL=URL,
+            offset=offset,
+        )
+        stream = self.__stub.GetFile(message)
+        return await AsyncPFSFile.open(stream)
+
+    async def get_file_tar(
+        self,
+        commit: SubcommitType,
+        path: str,
+        datum: str = None,
+        URL: str = None,
+        offset: int = 0,
+    ) -> PFSTarFile:
+        """Gets a file from PFS as a TAR archive.
+        See :meth:`.PFSMixin.get_file_tar`.
+
+        ``tarfile`` is synchronous, so the archive is first downloaded to a
+        temporary file (kept in memory up to ``BUFFER_SIZE`` bytes).
+        """
+        message = pfs_pb2.GetFileRequest(
+            file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
+            URL=URL,
+            offset=offset,
+        )
+        spool = tempfile.SpooledTemporaryFile(max_size=BUFFER_SIZE)
+        async with await AsyncPFSFile.open(self.__stub.GetFileTAR(message)) as f:
+            async for chunk in f:
+                spool.write(chunk)
+        spool.seek(0)
+        return PFSTarFile.open(fileobj=spool, mode="r|*")
+
+    async def inspect_file(
+        self,
+        commit: SubcommitType,
+        path: str,
+        datum: str = None,
+    ) -> pfs_pb2.FileInfo:
+        """Inspects a file. See :meth:`.PFSMixin.inspect_file`."""
+        message = pfs_pb2.InspectFileRequest(
+            file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
+        )
+        return await self.__stub.InspectFile(message)
+
+    def list_file(
+        self,
+        commit: SubcommitType,
+        path: str,
+        datum: str = None,
+        pagination_marker: pfs_pb2.File = None,
+        number: int = None,
+        reverse: bool = False,
+    ) -> AsyncIterator[pfs_pb2.FileInfo]:
+        """Lists the files in a directory. See :meth:`.PFSMixin.list_file`.
+
+        Examples
+        --------
+        >>> async for file_info in client.list_file(("foo", "master"), "/dir/"):
+        >>>     print(file_info.file.path)
+        """
+        message = pfs_pb2.ListFileRequest(
+            file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
+            paginationMarker=pagination_marker,
+            number=number,
+            reverse=reverse,
+        )
+        return self.__stub.ListFile(message)
+
+    def walk_file(
+        self,
+        commit: SubcommitType,
+        path: str,
+        datum: str = None,
+        pagination_marker: pfs_pb2.File = None,
+        number: int = None,
+        reverse: bool = False,
+    ) -> AsyncIterator[pfs_pb2.FileInfo]:
+        """Walks over all descendant files in a directory.
+        See :meth:`.PFSMixin.walk_file`.
+        """
+        message = pfs_pb2.WalkFileRequest(
+            file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
+            paginationMarker=pagination_marker,
+            number=number,
+            reverse=reverse,
+        )
+        return self.__stub.WalkFile(message)
+
+    def glob_file(
+        self,
+        commit: SubcommitType,
+        pattern: str,
+        path_range: pfs_pb2.PathRange = None,
+    ) -> AsyncIterator[pfs_pb2.FileInfo]:
+        """Lists files that match a glob pattern.
+        See :meth:`.PFSMixin.glob_file`.
+        """
+        message = pfs_pb2.GlobFileRequest(
+            commit=commit_from(commit),
+            pattern=pattern,
+            path_range=path_range,
+        )
+        return self.__stub.GlobFile(message)
+
+    @transaction_incompatible
+    async def delete_file(self, commit: SubcommitType, path: str) -> None:
+        """Deletes a file from an open commit.
+        See :meth:`.PFSMixin.delete_file`.
+        """
+        async with self.modify_file_client(commit) as mfc:
+            mfc.delete_file(path)
+
+    def fsck(self, fix: bool = False) -> AsyncIterator[pfs_pb2.FsckResponse]:
+        """Performs a file system consistency check on PFS.
+        See :meth:`.PFSMixin.fsck`.
+        """
+        message = pfs_pb2.FsckRequest(fix=fix)
+        return self.__stub.Fsck(message)
+
+    def diff_file(
+        self,
+        new_commit: SubcommitType,
+        new_path: str,
+        old_commit: SubcommitType = None,
+        old_path: str = None,
+        shallow: bool = False,
+    ) -> AsyncIterator[pfs_pb2.DiffFileResponse]:
+        """Diffs two PFS files and returns files that are different.
+        See :meth:`.PFSMixin.diff_file`.
+        """
+        if old_commit is not None and old_path is not None:
+            old_file = pfs_pb2.File(commit=commit_from(old_commit), path=old_path)
+        else:
+            old_file = None
+
+        message = pfs_pb2.DiffFileRequest(
+            new_file=pfs_pb2.File(commit=commit_from(new_commit), path=new_path),
+            old_file=old_file,
+            shallow=shallow,
+        )
+        return self.__stub.DiffFile(message)
+
+    async def path_exists(self, commit: SubcommitType, path: str) -> bool:
+        """Checks whether the path exists in the specified commit, agnostic to
+        whether `path` is a file or a directory.
+        See :meth:`.PFSMixin.path_exists`.
+        """
+        try:
+            await self.inspect_file(commit, path)
+        except Exception as e:
+            valid_commit_re = re.compile("^file .+ not found in repo .+ at commit .+$")
+            invalid_commit_re = re.compile("^branch .+ not found in repo .+$")
+
+            if valid_commit_re.match(e.details()):
+                return False
+            elif invalid_commit_re.match(e.details()):
+                raise ValueError("bad argument: nonexistent commit provided")
+            raise e
+
+        return True
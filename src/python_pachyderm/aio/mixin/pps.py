@@ -0,0 +1,564 @@
+import asyncio
+import json
+import base64
+from typing import AsyncIterator, Dict, List, Union
+
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
+
+import grpc
+from google.protobuf import empty_pb2, duration_pb2
+
+from python_pachyderm.mixin.pps import _JobChanges
+from python_pachyderm.pfs import commit_from, SubcommitType
+from python_pachyderm.proto.v2.pfs import pfs_pb2
+from python_pachyderm.proto.v2.pps import pps_pb2, pps_pb2_grpc
+
+
+class AsyncPPSMixin:
+    """An async mixin for pps-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = pps_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def inspect_job(
+        self,
+        job_id: str,
+        pipeline_name: str = None,
+        wait: bool = False,
+        details: bool = False,
+        project_name: str = None,
+    ) -> AsyncIterator[pps_pb2.JobInfo]:
+        """Inspects a job. See :meth:`.PPSMixin.inspect_job`.
+
+        Examples
+        --------
+        >>> subjobs = [j async for j in client.inspect_job("467c580611234cdb8cc9758c7aa96087")]
+
+        .. # noqa: W505
+        """
+        if pipeline_name is not None:
+            message = pps_pb2.InspectJobRequest(
+                details=details,
+                job=pps_pb2.Job(
+                    pipeline=pps_pb2.Pipeline(
+                        name=pipeline_name,
+                        project=pfs_pb2.Project(name=project_name),
+                    ),
+                    id=job_id,
+                ),
+                wait=wait,
+            )
+            yield await self.__stub.InspectJob(message)
+        else:
+            message = pps_pb2.InspectJobSetRequest(
+                details=details,
+                job_set=pps_pb2.JobSet(id=job_id),
+                wait=wait,
+            )
+            async for item in self.__stub.InspectJobSet(message):
+                yield item
+
+    def list_job(
+        self,
+        pipeline_name: str = None,
+        input_commit: SubcommitType = None,
+        history: int = 0,
+        details: bool = False,
+        jqFilter: str = None,
+        project_name: str = None,
+        projects_filter: List[str] = None,
+        pagination_marker: pfs_pb2.File = None,
+        number: int = None,
+        reverse: bool = False,
+    ) -> Union[AsyncIterator[pps_pb2.JobInfo], AsyncIterator[pps_pb2.JobSetInfo]]:
+        """Lists jobs. See :meth:`.PPSMixin.list_job`.
+
+        Examples
+        --------
+        >>> async for job in client.list_job("foo"):
+        >>>     print(job)
+        """
+        if isinstance(projects_filter, Iterable):
+            projects_filter = [pfs_pb2.Project(name=p.name) for p in projects_filter]
+        if pipeline_name is not None:
+            if isinstance(input_commit, list):
+                input_commit = [commit_from(ic) for ic in input_commit]
+            elif input_commit is not None:
+                input_commit = [commit_from(input_commit)]
+
+            message = pps_pb2.ListJobRequest(
+                details=details,
+                history=history,
+                input_commit=input_commit,
+                jqFilter=jqFilter,
+                pipeline=pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                ),
+                projects=projects_filter,
+                paginationMarker=pagination_marker,
+                number=number,
+                reverse=reverse,
+            )
+            return self.__stub.ListJob(message)
+        else:
+            message = pps_pb2.ListJobSetRequest(
+                details=details,
+                projects=projects_filter,
+                paginationMarker=pagination_marker,
+                number=number,
+                reverse=reverse,
+            )
+            return self.__stub.ListJobSet(message)
+
+    async def subscribe_job(
+        self,
+        pipeline_name: str,
+        details: bool = False,
+        project_name: str = None,
+        states: Iterable[pps_pb2.JobState] = None,
+        retries: int = 5,
+    ) -> AsyncIterator[pps_pb2.JobInfo]:
+        """Returns the subjobs of a pipeline, and then listens for new
+        subjobs and changes to them, reopening the stream if it fails with
+        ``UNAVAILABLE``. See :meth:`.PPSMixin.subscribe_job`.
+
+        Examples
+        --------
+        >>> async for job in client.subscribe_job("foo"):
+        >>>     print(job.job.id)
+        """
+        message = pps_pb2.SubscribeJobRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+            details=details,
+        )
+        changed = _JobChanges(states)
+        failures = 0
+        while True:
+            stream = self.__stub.SubscribeJob(message)
+            try:
+                async for info in stream:
+                    failures = 0
+                    if changed(info):
+                        yield info
+                return
+            except grpc.RpcError as error:
+                failures += 1
+                if error.code() != grpc.StatusCode.UNAVAILABLE or failures > retries:
+                    raise
+            finally:
+                stream.cancel()
+            await asyncio.sleep(0.1 * 2**failures)
+
+    async def delete_job(
+        self, job_id: str, pipeline_name: str, project_name: str = None
+    ) -> None:
+        """Deletes a subjob (job at the pipeline-level).
+        See :meth:`.PPSMixin.delete_job`.
+        """
+        message = pps_pb2.DeleteJobRequest(
+            job=pps_pb2.Job(
+                id=job_id,
+                pipeline=pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                ),
+            )
+        )
+        await self.__stub.DeleteJob(message)
+
+    async def stop_job(
+        self,
+        job_id: str,
+        pipeline_name: str,
+        reason: str = None,
+        project_name: str = None,
+    ) -> None:
+        """Stops a subjob (job at the pipeline-level).
+        See :meth:`.PPSMixin.stop_job`.
+        """
+        message = pps_pb2.StopJobRequest(
+            job=pps_pb2.Job(
+                id=job_id,
+                pipeline=pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                ),
+            ),
+            reason=reason,
+        )
+        await self.__stub.StopJob(message)
+
+    async def inspect_datum(
+        self,
+        pipeline_name: str,
+        job_id: str,
+        datum_id: str,
+        project_name: str = None,
+    ) -> pps_pb2.DatumInfo:
+        """Inspects a datum. See :meth:`.PPSMixin.inspect_datum`."""
+        message = pps_pb2.InspectDatumRequest(
+            datum=pps_pb2.Datum(
+                id=datum_id,
+                job=pps_pb2.Job(
+                    id=job_id,
+                    pipeline=pps_pb2.Pipeline(
+                        name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                    ),
+                ),
+            ),
+        )
+        return await self.__stub.InspectDatum(message)
+
+    def list_datum(
+        self,
+        pipeline_name: str = None,
+        job_id: str = None,
+        input: pps_pb2.Input = None,
+        project_name: str = None,
+        datum_filter: pps_pb2.ListDatumRequest.Filter = None,
+        pagination_marker: pfs_pb2.File = None,
+        number: int = None,
+        reverse: bool = False,
+    ) -> AsyncIterator[pps_pb2.DatumInfo]:
+        """Lists datums. See :meth:`.PPSMixin.list_datum`."""
+        message = pps_pb2.ListDatumRequest(
+            filter=datum_filter,
+            paginationMarker=pagination_marker,
+            number=number,
+            reverse=reverse,
+        )
+        if pipeline_name is not None and job_id is not None:
+            message.job.CopyFrom(
+                pps_pb2.Job(
+                    pipeline=pps_pb2.Pipeline(
+                        name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                    ),
+                    id=job_id,
+                )
+            )
+        else:
+            message.input.CopyFrom(input)
+        return self.__stub.ListDatum(message)
+
+    async def restart_datum(
+        self,
+        pipeline_name: str,
+        job_id: str,
+        data_filters: List[str] = None,
+        project_name: str = None,
+    ) -> None:
+        """Restarts a datum. See :meth:`.PPSMixin.restart_datum`."""
+        message = pps_pb2.RestartDatumRequest(
+            data_filters=data_filters,
+            job=pps_pb2.Job(
+                pipeline=pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                ),
+                id=job_id,
+            ),
+        )
+        await self.__stub.RestartDatum(message)
+
+    async def create_pipeline(
+        self,
+        pipeline_name: str,
+        transform: pps_pb2.Transform,
+        project_name: str = None,
+        parallelism_spec: pps_pb2.ParallelismSpec = None,
+        egress: pps_pb2.Egress = None,
+        reprocess_spec: str = None,
+        update: bool = False,
+        output_branch_name: str = None,
+        s3_out: bool = False,
+        resource_requests: pps_pb2.ResourceSpec = None,
+        resource_limits: pps_pb2.ResourceSpec = None,
+        sidecar_resource_limits: pps_pb2.ResourceSpec = None,
+        input: pps_pb2.Input = None,
+        description: str = None,
+        reprocess: bool = False,
+        service: pps_pb2.Service = None,
+        datum_set_spec: pps_pb2.DatumSetSpec = None,
+        datum_timeout: duration_pb2.Duration = None,
+        job_timeout: duration_pb2.Duration = None,
+        salt: str = None,
+        datum_tries: int = 3,
+        scheduling_spec: pps_pb2.SchedulingSpec = None,
+        pod_patch: str = None,
+        spout: pps_pb2.Spout = None,
+        spec_commit: pfs_pb2.Commit = None,
+        metadata: pps_pb2.Metadata = None,
+        autoscaling: bool = False,
+        tolerations: List[pps_pb2.Toleration] = None,
+        sidecar_resource_requests: pps_pb2.ResourceSpec = None,
+        dry_run: bool = False,
+        determined: pps_pb2.Determined = None,
+    ) -> None:
+        """Creates a pipeline. See :meth:`.PPSMixin.create_pipeline`."""
+        message = pps_pb2.CreatePipelineRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+            transform=transform,
+            parallelism_spec=parallelism_spec,
+            egress=egress,
+            update=update,
+            output_branch=output_branch_name,
+            s3_out=s3_out,
+            resource_requests=resource_requests,
+            resource_limits=resource_limits,
+            sidecar_resource_limits=sidecar_resource_limits,
+            input=input,
+            description=description,
+            reprocess=reprocess,
+            metadata=metadata,
+            service=service,
+            datum_set_spec=datum_set_spec,
+            datum_timeout=datum_timeout,
+            job_timeout=job_timeout,
+            salt=salt,
+            datum_tries=datum_tries,
+            scheduling_spec=scheduling_spec,
+            pod_patch=pod_patch,
+            spout=spout,
+            spec_commit=spec_commit,
+            reprocess_spec=reprocess_spec,
+            autoscaling=autoscaling,
+            tolerations=tolerations,
+            sidecar_resource_requests=sidecar_resource_requests,
+            dry_run=dry_run,
+            determined=determined,
+        )
+        await self.__stub.CreatePipeline(message)
+
+    async def create_pipeline_from_request(
+        self, req: pps_pb2.CreatePipelineRequest
+    ) -> None:
+        """Creates a pipeline from a ``CreatePipelineRequest`` object.
+        See :meth:`.PPSMixin.create_pipeline_from_request`.
+        """
+        await self.__stub.CreatePipeline(req)
+
+    async def inspect_pipeline(
+        self,
+        pipeline_name: str,
+        history: int = 0,
+        details: bool = False,
+        project_name: str = None,
+    ) -> AsyncIterator[pps_pb2.PipelineInfo]:
+        """Inspects a pipeline. See :meth:`.PPSMixin.inspect_pipeline`."""
+        pipeline = pps_pb2.Pipeline(
+            name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+        )
+        if history == 0:
+            message = pps_pb2.InspectPipelineRequest(details=details, pipeline=pipeline)
+            yield await self.__stub.InspectPipeline(message)
+        else:
+            message = pps_pb2.ListPipelineRequest(
+                details=details, history=history, pipeline=pipeline
+            )
+            async for item in self.__stub.ListPipeline(message):
+                yield item
+
+    def list_pipeline(
+        self,
+        history: int = 0,
+        details: bool = False,
+        jqFilter: str = None,
+        commit_set: pfs_pb2.CommitSet = None,
+        projects_filter: List[str] = None,
+    ) -> AsyncIterator[pps_pb2.PipelineInfo]:
+        """Lists pipelines. See :meth:`.PPSMixin.list_pipeline`."""
+        if isinstance(projects_filter, Iterable):
+            projects_filter = [pfs_pb2.Project(name=p.name) for p in projects_filter]
+        message = pps_pb2.ListPipelineRequest(
+            details=details,
+            history=history,
+            jqFilter=jqFilter,
+            commit_set=commit_set,
+            projects=projects_filter,
+        )
+        return self.__stub.ListPipeline(message)
+
+    async def delete_pipeline(
+        self,
+        pipeline_name: str,
+        force: bool = False,
+        keep_repo: bool = False,
+        project_name: str = None,
+    ) -> None:
+        """Deletes a pipeline. See :meth:`.PPSMixin.delete_pipeline`."""
+        message = pps_pb2.DeletePipelineRequest(
+            force=force,
+            keep_repo=keep_repo,
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+        )
+        await self.__stub.DeletePipeline(message)
+
+    async def delete_all_pipelines(self) -> None:
+        """Deletes all pipelines. See :meth:`.PPSMixin.delete_all_pipelines`."""
+        message = empty_pb2.Empty()
+        await self.__stub.DeleteAll(message)
+
+    async def start_pipeline(
+        self, pipeline_name: str, project_name: str = None
+    ) -> None:
+        """Starts a pipeline. See :meth:`.PPSMixin.start_pipeline`."""
+        message = pps_pb2.StartPipelineRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+        )
+        await self.__stub.StartPipeline(message)
+
+    async def stop_pipeline(self, pipeline_name: str, project_name: str = None) -> None:
+        """Stops a pipeline. See :meth:`.PPSMixin.stop_pipeline`."""
+        message = pps_pb2.StopPipelineRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+        )
+        await self.__stub.StopPipeline(message)
+
+    async def run_cron(self, pipeline_name: str, project_name: str = None) -> None:
+        """Triggers a cron pipeline to run now.
+        See :meth:`.PPSMixin.run_cron`.
+        """
+        message = pps_pb2.RunCronRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+        )
+        await self.__stub.RunCron(message)
+
+    async def create_secret(
+        self,
+        secret_name: str,
+        data: Dict[str, Union[str, bytes]],
+        labels: Dict[str, str] = None,
+        annotations: Dict[str, str] = None,
+    ) -> None:
+        """Creates a new secret. See :meth:`.PPSMixin.create_secret`."""
+        encoded_data = {}
+        for k, v in data.items():
+            if isinstance(v, str):
+                v = v.encode("utf8")
+            encoded_data[k] = base64.b64encode(v).decode("utf8")
+
+        file = json.dumps(
+            {
+                "kind": "Secret",
+                "apiVersion": "v1",
+                "metadata": {
+                    "name": secret_name,
+                    "labels": labels,
+                    "annotations": annotations,
+                },
+                "data": encoded_data,
+            }
+        ).encode("utf8")
+
+        message = pps_pb2.CreateSecretRequest(file=file)
+        await self.__stub.CreateSecret(message)
+
+    async def delete_secret(self, secret_name: str) -> None:
+        """Deletes a secret. See :meth:`.PPSMixin.delete_secret`."""
+        message = pps_pb2.DeleteSecretRequest(secret=pps_pb2.Secret(name=secret_name))
+        await self.__stub.DeleteSecret(message)
+
+    async def list_secret(self) -> List[pps_pb2.SecretInfo]:
+        """Lists secrets. See :meth:`.PPSMixin.list_secret`."""
+        message = empty_pb2.Empty()
+        return (await self.__stub.ListSecret(message)).secret_info
+
+    async def inspect_secret(self, secret_name: str) -> pps_pb2.SecretInfo:
+        """Inspects a secret. See :meth:`.PPSMixin.inspect_secret`."""
+        message = pps_pb2.InspectSecretRequest(secret=pps_pb2.Secret(name=secret_name))
+        return await self.__stub.InspectSecret(message)
+
+    def get_pipeline_logs(
+        self,
+        pipeline_name: str,
+        project_name: str = None,
+        data_filters: List[str] = None,
+        master: bool = False,
+        datum: pps_pb2.Datum = None,
+        follow: bool = False,
+        tail: int = 0,
+        use_loki_backend: bool = False,
+        since: duration_pb2.Duration = None,
+    ) -> AsyncIterator[pps_pb2.LogMessage]:
+        """Gets logs for a pipeline. See :meth:`.PPSMixin.get_pipeline_logs`.
+
+        Examples
+        --------
+        >>> async for log in client.get_pipeline_logs("foo", follow=True):
+        >>>     print(log.message)
+        """
+        message = pps_pb2.GetLogsRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+            data_filters=data_filters,
+            master=master,
+            datum=datum,
+            follow=follow,
+            tail=tail,
+            use_loki_backend=use_loki_backend,
+            since=since,
+        )
+        return self.__stub.GetLogs(message)
+
+    def get_job_logs(
+        self,
+        pipeline_name: str,
+        job_id: str,
+        project_name: str = None,
+        data_filters: List[str] = None,
+        datum: pps_pb2.Datum = None,
+        follow: bool = False,
+        tail: int = 0,
+        use_loki_backend: bool = False,
+        since: duration_pb2.Duration = None,
+    ) -> AsyncIterator[pps_pb2.LogMessage]:
+        """Gets logs for a job. See :meth:`.PPSMixin.get_job_logs`."""
+        message = pps_pb2.GetLogsRequest(
+            job=pps_pb2.Job(
+                pipeline=pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                ),
+                id=job_id,
+            ),
+            data_filters=data_filters,
+            datum=datum,
+            follow=follow,
+            tail=tail,
+            use_loki_backend=use_loki_backend,
+            since=since,
+        )
+        return self.__stub.GetLogs(message)
+
+    def get_kube_events(
+        self, since: duration_pb2.Duration
+    ) -> AsyncIterator[pps_pb2.LokiLogMessage]:
+        """Return a stream of Kubernetes events.
+        See :meth:`.PPSMixin.get_kube_events`.
+        """
+        message = pps_pb2.LokiRequest(since=since)
+        return self.__stub.GetKubeEvents(message)
+
+    def query_loki(
+        self, query: str, since: duration_pb2.Duration = None
+    ) -> AsyncIterator[pps_pb2.LokiLogMessage]:
+        """Returns a stream of loki log messages given a query string.
+        See :meth:`.PPSMixin.query_loki`.
+        """
+        message = pps_pb2.LokiRequest(query=query, since=since)
+        return self.__stub.QueryLoki(message)
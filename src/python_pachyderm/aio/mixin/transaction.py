@@ -0,0 +1,105 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Union
+
+import grpc
+
+from python_pachyderm.mixin.transaction import _transaction_from
+from python_pachyderm.proto.v2.transaction import transaction_pb2, transaction_pb2_grpc
+
+
+class AsyncTransactionMixin:
+    """An async mixin for transaction-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = transaction_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def batch_transaction(
+        self, requests: List[transaction_pb2.TransactionRequest]
+    ) -> transaction_pb2.TransactionInfo:
+        """Executes a batch transaction.
+        See :meth:`.TransactionMixin.batch_transaction`.
+        """
+        message = transaction_pb2.BatchTransactionRequest(requests=requests)
+        return await self.__stub.BatchTransaction(message)
+
+    async def start_transaction(self) -> transaction_pb2.Transaction:
+        """Starts a transaction.
+        See :meth:`.TransactionMixin.start_transaction`.
+        """
+        message = transaction_pb2.StartTransactionRequest()
+        return await self.__stub.StartTransaction(message)
+
+    async def inspect_transaction(
+        self, transaction: Union[str, transaction_pb2.Transaction]
+    ) -> transaction_pb2.TransactionInfo:
+        """Inspects a transaction.
+        See :meth:`.TransactionMixin.inspect_transaction`.
+        """
+        message = transaction_pb2.InspectTransactionRequest(
+            transaction=_transaction_from(transaction),
+        )
+        return await self.__stub.InspectTransaction(message)
+
+    async def delete_transaction(
+        self, transaction: Union[str, transaction_pb2.Transaction]
+    ) -> None:
+        """Deletes a transaction.
+        See :meth:`.TransactionMixin.delete_transaction`.
+        """
+        message = transaction_pb2.DeleteTransactionRequest(
+            transaction=_transaction_from(transaction),
+        )
+        await self.__stub.DeleteTransaction(message)
+
+    async def delete_all_transactions(self) -> None:
+        """Deletes all transactions.
+        See :meth:`.TransactionMixin.delete_all_transactions`.
+        """
+        message = transaction_pb2.DeleteAllRequest()
+        await self.__stub.DeleteAll(message)
+
+    async def list_transaction(self) -> List[transaction_pb2.TransactionInfo]:
+        """Lists unfinished transactions.
+        See :meth:`.TransactionMixin.list_transaction`.
+        """
+        message = transaction_pb2.ListTransactionRequest()
+        return (await self.__stub.ListTransaction(message)).transaction_info
+
+    async def finish_transaction(
+        self, transaction: Union[str, transaction_pb2.Transaction]
+    ) -> transaction_pb2.TransactionInfo:
+        """Finishes a transaction.
+        See :meth:`.TransactionMixin.finish_transaction`.
+        """
+        message = transaction_pb2.FinishTransactionRequest(
+            transaction=_transaction_from(transaction)
+        )
+        return await self.__stub.FinishTransaction(message)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[transaction_pb2.Transaction]:
+        """An async context manager for running operations within a
+        transaction. See :meth:`.TransactionMixin.transaction`.
+
+        Examples
+        --------
+        >>> async with client.transaction() as t:
+        >>>     c1 = await client.start_commit("foo", "master")
+        >>>     c2 = await client.start_commit("bar", "master")
+        """
+        old_transaction_id = self.transaction_id
+        transaction = await self.start_transaction()
+        self.transaction_id = transaction.id
+
+        try:
+            yield transaction
+        except Exception:
+            await self.delete_transaction(transaction)
+            raise
+        else:
+            await self.finish_transaction(transaction)
+        finally:
+            self.transaction_id = old_transaction_id
@@ -0,0 +1,21 @@
+import grpc
+from google.protobuf import empty_pb2
+
+from python_pachyderm.proto.v2.version.versionpb import version_pb2, version_pb2_grpc
+
+
+class AsyncVersionMixin:
+    """An async mixin for version-related functionality."""
+
+    _channel: grpc.aio.Channel
+
+    def __init__(self):
+        self.__stub = version_pb2_grpc.APIStub(self._channel)
+        super().__init__()
+
+    async def get_remote_version(self) -> version_pb2.Version:
+        """Gets version of Pachyderm server.
+        See :meth:`.VersionMixin.get_remote_version`.
+        """
+        message = empty_pb2.Empty()
+        return await self.__stub.GetVersion(message)
@@ -0,0 +1,344 @@
+"""
+Client-side caches. Pass a :class:`.FileCache` as ``Client(file_cache=...)``
+to have :meth:`~.PFSMixin.get_file` read files of finished commits through
+it. Files of finished commits never change, so an entry is keyed by the
+commit ID and path and never goes stale; files of open commits, and reads
+of branches whose head is open, always go to pachd.
+
+Entries are stored as one file each in a directory, which several
+processes may share, and are evicted least recently used first once the
+cache outgrows its size limit. Cache hits are memory-mapped rather than
+read into memory.
+
+>>> from python_pachyderm.cache import FileCache
+>>> cache = FileCache("/tmp/pfs-cache", max_bytes=10 * 1024**3)
+>>> client = python_pachyderm.Client(file_cache=cache)
+>>> client.get_file(("images", "master"), "/1.png").read()  # from pachd
+>>> client.get_file(("images", "master"), "/1.png").read()  # from the cache
+
+Pass a :class:`.MetadataCache` as ``Client(metadata_cache=...)`` to have
+``inspect_repo``, ``inspect_branch`` and ``inspect_commit`` answered from
+memory where possible.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple, Union
+
+from python_pachyderm.proto.v2.pfs import pfs_pb2
+from python_pachyderm.pfs import commit_repo
+
+# The default size limit of a cache, in bytes.
+DEFAULT_MAX_BYTES = 4 * 1024**3
+# The suffix of entries that are still being written.
+_PARTIAL_SUFFIX = ".partial"
+# How long, in seconds, a MetadataCache keeps repos and branches by default.
+DEFAULT_TTL = 5.0
+
+
+class FileCache:
+    """An on-disk, size-limited LRU cache of the contents of files of
+    finished commits. Thread-safe, so one cache can be shared by several
+    clients.
+
+    Parameters
+    ----------
+    directory : Union[str, os.PathLike]
+        The directory to store entries in. It is created if it does not
+        exist, and may be shared with other processes.
+    max_bytes : int, optional
+        The size limit of the cache. Files larger than this are not cached.
+        Each process enforces the limit when it adds an entry, so the cache
+        may briefly exceed it while several processes write to it.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups that found an entry.
+    misses : int
+        The number of lookups that did not.
+    """
+
+    def __init__(
+        self, directory: Union[str, os.PathLike], max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # The size of the entries, or None until the directory is scanned.
+        self._size: Optional[int] = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(file: pfs_pb2.File) -> str:
+        """Returns the key of the entry for `file`, whose commit must be
+        referenced by ID.
+        """
+        commit = file.commit
+        # Commit IDs are shared by the commits of a commit set, i.e. across
+        # repos, so the repo is part of the key.
+        repo = commit_repo(commit)
+        path = "/" + file.path.lstrip("/")
+        name = "{}/{}.{}@{}:{}?{}".format(
+            repo.project.name or "default",
+            repo.name,
+            repo.type or "user",
+            commit.id,
+            path,
+            file.datum,
+        )
+        return hashlib.sha256(name.encode()).hexdigest()
+
+    def open(self, key: str) -> Optional[Union[mmap.mmap, bytes]]:
+        """Returns the entry for `key`, memory-mapped, or None if there is
+        none. Empty entries are returned as ``b""``, which cannot be mapped.
+        """
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                data = (
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+                )
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # Marks the entry as recently used, for other processes too.
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # Evicted since, but the mapping stays valid.
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def tee(self, key: str, stream: Iterator) -> Iterator:
+        """Wraps a GetFile response `stream` so that the content is added to
+        the cache as `key` once the stream is read to the end. Nothing is
+        added if the stream fails or is cancelled first.
+        """
+        return _TeeStream(self, key, stream)
+
+    @property
+    def size_bytes(self) -> int:
+        """The total size of the entries."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, _, size in self._entries())
+            return self._size
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                _remove(path)
+            self._size = 0
+
+    def _add(self, key: str, partial_path: str, size: int) -> None:
+        os.replace(partial_path, os.path.join(self.directory, key))
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            if self._size is None or self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Rescans the directory, as other processes may have added or removed
+        # entries, and removes the least recently used until within the limit.
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if self._size <= self.max_bytes:
+                break
+            _remove(path)
+            self._size -= size
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """Returns the path, last use and size of each entry."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(_PARTIAL_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+
+class MetadataCache:
+    """An in-memory cache of the results of ``inspect_repo``,
+    ``inspect_branch`` and ``inspect_commit``. Thread-safe, so one cache can
+    be shared by several clients.
+
+    Finished commits inspected by ID never change, so they are kept until
+    evicted. Everything else, i.e. repos, branches, open commits, and
+    commits inspected by branch, is kept for `ttl` seconds. Writes made
+    through a client with the cache (e.g. ``create_branch``,
+    ``finish_commit``, ``delete_repo`` or uploading files) drop the entries
+    of the repo they write to; writes made elsewhere, including by
+    pipelines, are seen once entries expire.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        How long to keep entries that may change, in seconds.
+    max_entries : int, optional
+        The most entries to keep. The least recently used are evicted first.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups that found an entry.
+    misses : int
+        The number of lookups that did not.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Maps keys to their expiry, on the time.monotonic() clock, and value.
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        # The keys of the entries of each repo, by project and repo name.
+        self._keys: Dict[Tuple[str, str], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def repo_key(repo: pfs_pb2.Repo) -> Tuple[str, str, str]:
+        """Returns the project, name and type identifying `repo`."""
+        return (repo.project.name or "default", repo.name, repo.type or "user")
+
+    def get(self, key: Tuple) -> Optional[object]:
+        """Returns a copy of the entry for `key`, or None if there is none or
+        it expired. The second element of `key` must be a :meth:`repo_key`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        value = type(entry[1])()
+        value.CopyFrom(entry[1])
+        return value
+
+    def put(self, key: Tuple, value, permanent: bool = False) -> None:
+        """Adds a copy of `value` as `key`, for :attr:`ttl` seconds or, if
+        `permanent`, until it is evicted or its repo is deleted.
+        """
+        copy = type(value)()
+        copy.CopyFrom(value)
+        expiry = float("inf") if permanent else time.monotonic() + self.ttl
+        repo = key[1][:2]
+        with self._lock:
+            self._entries[key] = (expiry, copy)
+            self._entries.move_to_end(key)
+            self._keys.setdefault(repo, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, repo: pfs_pb2.Repo, permanent: bool = False) -> None:
+        """Drops the entries of `repo` (of any type) that may have changed,
+        and, if `permanent`, also its finished commits.
+        """
+        with self._lock:
+            for key in list(self._keys.get(self.repo_key(repo)[:2], ())):
+                if permanent or self._entries[key][0] != float("inf"):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        """Drops all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+
+    def _remove(self, key: Tuple) -> None:
+        del self._entries[key]
+        repo = key[1][:2]
+        keys = self._keys[repo]
+        keys.discard(key)
+        if not keys:
+            del self._keys[repo]
+
+
+class _TeeStream:
+    """A GetFile response stream that writes the content it yields to a
+    partial cache entry, and adds the entry once it is read to the end.
+    """
+
+    def __init__(self, cache: FileCache, key: str, stream: Iterator):
+        self._cache = cache
+        self._key = key
+        self._stream = stream
+        fd, self._path = tempfile.mkstemp(dir=cache.directory, suffix=_PARTIAL_SUFFIX)
+        self._file = os.fdopen(fd, "wb")
+        self._size = 0
+        # Removes the partial entry if the stream is dropped unfinished.
+        self._cleanup = weakref.finalize(self, _discard, self._file, self._path)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            message = next(self._stream)
+        except StopIteration:
+            self._finish()
+            raise
+        except BaseException:
+            self._cleanup()
+            raise
+        if self._cleanup.alive:
+            self._size += len(message.value)
+            if self._size > self._cache.max_bytes:
+                self._cleanup()
+            else:
+                self._file.write(message.value)
+        return message
+
+    def cancel(self) -> bool:
+        self._cleanup()
+        cancel = getattr(self._stream, "cancel", None)
+        return cancel() if cancel is not None else False
+
+    def _finish(self) -> None:
+        if not self._cleanup.alive:
+            return
+        self._cleanup.detach()
+        try:
+            self._file.close()
+            self._cache._add(self._key, self._path, self._size)
+        except OSError:
+            _remove(self._path)
+
+
+def _discard(file, path: str) -> None:
+    file.close()
+    _remove(path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,15 +1,25 @@
+from __future__ import annotations
+
 import os
 import json
 import ssl
+import threading
 from base64 import b64decode
 from pathlib import Path
-from typing import Optional, TextIO
+from typing import TYPE_CHECKING, Callable, Dict, Optional, TextIO, Tuple, Union
 from urllib.parse import urlparse
 
 import grpc
 
 from .errors import AuthServiceNotActivated
-from .interceptor import MetadataClientInterceptor, MetadataType
+from .interceptor import (
+    MetadataClientInterceptor,
+    MetadataType,
+    MetricsClientInterceptor,
+    StreamingCompressionClientInterceptor,
+)
+from .cache import FileCache, MetadataCache
+from .metrics import MetricsSink
 from .mixin.admin import AdminMixin
 from .mixin.auth import AuthMixin
 from .mixin.debug import DebugMixin
@@ -21,8 +31,10 @@ from .mixin.pfs import PFSMixin
 from .mixin.pps import PPSMixin
 from .mixin.transaction import TransactionMixin
 from .mixin.version import VersionMixin
-from .mixin.worker import WorkerMixin as _WorkerStub
-from .service import Service, GRPC_CHANNEL_OPTIONS
+from .service import ChannelOptions, Service, GRPC_CHANNEL_OPTIONS
+
+if TYPE_CHECKING:
+    from .mixin.worker import WorkerMixin as _WorkerStub
 
 
 class ConfigError(Exception):
@@ -82,6 +94,11 @@ class Client(
         transaction_id: str = None,
         tls: bool = None,
         use_default_host: bool = True,
+        share_channel: bool = True,
+        channel_options: ChannelOptions = None,
+        metrics: MetricsSink = None,
+        file_cache: FileCache = None,
+        metadata_cache: MetadataCache = None,
     ):
         """
         Creates a Pachyderm client. If host and port are unset, checks the
@@ -108,6 +125,26 @@ class Client(
             used. Otherwise, we use the certs provided by certifi.
         use_default_host : bool, optional
             Whether to replicate `pachctl` behavior of searching for config.
+        share_channel : bool, optional
+            Whether to share the gRPC channel (and so the HTTP/2 connection)
+            with other clients connecting to the same address with the same
+            certs. The channel is closed once all clients using it are closed.
+        channel_options : ChannelOptions, optional
+            Keepalive, message size, compression and retry settings for the
+            gRPC channel. See :class:`.ChannelOptions`.
+        metrics : Callable[[RPCStats], None], optional
+            A sink that is passed the latency, message and byte counts, and
+            status of every RPC the client makes. See
+            :mod:`python_pachyderm.metrics`. No instrumentation is installed
+            if unset.
+        file_cache : FileCache, optional
+            A local cache that :meth:`~.PFSMixin.get_file` reads files of
+            finished commits through. See :mod:`python_pachyderm.cache`.
+        metadata_cache : MetadataCache, optional
+            A cache that ``inspect_repo``, ``inspect_branch`` and
+            ``inspect_commit`` are answered from where possible, and that
+            writes through this client invalidate. See
+            :class:`.MetadataCache`.
 
         Examples
         --------
@@ -115,6 +152,10 @@ class Client(
         ...
         >>> # Manually set host and port
         >>> client = python_pachyderm.Client("pachd.example.com", 12345)
+        ...
+        >>> # Close the client's channel when done
+        >>> with python_pachyderm.Client() as client:
+        >>>     client.create_repo("foo")
         """
 
         if root_certs is not None:
@@ -160,26 +201,57 @@ class Client(
 
         self.address = "{}:{}".format(host, port)
         self.root_certs = root_certs
-        channel = _create_channel(
-            self.address, self.root_certs, options=GRPC_CHANNEL_OPTIONS
-        )
+        self.channel_options = channel_options or ChannelOptions()
+        options = self.channel_options.to_grpc_options()
+        compression = self.channel_options.compression
+        self._share_channel = share_channel
+        if share_channel:
+            channel = _channel_pool.acquire(
+                self.address, self.root_certs, options, compression
+            )
+        else:
+            channel = _create_channel(
+                self.address, self.root_certs, options, compression
+            )
+        self._base_channel: Optional[grpc.Channel] = channel
+        self.metrics = metrics
+        self.file_cache = file_cache
+        self.metadata_cache = metadata_cache
+        if metrics is not None:
+            channel = grpc.intercept_channel(channel, MetricsClientInterceptor(metrics))
 
         self._stubs = {}
+        self._methods = {}
         self._auth_token = auth_token
         self._transaction_id = transaction_id
         self._metadata = self._build_metadata()
-        self._channel = _apply_metadata_interceptor(channel, self._metadata)
-        if not auth_token and os.environ.get("PACH_PYTHON_OIDC_TOKEN"):
-            resp = self.authenticate_id_token(os.environ.get("PACH_PYTHON_OIDC_TOKEN"))
-            self._auth_token = resp
-            self._metadata = self._build_metadata()
-            self._channel = _apply_metadata_interceptor(channel, self._metadata)
+        # The interceptor reads self._metadata on every call, so changing the
+        # auth token or transaction does not require a new channel.
+        self._channel = _apply_metadata_interceptor(channel, lambda: self._metadata)
+        if self.channel_options.streaming_compression is not None:
+            self._channel = grpc.intercept_channel(
+                self._channel,
+                StreamingCompressionClientInterceptor(
+                    self.channel_options.streaming_compression
+                ),
+            )
         super().__init__()  # Initialize all the Mixin classes.
         self._worker: Optional[_WorkerStub] = None
+        self._worker_channel: Optional[grpc.Channel] = None
+        if not auth_token and os.environ.get("PACH_PYTHON_OIDC_TOKEN"):
+            self.auth_token = self.authenticate_id_token(
+                os.environ.get("PACH_PYTHON_OIDC_TOKEN")
+            )
 
     @classmethod
     def new_in_cluster(
-        cls, auth_token: str = None, transaction_id: str = None
+        cls,
+        auth_token: str = None,
+        transaction_id: str = None,
+        channel_options: ChannelOptions = None,
+        metrics: MetricsSink = None,
+        file_cache: FileCache = None,
+        metadata_cache: MetadataCache = None,
     ) -> "Client":
         """Creates a Pachyderm client that operates within a Pachyderm cluster.
 
@@ -190,6 +262,16 @@ class Client(
             cluster.
         transaction_id : str, optional
             The ID of the transaction to run operations on.
+        channel_options : ChannelOptions, optional
+            Settings for the gRPC channel. See :class:`.ChannelOptions`.
+        metrics : Callable[[RPCStats], None], optional
+            A sink for per-RPC metrics. See :mod:`python_pachyderm.metrics`.
+        file_cache : FileCache, optional
+            A local cache for files of finished commits. See
+            :mod:`python_pachyderm.cache`.
+        metadata_cache : MetadataCache, optional
+            A cache for repo, branch and commit info. See
+            :class:`.MetadataCache`.
 
         Returns
         -------
@@ -223,6 +305,10 @@ class Client(
             auth_token=auth_token,
             transaction_id=transaction_id,
             use_default_host=False,
+            channel_options=channel_options,
+            metrics=metrics,
+            file_cache=file_cache,
+            metadata_cache=metadata_cache,
         )
 
     @classmethod
@@ -232,6 +318,10 @@ class Client(
         auth_token: str = None,
         root_certs: bytes = None,
         transaction_id: str = None,
+        channel_options: ChannelOptions = None,
+        metrics: MetricsSink = None,
+        file_cache: FileCache = None,
+        metadata_cache: MetadataCache = None,
     ) -> "Client":
         """Creates a Pachyderm client from a given pachd address.
 
@@ -247,6 +337,16 @@ class Client(
             this will load default certs from certifi.
         transaction_id : str, optional
             The ID of the transaction to run operations on.
+        channel_options : ChannelOptions, optional
+            Settings for the gRPC channel. See :class:`.ChannelOptions`.
+        metrics : Callable[[RPCStats], None], optional
+            A sink for per-RPC metrics. See :mod:`python_pachyderm.metrics`.
+        file_cache : FileCache, optional
+            A local cache for files of finished commits. See
+            :mod:`python_pachyderm.cache`.
+        metadata_cache : MetadataCache, optional
+            A cache for repo, branch and commit info. See
+            :class:`.MetadataCache`.
 
         Returns
         -------
@@ -273,16 +373,37 @@ class Client(
             transaction_id=transaction_id,
             tls=u.scheme == "grpcs" or u.scheme == "https",
             use_default_host=False,
+            channel_options=channel_options,
+            metrics=metrics,
+            file_cache=file_cache,
+            metadata_cache=metadata_cache,
         )
 
     @classmethod
-    def new_from_config(cls, config_file: TextIO) -> "Client":
+    def new_from_config(
+        cls,
+        config_file: TextIO,
+        channel_options: ChannelOptions = None,
+        metrics: MetricsSink = None,
+        file_cache: FileCache = None,
+        metadata_cache: MetadataCache = None,
+    ) -> "Client":
         """Creates a Pachyderm client from a config file-like object.
 
         Parameters
         ----------
         config_file : TextIO
             A file-like object containing the config json file.
+        channel_options : ChannelOptions, optional
+            Settings for the gRPC channel. See :class:`.ChannelOptions`.
+        metrics : Callable[[RPCStats], None], optional
+            A sink for per-RPC metrics. See :mod:`python_pachyderm.metrics`.
+        file_cache : FileCache, optional
+            A local cache for files of finished commits. See
+            :mod:`python_pachyderm.cache`.
+        metadata_cache : MetadataCache, optional
+            A cache for repo, branch and commit info. See
+            :class:`.MetadataCache`.
 
         Returns
         -------
@@ -327,6 +448,10 @@ class Client(
             auth_token=auth_token,
             root_certs=root_certs,
             transaction_id=transaction_id,
+            channel_options=channel_options,
+            metrics=metrics,
+            file_cache=file_cache,
+            metadata_cache=metadata_cache,
         )
 
         context = cls._get_active_context(config)
@@ -452,13 +577,6 @@ class Client(
     def auth_token(self, value):
         self._auth_token = value
         self._metadata = self._build_metadata()
-        self._channel = _apply_metadata_interceptor(
-            channel=_create_channel(
-                self.address, self.root_certs, options=GRPC_CHANNEL_OPTIONS
-            ),
-            metadata=self._metadata,
-        )
-        super().__init__()
 
     @property
     def transaction_id(self):
@@ -468,13 +586,6 @@ class Client(
     def transaction_id(self, value):
         self._transaction_id = value
         self._metadata = self._build_metadata()
-        self._channel = _apply_metadata_interceptor(
-            channel=_create_channel(
-                self.address, self.root_certs, options=GRPC_CHANNEL_OPTIONS
-            ),
-            metadata=self._metadata,
-        )
-        super().__init__()
 
     @property
     def worker(self) -> _WorkerStub:
@@ -492,15 +603,39 @@ class Client(
                     f"Cannot connect to the worker since {worker_port_env} is not set. "
                     "Are you running inside a pipeline?"
                 )
+            from .mixin.worker import WorkerMixin as _WorkerStub
+
             # Note: This channel doe not go through the metadata interceptor.
-            channel = _create_channel(
+            self._worker_channel = _create_channel(
                 address=f"localhost:{port}",
                 root_certs=None,
                 options=GRPC_CHANNEL_OPTIONS,
             )
-            self._worker = _WorkerStub(channel)
+            self._worker = _WorkerStub(self._worker_channel)
         return self._worker
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, val, tb):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the client's gRPC channels. A channel shared with other
+        clients is only closed once all of them are closed. Calling this
+        more than once has no effect.
+        """
+        if self._base_channel is not None:
+            if self._share_channel:
+                _channel_pool.release(self._base_channel)
+            else:
+                self._base_channel.close()
+            self._base_channel = None
+        if self._worker_channel is not None:
+            self._worker_channel.close()
+            self._worker_channel = None
+            self._worker = None
+
     def _build_metadata(self):
         metadata = []
         if self._auth_token is not None:
@@ -510,39 +645,43 @@ class Client(
         return metadata
 
     def _req(self, grpc_service: Service, grpc_method_name, req=None, **kwargs):
-        stub = self._stubs.get(grpc_service)
-        if stub is None:
-            grpc_module = grpc_service.grpc_module
-            if self.root_certs:
-                ssl_channel_credentials = grpc_module.grpc.ssl_channel_credentials
-                ssl = ssl_channel_credentials(root_certificates=self.root_certs)
-                channel = grpc_module.grpc.secure_channel(
-                    self.address,
-                    ssl,
-                    options=grpc_service.options,
-                )
-            else:
-                channel = grpc_module.grpc.insecure_channel(
-                    self.address,
-                    options=grpc_service.options,
-                )
-            stub = grpc_service.stub(channel)
-            self._stubs[grpc_service] = stub
+        method = self._methods.get((grpc_service, grpc_method_name))
+        if method is None:
+            method = self._resolve_method(grpc_service, grpc_method_name)
+            self._methods[(grpc_service, grpc_method_name)] = method
+        grpc_method, req_cls = method
 
         assert req is None or len(kwargs) == 0
-        assert self._metadata is not None
 
         if req is None:
-            proto_module = grpc_service.proto_module
-            if grpc_method_name.endswith("Stream"):
-                req_cls_name_prefix = grpc_method_name[:-6]
-            else:
-                req_cls_name_prefix = grpc_method_name
-            req_cls = getattr(proto_module, "{}Request".format(req_cls_name_prefix))
+            if req_cls is None:
+                raise AttributeError(
+                    "no request class for {}.{}".format(
+                        grpc_service.name, grpc_method_name
+                    )
+                )
             req = req_cls(**kwargs)
 
-        grpc_method = getattr(stub, grpc_method_name)
-        return grpc_method(req, metadata=self._metadata)
+        # Metadata is added by the channel's interceptor.
+        return grpc_method(req)
+
+    def _resolve_method(self, grpc_service: Service, grpc_method_name: str):
+        """Looks up the stub method and request class used by `_req`. Stubs
+        are created on the client's main channel.
+        """
+        stub = self._stubs.get(grpc_service)
+        if stub is None:
+            stub = grpc_service.stub(self._channel)
+            self._stubs[grpc_service] = stub
+
+        if grpc_method_name.endswith("Stream"):
+            req_cls_name_prefix = grpc_method_name[:-6]
+        else:
+            req_cls_name_prefix = grpc_method_name
+        req_cls = getattr(
+            grpc_service.proto_module, "{}Request".format(req_cls_name_prefix), None
+        )
+        return getattr(stub, grpc_method_name), req_cls
 
     def delete_all(self) -> None:
         """Delete all repos, commits, files, pipelines, and jobs. This resets
@@ -572,7 +711,8 @@ class Client(
 
 
 def _apply_metadata_interceptor(
-    channel: grpc.Channel, metadata: MetadataType
+    channel: grpc.Channel,
+    metadata: Union[MetadataType, Callable[[], MetadataType]],
 ) -> grpc.Channel:
     metadata_interceptor = MetadataClientInterceptor(metadata)
     return grpc.intercept_channel(channel, metadata_interceptor)
@@ -582,8 +722,54 @@ def _create_channel(
     address: str,
     root_certs: Optional[bytes],
     options: MetadataType,
+    compression: Optional[grpc.Compression] = None,
 ) -> grpc.Channel:
     if root_certs is not None:
         ssl = grpc.ssl_channel_credentials(root_certificates=root_certs)
-        return grpc.secure_channel(address, ssl, options=options)
-    return grpc.insecure_channel(address, options=options)
+        return grpc.secure_channel(
+            address, ssl, options=options, compression=compression
+        )
+    return grpc.insecure_channel(address, options=options, compression=compression)
+
+
+class _ChannelPool:
+    """Shares one channel, and so one HTTP/2 connection, between all clients
+    connecting to the same address with the same certs and options. Channels
+    are reference counted and closed when their last client releases them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels: Dict[Tuple, grpc.Channel] = {}
+        self._keys: Dict[grpc.Channel, Tuple] = {}
+        self._refcounts: Dict[Tuple, int] = {}
+
+    def acquire(
+        self,
+        address: str,
+        root_certs: Optional[bytes],
+        options: MetadataType,
+        compression: Optional[grpc.Compression] = None,
+    ) -> grpc.Channel:
+        key = (address, root_certs, tuple(options), compression)
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = _create_channel(address, root_certs, options, compression)
+                self._channels[key] = channel
+                self._keys[channel] = key
+                self._refcounts[key] = 0
+            self._refcounts[key] += 1
+            return channel
+
+    def release(self, channel: grpc.Channel) -> None:
+        with self._lock:
+            key = self._keys[channel]
+            self._refcounts[key] -= 1
+            if self._refcounts[key] > 0:
+                return
+            del self._channels[key], self._keys[channel], self._refcounts[key]
+        channel.close()
+
+
+_channel_pool = _ChannelPool()
@@ -3,6 +3,7 @@ from typing import Union
 
 from grpc import RpcError
 from grpc._channel import _InactiveRpcError
+from grpc.aio import AioRpcError
 
 
 class AuthServiceNotActivated(ConnectionError):
@@ -10,7 +11,7 @@ class AuthServiceNotActivated(ConnectionError):
 
     @classmethod
     def try_from(cls, error: RpcError) -> Union["AuthServiceNotActivated", RpcError]:
-        if isinstance(error, _InactiveRpcError):
+        if isinstance(error, (_InactiveRpcError, AioRpcError)):
             details = error.details()
             if "the auth service is not activated" in details:
                 return cls(details)
@@ -1,21 +1,39 @@
+import threading
+import time
 from os import environ
-from typing import Any, Callable, List, Optional, Tuple
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
 
 import grpc
 from grpc_interceptor import ClientCallDetails, ClientInterceptor
 
+from .metrics import MetricsSink, RPCStats
+
 MetadataType = List[Tuple[str, str]]
 
 
 class MetadataClientInterceptor(ClientInterceptor):
-    def __init__(self, metadata: MetadataType):
-        self.metadata = metadata
+    """Injects metadata into every call made on a channel.
+
+    `metadata` is either a fixed list of key/value pairs or a function
+    returning one. A function is called on each call, so the metadata (e.g.
+    the auth token) can change without re-creating the channel.
+    """
+
+    def __init__(self, metadata: Union[MetadataType, Callable[[], MetadataType]]):
+        if callable(metadata):
+            self.metadata_provider = metadata
+        else:
+            self.metadata_provider = lambda: metadata
+
+    @property
+    def metadata(self) -> MetadataType:
+        return self.metadata_provider()
 
     def intercept(
         self, method: Callable, request: Any, call_details: ClientCallDetails
     ):
         call_details_metadata = list(call_details.metadata or [])
-        call_details_metadata.extend(self.metadata)
+        call_details_metadata.extend(self.metadata_provider())
         new_details = ClientCallDetails(
             compression=call_details.compression,
             credentials=call_details.credentials,
@@ -34,6 +52,8 @@ def _check_connection_error(grpc_future: grpc.Future):
     """Callback function that checks if a gRPC.Future experienced a
     ConnectionError and attempt to sanitize the error message for the user.
     """
+    if grpc_future.cancelled():
+        return
     error: Optional[grpc.Call] = grpc_future.exception()
     if error is not None:
         unable_to_connect = "failed to connect to all addresses" in error.details()
@@ -47,3 +67,221 @@ def _check_connection_error(grpc_future: grpc.Future):
                 )
             raise ConnectionError(error_message) from error
         raise error
+
+
+class StreamingCompressionClientInterceptor(
+    grpc.StreamUnaryClientInterceptor, grpc.StreamStreamClientInterceptor
+):
+    """Sets the compression of client-streaming calls (i.e. file uploads),
+    unless it was set for the call explicitly.
+    """
+
+    def __init__(self, compression: grpc.Compression):
+        self.compression = compression
+
+    def _details(self, call_details: grpc.ClientCallDetails):
+        if call_details.compression is not None:
+            return call_details
+        return ClientCallDetails(
+            compression=self.compression,
+            credentials=call_details.credentials,
+            metadata=call_details.metadata,
+            method=call_details.method,
+            timeout=call_details.timeout,
+            wait_for_ready=call_details.wait_for_ready,
+        )
+
+    def intercept_stream_unary(self, continuation, call_details, request_iterator):
+        return continuation(self._details(call_details), request_iterator)
+
+    def intercept_stream_stream(self, continuation, call_details, request_iterator):
+        return continuation(self._details(call_details), request_iterator)
+
+
+class MetricsClientInterceptor(
+    grpc.UnaryUnaryClientInterceptor,
+    grpc.UnaryStreamClientInterceptor,
+    grpc.StreamUnaryClientInterceptor,
+    grpc.StreamStreamClientInterceptor,
+):
+    """Reports an :class:`.RPCStats` to `sink` for every call made on a
+    channel, once it completes.
+
+    The sink is called on whichever thread completes the call, i.e. the
+    caller's or a gRPC thread, so it should be quick and must not raise.
+    """
+
+    def __init__(self, sink: MetricsSink):
+        self.sink = sink
+
+    def intercept_unary_unary(self, continuation, call_details, request):
+        rpc = _RPCRecord(self.sink, call_details.method)
+        rpc.sent(request)
+        call = continuation(call_details, request)
+        call.add_done_callback(rpc.finish_unary)
+        return call
+
+    def intercept_unary_stream(self, continuation, call_details, request):
+        rpc = _RPCRecord(self.sink, call_details.method)
+        rpc.sent(request)
+        return _InstrumentedStream(continuation(call_details, request), rpc)
+
+    def intercept_stream_unary(self, continuation, call_details, request_iterator):
+        rpc = _RPCRecord(self.sink, call_details.method)
+        call = continuation(call_details, rpc.count_requests(request_iterator))
+        call.add_done_callback(rpc.finish_unary)
+        return call
+
+    def intercept_stream_stream(self, continuation, call_details, request_iterator):
+        rpc = _RPCRecord(self.sink, call_details.method)
+        call = continuation(call_details, rpc.count_requests(request_iterator))
+        return _InstrumentedStream(call, rpc)
+
+
+class _RPCRecord:
+    """The measurements of one call in flight."""
+
+    __slots__ = (
+        "sink",
+        "method",
+        "start_time",
+        "start",
+        "messages_sent",
+        "messages_received",
+        "bytes_sent",
+        "bytes_received",
+        "finished",
+        "lock",
+    )
+
+    def __init__(self, sink: MetricsSink, method: Union[str, bytes]):
+        self.sink = sink
+        self.method = method.decode() if isinstance(method, bytes) else method
+        self.start_time = time.time()
+        self.start = time.perf_counter()
+        self.messages_sent = self.messages_received = 0
+        self.bytes_sent = self.bytes_received = 0
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def sent(self, request) -> None:
+        self.messages_sent += 1
+        self.bytes_sent += request.ByteSize()
+
+    def received(self, response) -> None:
+        self.messages_received += 1
+        self.bytes_received += response.ByteSize()
+
+    def count_requests(self, requests: Iterator) -> Iterator:
+        for request in requests:
+            self.sent(request)
+            yield request
+
+    def finish_unary(self, future: grpc.Future) -> None:
+        code = future.code()
+        if code == grpc.StatusCode.OK:
+            self.received(future.result())
+        self.finish(code)
+
+    def finish(self, code: grpc.StatusCode) -> None:
+        # A stream can finish both by being read to the end and by its done
+        # callback, from different threads. Only the first one is reported.
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+        self.sink(
+            RPCStats(
+                method=self.method,
+                code=code,
+                start_time=self.start_time,
+                duration=time.perf_counter() - self.start,
+                messages_sent=self.messages_sent,
+                messages_received=self.messages_received,
+                bytes_sent=self.bytes_sent,
+                bytes_received=self.bytes_received,
+            )
+        )
+
+
+class _InstrumentedStream:
+    """Wraps the call object of a response stream, counting the responses as
+    they are read. All other attributes are those of the call.
+    """
+
+    def __init__(self, call, rpc: _RPCRecord):
+        self._call = call
+        self._rpc = rpc
+        # Catches streams that fail or are cancelled before they are read to
+        # the end. Streams that succeed are reported once read to the end, so
+        # the duration includes the time the caller took to consume them.
+        call.add_done_callback(self._done)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self._call)
+        except StopIteration:
+            self._rpc.finish(grpc.StatusCode.OK)
+            raise
+        except grpc.RpcError as error:
+            self._rpc.finish(error.code())
+            raise
+        self._rpc.received(response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._call, name)
+
+    def cancel(self) -> bool:
+        # The done callback of a cancelled call runs later, on a gRPC thread,
+        # and none runs for a stream that already completed but was not read
+        # to the end. Either way, the caller is done with the stream now.
+        cancelled = self._call.cancel()
+        self._rpc.finish(grpc.StatusCode.CANCELLED if cancelled else self.code())
+        return cancelled
+
+    def _done(self, call) -> None:
+        code = call.code()
+        if code != grpc.StatusCode.OK:
+            self._rpc.finish(code)
+
+
+class AsyncMetadataClientInterceptor(
+    grpc.aio.UnaryUnaryClientInterceptor,
+    grpc.aio.UnaryStreamClientInterceptor,
+    grpc.aio.StreamUnaryClientInterceptor,
+    grpc.aio.StreamStreamClientInterceptor,
+):
+    """Injects metadata into every call made on a ``grpc.aio`` channel.
+
+    The metadata is read from `metadata_provider` on each call, so it can
+    change (e.g. a new auth token) without re-creating the channel.
+    """
+
+    def __init__(self, metadata_provider: Callable[[], MetadataType]):
+        self.metadata_provider = metadata_provider
+
+    def _details(self, call_details: grpc.aio.ClientCallDetails):
+        metadata = grpc.aio.Metadata(
+            *(call_details.metadata or ()), *self.metadata_provider()
+        )
+        return call_details._replace(metadata=metadata)
+
+    async def intercept_unary_unary(self, continuation, call_details, request):
+        return await continuation(self._details(call_details), request)
+
+    async def intercept_unary_stream(self, continuation, call_details, request):
+        return await continuation(self._details(call_details), request)
+
+    async def intercept_stream_unary(
+        self, continuation, call_details, request_iterator
+    ):
+        return await continuation(self._details(call_details), request_iterator)
+
+    async def intercept_stream_stream(
+        self, continuation, call_details, request_iterator
+    ):
+        return await continuation(self._details(call_details), request_iterator)
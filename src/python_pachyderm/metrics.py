@@ -0,0 +1,294 @@
+"""
+Per-RPC metrics. Pass a sink as ``Client(metrics=...)`` to have the client
+report an :class:`.RPCStats` for every call it makes. A sink is any
+callable taking an :class:`.RPCStats`; this module provides sinks that
+aggregate in memory, export to Prometheus, or emit OpenTelemetry spans.
+
+Without a sink no instrumentation is installed, so metrics cost nothing
+unless enabled.
+
+>>> from python_pachyderm.metrics import MetricsRecorder
+>>> recorder = MetricsRecorder()
+>>> client = python_pachyderm.Client(metrics=recorder)
+>>> client.inspect_repo("foo")
+>>> recorder.snapshot()["/pfs_v2.API/InspectRepo"].calls
+1
+"""
+import bisect
+import copy
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+import grpc
+
+# The upper bounds, in seconds, of the latency histogram buckets. These are
+# the Prometheus client's defaults, plus buckets for long streams.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+
+class RPCStats(NamedTuple):
+    """The measurements of one completed RPC.
+
+    Attributes
+    ----------
+    method : str
+        The full method name, e.g. ``"/pfs_v2.API/InspectCommit"``.
+    code : grpc.StatusCode
+        The status the call finished with. Streams the caller cancels
+        before they complete (e.g. by closing a ``PFSFile``) finish as
+        ``CANCELLED``.
+    start_time : float
+        When the call started, in seconds since the epoch.
+    duration : float
+        How long the call took, in seconds. For response streams, this is
+        until the caller read the last message.
+    messages_sent : int
+        The number of request messages.
+    messages_received : int
+        The number of response messages read by the caller.
+    bytes_sent : int
+        The serialized size of the request messages.
+    bytes_received : int
+        The serialized size of the response messages read by the caller.
+    """
+
+    method: str
+    code: grpc.StatusCode
+    start_time: float
+    duration: float
+    messages_sent: int
+    messages_received: int
+    bytes_sent: int
+    bytes_received: int
+
+    @property
+    def service(self) -> str:
+        """The service name, e.g. ``"pfs_v2.API"``."""
+        return self.method.split("/")[1]
+
+    @property
+    def name(self) -> str:
+        """The method name without the service, e.g. ``"InspectCommit"``."""
+        return self.method.rsplit("/", 1)[-1]
+
+
+MetricsSink = Callable[[RPCStats], None]
+
+
+class MethodMetrics:
+    """The aggregated metrics of one method, as kept by
+    :class:`.MetricsRecorder`.
+
+    Attributes
+    ----------
+    calls : int
+        The number of completed calls.
+    codes : Counter
+        The number of calls per status code name, e.g. ``{"OK": 3}``.
+    buckets : List[int]
+        The number of calls per latency bucket. ``buckets[i]`` counts the
+        calls that took at most ``bounds[i]`` seconds but longer than
+        ``bounds[i - 1]``; the last counts all slower calls.
+    bounds : Sequence[float]
+        The upper bounds of the latency buckets.
+    total_duration : float
+        The summed duration of all calls, in seconds.
+    messages_sent, messages_received, bytes_sent, bytes_received : int
+        The totals over all calls.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.calls = 0
+        self.codes: Counter = Counter()
+        self.bounds = bounds
+        self.buckets: List[int] = [0] * (len(bounds) + 1)
+        self.total_duration = 0.0
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add(self, stats: RPCStats) -> None:
+        self.calls += 1
+        self.codes[stats.code.name] += 1
+        self.buckets[bisect.bisect_left(self.bounds, stats.duration)] += 1
+        self.total_duration += stats.duration
+        self.messages_sent += stats.messages_sent
+        self.messages_received += stats.messages_received
+        self.bytes_sent += stats.bytes_sent
+        self.bytes_received += stats.bytes_received
+
+    @property
+    def errors(self) -> int:
+        """The number of calls that did not finish with ``OK``."""
+        return self.calls - self.codes["OK"]
+
+    def quantile(self, q: float) -> float:
+        """Estimates the `q`-quantile of the latency, in seconds, as the upper
+        bound of the bucket it falls in. Returns ``inf`` if it falls in the
+        last bucket, and 0.0 if there were no calls.
+        """
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank and seen > 0:
+                return bound
+        return float("inf") if self.calls else 0.0
+
+
+class MetricsRecorder:
+    """A sink that aggregates metrics per method in memory. Thread-safe, so
+    one recorder can be shared by several clients.
+
+    Parameters
+    ----------
+    bounds : Sequence[float], optional
+        The upper bounds, in seconds, of the latency histogram buckets.
+    """
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(bounds))
+        self._lock = threading.Lock()
+        self._methods: Dict[str, MethodMetrics] = {}
+
+    def __call__(self, stats: RPCStats) -> None:
+        with self._lock:
+            metrics = self._methods.get(stats.method)
+            if metrics is None:
+                metrics = self._methods[stats.method] = MethodMetrics(self.bounds)
+            metrics.add(stats)
+
+    def snapshot(self) -> Dict[str, MethodMetrics]:
+        """Returns a copy of the metrics so far, keyed by full method name."""
+        with self._lock:
+            return copy.deepcopy(self._methods)
+
+    def reset(self) -> None:
+        """Discards the metrics so far."""
+        with self._lock:
+            self._methods.clear()
+
+
+class PrometheusSink:
+    """A sink that exports metrics through the ``prometheus_client`` package,
+    which must be installed. It registers these metrics, labelled by
+    ``service``, ``method`` and, where applicable, ``code``:
+
+    - ``<namespace>_rpc_duration_seconds``: a histogram of call latencies.
+    - ``<namespace>_rpc_messages_sent_total``, ``..._received_total``
+    - ``<namespace>_rpc_sent_bytes_total``, ``..._received_bytes_total``
+
+    Parameters
+    ----------
+    registry : prometheus_client.CollectorRegistry, optional
+        The registry to register the metrics with. Defaults to the global
+        registry, so only one sink per namespace can use it.
+    namespace : str, optional
+        The prefix of the metric names.
+    buckets : Sequence[float], optional
+        The upper bounds, in seconds, of the latency histogram buckets.
+    """
+
+    def __init__(
+        self,
+        registry=None,
+        namespace: str = "pachyderm_client",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        import prometheus_client
+
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        labels = ["service", "method"]
+        self.duration = prometheus_client.Histogram(
+            "rpc_duration_seconds",
+            "Latency of RPCs made by the Pachyderm client.",
+            labels + ["code"],
+            namespace=namespace,
+            registry=registry,
+            buckets=buckets,
+        )
+        counters = {}
+        for name, description in [
+            ("rpc_messages_sent", "Request messages sent."),
+            ("rpc_messages_received", "Response messages received."),
+            ("rpc_sent_bytes", "Serialized size of request messages."),
+            ("rpc_received_bytes", "Serialized size of response messages."),
+        ]:
+            counters[name] = prometheus_client.Counter(
+                name, description, labels, namespace=namespace, registry=registry
+            )
+        self.messages_sent = counters["rpc_messages_sent"]
+        self.messages_received = counters["rpc_messages_received"]
+        self.bytes_sent = counters["rpc_sent_bytes"]
+        self.bytes_received = counters["rpc_received_bytes"]
+
+    def __call__(self, stats: RPCStats) -> None:
+        service, method = stats.service, stats.name
+        self.duration.labels(service, method, stats.code.name).observe(stats.duration)
+        self.messages_sent.labels(service, method).inc(stats.messages_sent)
+        self.messages_received.labels(service, method).inc(stats.messages_received)
+        self.bytes_sent.labels(service, method).inc(stats.bytes_sent)
+        self.bytes_received.labels(service, method).inc(stats.bytes_received)
+
+
+class OpenTelemetrySink:
+    """A sink that records every call as an OpenTelemetry client span, with
+    the ``rpc.*`` semantic convention attributes plus message and byte
+    counts. The ``opentelemetry-api`` package must be installed.
+
+    Spans are created once calls complete, with their actual start and end
+    times, so they are not the parent of any spans created while the call
+    is in flight and no trace context is sent to pachd.
+
+    Parameters
+    ----------
+    tracer : opentelemetry.trace.Tracer, optional
+        The tracer to create spans with. Defaults to the global tracer
+        provider's ``python_pachyderm`` tracer.
+    """
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("python_pachyderm")
+
+    def __call__(self, stats: RPCStats) -> None:
+        trace = self._trace
+        start_ns = int(stats.start_time * 1e9)
+        span = self.tracer.start_span(
+            stats.method[1:],
+            kind=trace.SpanKind.CLIENT,
+            start_time=start_ns,
+            attributes={
+                "rpc.system": "grpc",
+                "rpc.service": stats.service,
+                "rpc.method": stats.name,
+                "rpc.grpc.status_code": stats.code.value[0],
+                "pachyderm.messages_sent": stats.messages_sent,
+                "pachyderm.messages_received": stats.messages_received,
+                "pachyderm.bytes_sent": stats.bytes_sent,
+                "pachyderm.bytes_received": stats.bytes_received,
+            },
+        )
+        if stats.code != grpc.StatusCode.OK:
+            span.set_status(trace.Status(trace.StatusCode.ERROR, stats.code.name))
+        span.end(end_time=start_ns + int(stats.duration * 1e9))
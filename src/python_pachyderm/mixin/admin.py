@@ -1,7 +1,12 @@
+from __future__ import annotations
+
 import grpc
 from google.protobuf import empty_pb2
 
-from python_pachyderm.proto.v2.admin import admin_pb2, admin_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+admin_pb2 = lazy_import("python_pachyderm.proto.v2.admin.admin_pb2")
+admin_pb2_grpc = lazy_import("python_pachyderm.proto.v2.admin.admin_pb2_grpc")
 
 
 class AdminMixin:
@@ -9,9 +14,7 @@ class AdminMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = admin_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(admin_pb2_grpc, "APIStub")
 
     # TODO: This method should auto-populate it's message with information about
     #   the version of this package that is making the call. This is to allow
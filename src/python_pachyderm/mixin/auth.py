@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 from typing import Dict, List
 
 import grpc
 
 from python_pachyderm.errors import AuthServiceNotActivated
-from python_pachyderm.proto.v2.auth import auth_pb2, auth_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+auth_pb2 = lazy_import("python_pachyderm.proto.v2.auth.auth_pb2")
+auth_pb2_grpc = lazy_import("python_pachyderm.proto.v2.auth.auth_pb2_grpc")
 
 
 class AuthMixin:
@@ -11,9 +16,7 @@ class AuthMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = auth_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(auth_pb2_grpc, "APIStub")
 
     def activate_auth(self, root_token: str = None) -> str:
         """Activates auth on the cluster. Returns the root token, an
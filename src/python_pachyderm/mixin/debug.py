@@ -1,10 +1,15 @@
+from __future__ import annotations
+
 from typing import Iterator, List
 
 import grpc
 from google.protobuf import duration_pb2
 
-from python_pachyderm.proto.v2.debug import debug_pb2, debug_pb2_grpc
-from python_pachyderm.proto.v2.pps import pps_pb2
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+debug_pb2 = lazy_import("python_pachyderm.proto.v2.debug.debug_pb2")
+debug_pb2_grpc = lazy_import("python_pachyderm.proto.v2.debug.debug_pb2_grpc")
+pps_pb2 = lazy_import("python_pachyderm.proto.v2.pps.pps_pb2")
 
 
 class DebugMixin:
@@ -12,9 +17,7 @@ class DebugMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = debug_pb2_grpc.DebugStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(debug_pb2_grpc, "DebugStub")
 
     def dump(
         self,
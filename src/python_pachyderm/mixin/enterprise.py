@@ -1,6 +1,13 @@
+from __future__ import annotations
+
 import grpc
 
-from python_pachyderm.proto.v2.enterprise import enterprise_pb2, enterprise_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+enterprise_pb2 = lazy_import("python_pachyderm.proto.v2.enterprise.enterprise_pb2")
+enterprise_pb2_grpc = lazy_import(
+    "python_pachyderm.proto.v2.enterprise.enterprise_pb2_grpc"
+)
 
 
 class EnterpriseMixin:
@@ -8,9 +15,7 @@ class EnterpriseMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = enterprise_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(enterprise_pb2_grpc, "APIStub")
 
     def activate_enterprise(self, license_server: str, id: str, secret: str) -> None:
         """Activates enterprise by registering with a license server.
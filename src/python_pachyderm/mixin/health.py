@@ -1,5 +1,10 @@
+from __future__ import annotations
+
 import grpc
-from grpc_health.v1 import health_pb2, health_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+health_pb2 = lazy_import("grpc_health.v1.health_pb2")
+health_pb2_grpc = lazy_import("grpc_health.v1.health_pb2_grpc")
 
 
 class HealthMixin:
@@ -7,9 +12,7 @@ class HealthMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = health_pb2_grpc.HealthStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(health_pb2_grpc, "HealthStub")
 
     def health_check(self) -> health_pb2.HealthCheckResponse:
         """Returns a health check indicating if the server can handle
@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 from typing import List
 
 import grpc
 
 from python_pachyderm.errors import AuthServiceNotActivated
-from python_pachyderm.proto.v2.identity import identity_pb2, identity_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+identity_pb2 = lazy_import("python_pachyderm.proto.v2.identity.identity_pb2")
+identity_pb2_grpc = lazy_import("python_pachyderm.proto.v2.identity.identity_pb2_grpc")
 
 
 class IdentityMixin:
@@ -11,9 +16,7 @@ class IdentityMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = identity_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(identity_pb2_grpc, "APIStub")
 
     def set_identity_server_config(
         self, config: identity_pb2.IdentityServerConfig
@@ -1,11 +1,16 @@
+from __future__ import annotations
+
 from typing import List
 
 import grpc
 from google.protobuf import timestamp_pb2
 
 from python_pachyderm.errors import AuthServiceNotActivated
-from python_pachyderm.proto.v2.enterprise import enterprise_pb2
-from python_pachyderm.proto.v2.license import license_pb2, license_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+enterprise_pb2 = lazy_import("python_pachyderm.proto.v2.enterprise.enterprise_pb2")
+license_pb2 = lazy_import("python_pachyderm.proto.v2.license.license_pb2")
+license_pb2_grpc = lazy_import("python_pachyderm.proto.v2.license.license_pb2_grpc")
 
 
 class LicenseMixin:
@@ -13,9 +18,7 @@ class LicenseMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = license_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(license_pb2_grpc, "APIStub")
 
     def activate_license(
         self, activation_code: str, expires: timestamp_pb2.Timestamp = None
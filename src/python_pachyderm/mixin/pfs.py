@@ -1,12 +1,19 @@
 import io
+import mmap
 import os
 import re
-import itertools
 import tarfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from datetime import datetime
 from functools import wraps
-from typing import Callable, Iterator, Union, List, BinaryIO
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple, Union
+from typing import List
+from typing import BinaryIO
+from typing import Iterable as IterableType
 
 try:
     from collections.abc import Iterable
@@ -15,12 +22,20 @@ except ImportError:
 
 import grpc
 
+from python_pachyderm._batch import DEFAULT_CONCURRENCY, call_many
+from python_pachyderm._lazy import lazy_stub
+from python_pachyderm.cache import FileCache, MetadataCache
 from python_pachyderm.errors import InvalidTransactionOperation
-from python_pachyderm.pfs import commit_from, uuid_re, SubcommitType
+from python_pachyderm.pfs import commit_from, commit_repo, uuid_re, SubcommitType
 from python_pachyderm.proto.v2.pfs import pfs_pb2, pfs_pb2_grpc
 from google.protobuf import empty_pb2, wrappers_pb2, timestamp_pb2
 
 BUFFER_SIZE = 19 * 1024 * 1024
+MIN_BUFFER_SIZE = 64 * 1024
+# The default for how much data a streaming ModifyFileClient queues.
+STREAMING_BUFFER_SIZE = 64 * 1024 * 1024
+# The default time-to-live of file sets, in seconds, as in pachd.
+FILE_SET_TTL = 600
 
 
 class PFSTarFile(tarfile.TarFile):
@@ -35,9 +50,74 @@ class PFSTarFile(tarfile.TarFile):
             yield tarinfo
 
 
-class PFSFile:
+class _ChunkBuffer:
+    """A FIFO of received message payloads. Payloads are kept as memoryviews
+    of the original ``bytes`` objects, so consuming part of a payload does not
+    move or copy the rest of the buffer.
+    """
+
+    def __init__(self):
+        self._chunks: Deque[memoryview] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, data: bytes) -> None:
+        if data:
+            self._chunks.append(memoryview(data))
+            self._size += len(data)
+
+    def front(self) -> int:
+        """Returns the size of the oldest payload."""
+        return len(self._chunks[0]) if self._chunks else 0
+
+    def take(self, size: int) -> bytes:
+        """Removes and returns up to `size` bytes. A whole payload is returned
+        as-is, without a copy.
+        """
+        parts = []
+        remaining = min(size, self._size)
+        while remaining:
+            view = self._chunks.popleft()
+            if len(view) > remaining:
+                self._chunks.appendleft(view[remaining:])
+                view = view[:remaining]
+            parts.append(view)
+            remaining -= len(view)
+            self._size -= len(view)
+
+        if len(parts) == 1 and len(parts[0]) == len(parts[0].obj):
+            return parts[0].obj
+        return b"".join(parts)
+
+    def take_into(self, out: memoryview) -> int:
+        """Moves as many buffered bytes as fit into `out`. Returns the number
+        of bytes written.
+        """
+        written = 0
+        while self._chunks and written < len(out):
+            view = self._chunks[0]
+            n = min(len(view), len(out) - written)
+            out[written : written + n] = view[:n]
+            if n == len(view):
+                self._chunks.popleft()
+            else:
+                self._chunks[0] = view[n:]
+            written += n
+        self._size -= written
+        return written
+
+
+class PFSFile(io.BufferedIOBase):
     """File-like objects containing content of a file stored in PFS.
 
+    Data is read from the gRPC stream as it is requested. :meth:`readinto`
+    copies directly from the received messages into the caller's buffer, and
+    :meth:`read1` returns received messages without copying them, so large
+    files can be streamed without holding or copying them in full. Data that
+    was already received can still be read after the file is closed.
+
     Examples
     --------
     >>> # client.get_file() returns a PFSFile
@@ -51,19 +131,29 @@ class PFSFile:
 
     def __init__(self, stream: Iterator[wrappers_pb2.BytesValue]):
         self._stream = stream
-        self._buffer = bytearray()
+        self._buffer = _ChunkBuffer()
 
         try:
             first_message = next(self._stream)
         except grpc.RpcError as err:
             raise ConnectionError("Error creating the PFSFile") from err
-        self._buffer.extend(first_message.value)
+        except StopIteration:
+            return
+        self._buffer.append(first_message.value)
 
-    def __enter__(self):
-        return self
+    def _receive(self) -> bool:
+        """Buffers the next message from the stream. Returns False if the
+        stream is exhausted or was cancelled.
+        """
+        try:
+            message = next(self._stream)
+        except (StopIteration, grpc.RpcError):
+            return False
+        self._buffer.append(message.value)
+        return True
 
-    def __exit__(self, type, val, tb):
-        self.close()
+    def readable(self) -> bool:
+        return True
 
     def read(self, size: int = -1) -> bytes:
         """Reads from the :class:`.PFSFile` buffer.
@@ -78,28 +168,138 @@ class PFSFile:
         bytes
             Content from the stream.
         """
-        try:
-            if size == -1:
-                # Consume the entire stream.
-                for message in self._stream:
-                    self._buffer.extend(message.value)
-                result, self._buffer[:] = self._buffer[:], b""
-                return bytes(result)
-            elif len(self._buffer) < size:
-                for message in self._stream:
-                    self._buffer.extend(message.value)
-                    if len(self._buffer) >= size:
-                        break
-        except grpc.RpcError:
+        if size is None or size < 0:
+            # Consume the entire stream.
+            while self._receive():
+                pass
+            return self._buffer.take(len(self._buffer))
+
+        while len(self._buffer) < size and self._receive():
             pass
+        return self._buffer.take(size)
 
-        size = min(size, len(self._buffer))
-        result, self._buffer[:size] = self._buffer[:size], b""
-        return bytes(result)
+    def read1(self, size: int = -1) -> bytes:
+        """Reads up to `size` bytes from at most one gRPC message. If the
+        whole message is requested (the default), it is returned without
+        being copied.
+
+        Parameters
+        ----------
+        size : int, optional
+            If set, the maximum number of bytes to read.
+
+        Returns
+        -------
+        bytes
+            Content from the stream. Empty only at the end of the file.
+        """
+        if not self._buffer:
+            self._receive()
+        front = self._buffer.front()
+        if size is None or size < 0 or size > front:
+            size = front
+        return self._buffer.take(size)
+
+    def readinto(self, b) -> int:
+        """Reads bytes into a pre-allocated, writable bytes-like object,
+        filling it unless the end of the file is reached.
+
+        Parameters
+        ----------
+        b : bytes-like object
+            The buffer to read into, i.e. a ``bytearray`` or ``memoryview``.
+
+        Returns
+        -------
+        int
+            The number of bytes read.
+        """
+        with memoryview(b) as view, view.cast("B") as out:
+            written = self._buffer.take_into(out)
+            while written < len(out) and self._receive():
+                written += self._buffer.take_into(out[written:])
+        return written
+
+    def readinto1(self, b) -> int:
+        """Like :meth:`readinto`, but receives at most one gRPC message.
+
+        Parameters
+        ----------
+        b : bytes-like object
+            The buffer to read into, i.e. a ``bytearray`` or ``memoryview``.
+
+        Returns
+        -------
+        int
+            The number of bytes read.
+        """
+        with memoryview(b) as view, view.cast("B") as out:
+            if not self._buffer:
+                self._receive()
+            return self._buffer.take_into(out)
 
     def close(self) -> None:
         """Closes the :class:`.PFSFile`."""
-        self._stream.cancel()
+        cancel = getattr(self._stream, "cancel", None)
+        if cancel is not None:
+            cancel()
+        super().close()
+
+
+class _MappedPFSFile(PFSFile):
+    """A :class:`.PFSFile` whose content is a local copy, memory-mapped (i.e.
+    a :class:`.FileCache` entry) rather than streamed, so reads copy only
+    what they return. It is seekable.
+    """
+
+    def __init__(self, data: Union[mmap.mmap, bytes], offset: int = 0):
+        io.BufferedIOBase.__init__(self)
+        self._stream = None
+        self._data = data
+        self._view = memoryview(data)
+        self._pos = min(offset, len(self._view))
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        start = min(self._pos, len(self._view))
+        end = len(self._view) if size is None or size < 0 else start + size
+        data = bytes(self._view[start:end])
+        self._pos = start + len(data)
+        return data
+
+    read1 = read
+
+    def readinto(self, b) -> int:
+        start = min(self._pos, len(self._view))
+        with memoryview(b) as view, view.cast("B") as out:
+            n = min(len(out), len(self._view) - start)
+            out[:n] = self._view[start : start + n]
+        self._pos = start + n
+        return n
+
+    readinto1 = readinto
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+            if isinstance(self._data, mmap.mmap):
+                self._data.close()
+        super().close()
 
 
 def transaction_incompatible(pfs_method: Callable) -> Callable:
@@ -119,10 +319,10 @@ class PFSMixin:
     """A mixin with pfs-related functionality."""
 
     _channel: grpc.Channel
+    file_cache: Optional[FileCache] = None
+    metadata_cache: Optional[MetadataCache] = None
 
-    def __init__(self):
-        self.__stub = pfs_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(pfs_pb2_grpc, "APIStub")
 
     def create_repo(
         self,
@@ -158,6 +358,7 @@ class PFSMixin:
             update=update,
         )
         self.__stub.CreateRepo(message)
+        self._invalidate(message.repo, permanent=True)
 
     def inspect_repo(
         self, repo_name: str, project_name: str = None
@@ -183,7 +384,44 @@ class PFSMixin:
                 project=pfs_pb2.Project(name=project_name),
             ),
         )
-        return self.__stub.InspectRepo(message)
+        return self._cached(
+            ("repo", MetadataCache.repo_key(message.repo)),
+            lambda: self.__stub.InspectRepo(message),
+        )
+
+    def inspect_repos(
+        self,
+        repo_names: IterableType[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        project_name: str = None,
+    ) -> List[pfs_pb2.RepoInfo]:
+        """Inspects many repos, with up to `concurrency` calls in flight at
+        once on the client's channel.
+
+        Parameters
+        ----------
+        repo_names : Iterable[str]
+            The names of the repos.
+        concurrency : int, optional
+            The most calls to have in flight at once.
+        project_name : str
+            The name of the project.
+
+        Returns
+        -------
+        List[pfs_pb2.RepoInfo]
+            Protobuf objects with info on the repos, in the order of
+            `repo_names`. If any call fails, its error is raised.
+        """
+        messages = (
+            pfs_pb2.InspectRepoRequest(
+                repo=pfs_pb2.Repo(
+                    name=name, type="user", project=pfs_pb2.Project(name=project_name)
+                ),
+            )
+            for name in repo_names
+        )
+        return call_many(self.__stub.InspectRepo, messages, concurrency)
 
     def list_repo(
         self, type: str = "user", projects_filter: List[pfs_pb2.Project] = None
@@ -233,11 +471,13 @@ class PFSMixin:
             ),
         )
         self.__stub.DeleteRepo(message)
+        self._invalidate(message.repo, permanent=True)
 
     def delete_all_repos(self) -> None:
         """Deletes all repos."""
         message = empty_pb2.Empty()
         self.__stub.DeleteAll(message)
+        self._invalidate()
 
     def create_project(
         self, project_name: str, description: str = None, update: bool = False
@@ -305,6 +545,7 @@ class PFSMixin:
             project=pfs_pb2.Project(name=project_name),
         )
         self.__stub.DeleteProject(message)
+        self._invalidate()
 
     def start_commit(
         self,
@@ -357,7 +598,9 @@ class PFSMixin:
             description=description,
             parent=commit_from(parent),
         )
-        return self.__stub.StartCommit(message)
+        commit = self.__stub.StartCommit(message)
+        self._invalidate(repo)
+        return commit
 
     def finish_commit(
         self,
@@ -404,6 +647,7 @@ class PFSMixin:
             force=force,
         )
         self.__stub.FinishCommit(message)
+        self._invalidate(commit_repo(message.commit))
 
     @contextmanager
     def commit(
@@ -485,7 +729,7 @@ class PFSMixin:
             message = pfs_pb2.InspectCommitRequest(
                 commit=commit_from(commit), wait=commit_state
             )
-            return iter([self.__stub.InspectCommit(message)])
+            return iter([self._inspect_commit(message)])
         elif uuid_re.match(commit):
             message = pfs_pb2.InspectCommitSetRequest(
                 commit_set=pfs_pb2.CommitSet(id=commit),
@@ -496,6 +740,46 @@ class PFSMixin:
             "bad argument: commit should either be a commit ID (str) or a commit-like object"
         )
 
+    def inspect_commits(
+        self,
+        commits: IterableType[SubcommitType],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        commit_state: pfs_pb2.CommitState = pfs_pb2.CommitState.STARTED,
+    ) -> List[pfs_pb2.CommitInfo]:
+        """Inspects many subcommits (commits at the repo-level), with up to
+        `concurrency` calls in flight at once on the client's channel. This
+        takes about one round trip per `concurrency` commits rather than one
+        per commit.
+
+        Parameters
+        ----------
+        commits : Iterable[SubcommitType]
+            The subcommits to inspect.
+        concurrency : int, optional
+            The most calls to have in flight at once.
+        commit_state : {pfs_pb2.CommitState.STARTED, pfs_pb2.CommitState.READY, pfs_pb2.CommitState.FINISHING, pfs_pb2.CommitState.FINISHED}, optional
+            An enum that causes each call to block until its commit is in the
+            specified state.
+
+        Returns
+        -------
+        List[pfs_pb2.CommitInfo]
+            Protobuf objects with info on the subcommits, in the order of
+            `commits`. If any call fails, its error is raised.
+
+        Examples
+        --------
+        >>> commits = [c.commit for c in client.list_commit("foo")]
+        >>> infos = client.inspect_commits(commits, concurrency=64)
+
+        .. # noqa: W505
+        """
+        messages = (
+            pfs_pb2.InspectCommitRequest(commit=commit_from(c), wait=commit_state)
+            for c in commits
+        )
+        return call_many(self.__stub.InspectCommit, messages, concurrency)
+
     def list_commit(
         self,
         repo_name: str = None,
@@ -597,6 +881,7 @@ class PFSMixin:
             commit_set=pfs_pb2.CommitSet(id=commit_id)
         )
         self.__stub.SquashCommitSet(message)
+        self._invalidate()
 
     def drop_commit(self, commit_id: str) -> None:
         """
@@ -611,6 +896,7 @@ class PFSMixin:
             commit_set=pfs_pb2.CommitSet(id=commit_id),
         )
         self.__stub.DropCommitSet(message)
+        self._invalidate()
 
     def wait_commit(
         self, commit: Union[str, SubcommitType]
@@ -790,6 +1076,7 @@ class PFSMixin:
             trigger=trigger,
         )
         self.__stub.CreateBranch(message)
+        self._invalidate(message.branch.repo)
 
     def inspect_branch(
         self,
@@ -823,7 +1110,14 @@ class PFSMixin:
                 ),
             ),
         )
-        return self.__stub.InspectBranch(message)
+        return self._cached(
+            (
+                "branch",
+                MetadataCache.repo_key(message.branch.repo),
+                message.branch.name,
+            ),
+            lambda: self.__stub.InspectBranch(message),
+        )
 
     def list_branch(
         self,
@@ -895,14 +1189,25 @@ class PFSMixin:
             force=force,
         )
         self.__stub.DeleteBranch(message)
+        self._invalidate(message.branch.repo)
 
     @contextmanager
-    def modify_file_client(self, commit: SubcommitType) -> Iterator["ModifyFileClient"]:
+    def modify_file_client(
+        self,
+        commit: SubcommitType,
+        streaming: bool = False,
+        max_buffer_bytes: int = STREAMING_BUFFER_SIZE,
+    ) -> Iterator["ModifyFileClient"]:
         """A context manager that gives a :class:`.ModifyFileClient`. When the
         context manager exits, any operations enqueued from the
         :class:`.ModifyFileClient` are executed in a single, atomic
         ModifyFile gRPC call.
 
+        In streaming mode, the ModifyFile call starts when the context manager
+        is entered instead, and operations are sent by a gRPC thread while
+        more are enqueued. The call is still atomic: if the ``with`` block
+        raises, it is cancelled.
+
         Parameters
         ----------
         commit : Union[tuple, dict, Commit, pfs_pb2.Commit]
@@ -910,6 +1215,15 @@ class PFSMixin:
             is opened before ``modify_file_client()`` is called, it will remain
             open after. If ``modify_file_client()`` opens the subcommit, it
             will close when exiting the ``with`` scope.
+        streaming : bool, optional
+            If true, send operations while they are enqueued rather than
+            holding all of them until the ``with`` block exits.
+        max_buffer_bytes : int, optional
+            In streaming mode, the most data (from ``put_file_from_bytes``
+            and in-memory file objects) held by operations waiting to be
+            sent. Enqueueing blocks while the limit would be exceeded. An
+            operation larger than the limit is queued once all others are
+            sent.
 
         Yields
         -------
@@ -937,11 +1251,283 @@ class PFSMixin:
         ...         "/new_file.txt",
         ...         "https://example.com/data/train/input.txt"
         ...     )
+
+        Streaming many small files, with at most 16MB of them in memory:
+
+        >>> with client.modify_file_client(
+        ...     ("foo", "master"), streaming=True, max_buffer_bytes=16 * 2**20
+        ... ) as mfc:
+        >>>     for i, record in enumerate(records):
+        >>>         mfc.put_file_from_bytes(f"/records/{i}", record)
+        """
+        with self._modify_file_call(
+            self.__stub.ModifyFile, commit, streaming, max_buffer_bytes
+        ) as mfc:
+            yield mfc
+        # Writing to a branch opens and finishes a commit on it.
+        self._invalidate(commit_repo(commit_from(commit)))
+
+    @contextmanager
+    def create_file_set(
+        self,
+        streaming: bool = False,
+        max_buffer_bytes: int = STREAMING_BUFFER_SIZE,
+    ) -> Iterator["ModifyFileClient"]:
+        """A context manager that gives a :class:`.ModifyFileClient` whose
+        operations create a new file set rather than modify a commit. Once
+        the context manager exits, the ID of the file set is the client's
+        ``file_set_id``.
+
+        File sets are independent of commits and of each other, so many
+        processes or hosts can create them concurrently. They can then be
+        combined with :meth:`compose_file_set` and added to a commit with
+        :meth:`add_file_set`. A file set is deleted once its time-to-live
+        (10 minutes by default) passes, unless it is renewed, e.g. with
+        :meth:`renew_file_sets`.
+
+        Parameters
+        ----------
+        streaming : bool, optional
+            If true, send operations while they are enqueued, as in
+            :meth:`modify_file_client`.
+        max_buffer_bytes : int, optional
+            In streaming mode, the most data held by operations waiting to be
+            sent.
+
+        Yields
+        -------
+        ModifyFileClient
+            An object that can queue operations to create a file set.
+
+        Examples
+        --------
+        On each worker:
+
+        >>> with client.create_file_set() as fs:
+        >>>     for path in my_share_of_the_files:
+        >>>         fs.put_file_from_filepath(path, path)
+        >>> send_to_coordinator(fs.file_set_id)
+
+        On the coordinator:
+
+        >>> with client.renew_file_sets() as renewer:
+        >>>     for file_set_id in receive_from_workers():
+        >>>         renewer.add(file_set_id)
+        >>>     file_set_id = client.compose_file_set(renewer.file_set_ids)
+        >>> client.add_file_set(("foo", "master"), file_set_id)
+        """
+        with self._modify_file_call(
+            self.__stub.CreateFileSet, None, streaming, max_buffer_bytes
+        ) as mfc:
+            yield mfc
+        mfc.file_set_id = mfc._response.file_set_id
+
+    @contextmanager
+    def _modify_file_call(
+        self,
+        method: Callable,
+        commit: Optional[SubcommitType],
+        streaming: bool,
+        max_buffer_bytes: int,
+    ) -> Iterator["ModifyFileClient"]:
+        """Sends the operations enqueued on the yielded ModifyFileClient in
+        one call of the client-streaming `method`, and sets its ``_response``.
+        """
+        if streaming:
+            mfc = _StreamingModifyFileClient(commit, max_buffer_bytes)
+            mfc._start(method)
+            try:
+                yield mfc
+            except BaseException:
+                mfc._abort()
+                raise
+            mfc._response = mfc._finish()
+        else:
+            mfc = ModifyFileClient(commit)
+            yield mfc
+            mfc._response = method(mfc._reqs())
+
+    def get_file_set(self, commit: SubcommitType) -> str:
+        """Creates a file set with the contents of a commit.
+
+        Parameters
+        ----------
+        commit : SubcommitType
+            The subcommit (commit at the repo-level) to get the contents of.
+
+        Returns
+        -------
+        str
+            The ID of the file set.
         """
-        mfc = ModifyFileClient(commit)
-        yield mfc
-        messages = mfc._reqs()
-        self.__stub.ModifyFile(messages)
+        message = pfs_pb2.GetFileSetRequest(commit=commit_from(commit))
+        return self.__stub.GetFileSet(message).file_set_id
+
+    @transaction_incompatible
+    def add_file_set(self, commit: SubcommitType, file_set_id: str) -> None:
+        """Adds the contents of a file set to a commit, in one call however
+        many files it holds. As with :meth:`modify_file_client`, writing to a
+        branch without an open commit opens and finishes one.
+
+        Parameters
+        ----------
+        commit : SubcommitType
+            The subcommit (commit at the repo-level) to add the file set to.
+        file_set_id : str
+            The ID of the file set.
+        """
+        message = pfs_pb2.AddFileSetRequest(
+            commit=commit_from(commit), file_set_id=file_set_id
+        )
+        self.__stub.AddFileSet(message)
+        self._invalidate(commit_repo(message.commit))
+
+    def renew_file_set(self, file_set_id: str, ttl_seconds: int = FILE_SET_TTL) -> None:
+        """Extends the life of a file set.
+
+        Parameters
+        ----------
+        file_set_id : str
+            The ID of the file set.
+        ttl_seconds : int, optional
+            How long the file set lives from now, in seconds.
+        """
+        message = pfs_pb2.RenewFileSetRequest(
+            file_set_id=file_set_id, ttl_seconds=ttl_seconds
+        )
+        self.__stub.RenewFileSet(message)
+
+    @contextmanager
+    def renew_file_sets(
+        self,
+        file_set_ids: IterableType[str] = (),
+        ttl_seconds: int = FILE_SET_TTL,
+    ) -> Iterator["FileSetRenewer"]:
+        """A context manager that gives a :class:`.FileSetRenewer`, which
+        keeps file sets alive from a background thread until the context
+        manager exits.
+
+        Parameters
+        ----------
+        file_set_ids : Iterable[str], optional
+            File sets to renew from the start. More can be added with
+            :meth:`.FileSetRenewer.add`.
+        ttl_seconds : int, optional
+            The time-to-live to give the file sets each time they are
+            renewed, in seconds. They are renewed every half of it.
+
+        Yields
+        -------
+        FileSetRenewer
+            An object that renews the file sets added to it.
+        """
+        renewer = FileSetRenewer(self.renew_file_set, ttl_seconds)
+        try:
+            for file_set_id in file_set_ids:
+                renewer.add(file_set_id)
+            yield renewer
+        finally:
+            renewer.close()
+
+    def compose_file_set(
+        self,
+        file_set_ids: IterableType[str],
+        ttl_seconds: int = FILE_SET_TTL,
+        compact: bool = False,
+    ) -> str:
+        """Creates a file set that combines several file sets, applied in
+        order. The file sets are not copied, so this is cheap however large
+        they are.
+
+        Parameters
+        ----------
+        file_set_ids : Iterable[str]
+            The IDs of the file sets.
+        ttl_seconds : int, optional
+            The time-to-live of the new file set, in seconds.
+        compact : bool, optional
+            If true, compact the new file set, which makes reading it faster
+            at the cost of the time to compact it.
+
+        Returns
+        -------
+        str
+            The ID of the new file set.
+        """
+        message = pfs_pb2.ComposeFileSetRequest(
+            file_set_ids=file_set_ids, ttl_seconds=ttl_seconds, compact=compact
+        )
+        return self.__stub.ComposeFileSet(message).file_set_id
+
+    def shard_file_set(self, file_set_id: str) -> List[pfs_pb2.PathRange]:
+        """Splits a file set into path ranges of roughly equal size, e.g. to
+        process it in parallel.
+
+        Parameters
+        ----------
+        file_set_id : str
+            The ID of the file set.
+
+        Returns
+        -------
+        List[pfs_pb2.PathRange]
+            The shards, in path order. Each covers the paths from its
+            ``lower`` bound (inclusive) to its ``upper`` bound (exclusive);
+            an empty bound is unbounded.
+        """
+        message = pfs_pb2.ShardFileSetRequest(file_set_id=file_set_id)
+        return list(self.__stub.ShardFileSet(message).shards)
+
+    def shard_commit(
+        self, commit: SubcommitType, num_shards: int
+    ) -> List[pfs_pb2.PathRange]:
+        """Splits the files of a commit into up to `num_shards` path ranges
+        of roughly equal size, e.g. to process them with that many workers.
+        Pachd picks the split points from the commit's metadata, so this
+        takes the same time and memory however many files the commit holds.
+
+        Pachd splits commits into shards of about a fixed size, which are
+        then merged into `num_shards`. So small commits may give fewer
+        shards than requested, down to a single one covering everything.
+
+        Parameters
+        ----------
+        commit : SubcommitType
+            The subcommit (commit at the repo-level) to split. Give a commit
+            ID rather than a branch, so that all workers read the same commit.
+        num_shards : int
+            The most shards to return.
+
+        Returns
+        -------
+        List[pfs_pb2.PathRange]
+            The shards, in path order. Each covers the paths from its
+            ``lower`` bound (inclusive) to its ``upper`` bound (exclusive);
+            an empty bound is unbounded. They can be pickled, e.g. to send
+            them to workers.
+
+        Examples
+        --------
+        >>> commit = client.inspect_branch("foo", "master").head
+        >>> for shard in client.shard_commit(commit, 16):
+        >>>     pool.submit(process, commit, shard)
+        ...
+        >>> # On each worker
+        >>> for info in client.glob_file(commit, "/**", path_range=shard):
+        >>>     if info.file_type == pfs_pb2.FileType.FILE:
+        >>>         process_file(client.get_file(commit, info.file.path))
+        """
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {num_shards}")
+        shards = self.shard_file_set(self.get_file_set(commit))
+        if len(shards) <= num_shards:
+            return shards
+        # Merges runs of consecutive shards, as evenly as possible.
+        bounds = [len(shards) * i // num_shards for i in range(num_shards + 1)]
+        return [
+            pfs_pb2.PathRange(lower=shards[start].lower, upper=shards[end - 1].upper)
+            for start, end in zip(bounds, bounds[1:])
+        ]
 
     @transaction_incompatible
     def put_file_bytes(
@@ -1124,15 +1710,183 @@ class PFSMixin:
         -------
         PFSFile
             The contents of the file in a file-like object.
+
+        Notes
+        -----
+        If the client has a :class:`.FileCache`, files of finished commits are
+        read through it: the first read of a file streams it from pachd and
+        adds it to the cache once it is read to the end, and later reads of
+        the same commit ID and path are served from a memory-mapped local
+        copy. Referring to the commit by ID rather than by branch saves an
+        InspectCommit call on cache hits.
         """
-        message = pfs_pb2.GetFileRequest(
-            file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
-            URL=URL,
-            offset=offset,
-        )
+        file = pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum)
+        if self.file_cache is not None and not URL:
+            return self._get_cached_file(file, offset)
+        message = pfs_pb2.GetFileRequest(file=file, URL=URL, offset=offset)
         stream = self.__stub.GetFile(message)
         return PFSFile(stream)
 
+    def _get_cached_file(self, file: pfs_pb2.File, offset: int) -> PFSFile:
+        cache = self.file_cache
+        key = None
+        if uuid_re.fullmatch(file.commit.id):
+            # The cache only holds finished commits, so a commit given by ID
+            # is looked up before checking whether it is finished.
+            key = cache.key(file)
+            data = cache.open(key)
+            if data is not None:
+                return _MappedPFSFile(data, offset)
+
+        info = self.__stub.InspectCommit(
+            pfs_pb2.InspectCommitRequest(commit=file.commit)
+        )
+        finished = info.HasField("finished")
+        if finished and key is None:
+            # Pins the read to the resolved commit, should the branch move.
+            file.commit.CopyFrom(info.commit)
+            key = cache.key(file)
+            data = cache.open(key)
+            if data is not None:
+                return _MappedPFSFile(data, offset)
+
+        stream = self.__stub.GetFile(pfs_pb2.GetFileRequest(file=file, offset=offset))
+        if not finished or offset:
+            # Only whole files of finished commits are cached.
+            return PFSFile(stream)
+        return PFSFile(cache.tee(key, stream))
+
+    def get_file_parallel(
+        self,
+        commit: SubcommitType,
+        path: str,
+        dest: Union[str, os.PathLike],
+        parts: int = 4,
+        datum: str = None,
+        retries: int = 3,
+    ) -> pfs_pb2.FileInfo:
+        """Downloads a single PFS file to a local path over several
+        concurrent GetFile streams. The file is split into `parts` contiguous
+        byte ranges, each fetched from its own offset and written in place
+        with ``os.pwrite``. This is useful for very large files, where one
+        stream cannot saturate the network.
+
+        A range whose stream fails is resumed from the last byte received.
+        If a range still fails after `retries` consecutive attempts, the
+        download is aborted, `dest` is removed and the error is raised.
+
+        Parameters
+        ----------
+        commit : SubcommitType
+            The subcommit (commit at the repo-level) to get the file from.
+        path : str
+            The path of the file.
+        dest : Union[str, os.PathLike]
+            The local path to write the file to. Overwritten if it exists.
+        parts : int, optional
+            The number of byte ranges to download concurrently. Ranges are
+            at least ``BUFFER_SIZE`` bytes, so small files use fewer.
+        datum : str, optional
+            A tag that filters the files.
+        retries : int, optional
+            The number of times a range is retried without making progress
+            before giving up.
+
+        Returns
+        -------
+        pfs_pb2.FileInfo
+            The info of the downloaded file, as given by :meth:`inspect_file`.
+
+        Examples
+        --------
+        >>> client.get_file_parallel(
+        ...     ("models", "master"), "/weights.bin", "weights.bin", parts=16
+        ... )
+        """
+        file_info = self.inspect_file(commit, path, datum=datum)
+        if file_info.file_type == pfs_pb2.FileType.DIR:
+            raise ValueError("bad argument: {} is a directory".format(path))
+        size = file_info.size_bytes
+        # Ranges are read from the commit the file was inspected in, as a
+        # branch may move mid-download.
+        commit = file_info.file.commit
+
+        parts = max(1, min(parts, -(-size // BUFFER_SIZE)))
+        bounds = [size * i // parts for i in range(parts + 1)]
+        stop = threading.Event()
+
+        fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            os.ftruncate(fd, size)
+            with ThreadPoolExecutor(max_workers=parts) as executor:
+                futures = [
+                    executor.submit(
+                        self._get_file_range,
+                        commit,
+                        path,
+                        datum,
+                        fd,
+                        start,
+                        end,
+                        retries,
+                        stop,
+                    )
+                    for start, end in zip(bounds, bounds[1:])
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    stop.set()
+                    raise
+        except BaseException:
+            os.close(fd)
+            os.unlink(dest)
+            raise
+        os.close(fd)
+        return file_info
+
+    def _get_file_range(
+        self,
+        commit: SubcommitType,
+        path: str,
+        datum: str,
+        fd: int,
+        start: int,
+        end: int,
+        retries: int,
+        stop: threading.Event,
+    ) -> None:
+        """Writes bytes [`start`, `end`) of a PFS file to `fd`, reconnecting
+        from the current position if the stream fails.
+        """
+        pos = start
+        failures = 0
+        while pos < end and not stop.is_set():
+            try:
+                # GetFile has no length, so the stream is cancelled (by
+                # closing the PFSFile) once the range is written.
+                with self.get_file(commit, path, datum=datum, offset=pos) as f:
+                    while pos < end and not stop.is_set():
+                        chunk = f.read1(end - pos)
+                        if not chunk:
+                            raise ConnectionError(
+                                "GetFile stream for {} ended at byte {} of {}".format(
+                                    path, pos, end
+                                )
+                            )
+                        view = memoryview(chunk)
+                        while view:
+                            written = os.pwrite(fd, view, pos)
+                            view = view[written:]
+                            pos += written
+                        failures = 0
+            except (ConnectionError, grpc.RpcError):
+                failures += 1
+                if failures > retries:
+                    raise
+                time.sleep(0.1 * 2**failures)
+
     def get_file_tar(
         self,
         commit: SubcommitType,
@@ -1196,6 +1950,44 @@ class PFSMixin:
         )
         return self.__stub.InspectFile(message)
 
+    def inspect_files(
+        self,
+        files: IterableType[Tuple[SubcommitType, str]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        datum: str = None,
+    ) -> List[pfs_pb2.FileInfo]:
+        """Inspects many files, with up to `concurrency` calls in flight at
+        once on the client's channel.
+
+        Parameters
+        ----------
+        files : Iterable[Tuple[SubcommitType, str]]
+            The subcommit and path of each file.
+        concurrency : int, optional
+            The most calls to have in flight at once.
+        datum : str, optional
+            A tag that filters the files.
+
+        Returns
+        -------
+        List[pfs_pb2.FileInfo]
+            Protobuf objects with info on the files, in the order of `files`.
+            If any call fails, its error is raised.
+
+        Examples
+        --------
+        >>> infos = client.inspect_files(
+        ...     [(("foo", "master"), "/a.txt"), (("foo", "master"), "/b.txt")]
+        ... )
+        """
+        messages = (
+            pfs_pb2.InspectFileRequest(
+                file=pfs_pb2.File(commit=commit_from(commit), path=path, datum=datum),
+            )
+            for commit, path in files
+        )
+        return call_many(self.__stub.InspectFile, messages, concurrency)
+
     def list_file(
         self,
         commit: SubcommitType,
@@ -1301,6 +2093,9 @@ class PFSMixin:
             The subcommit (commit at the repo-level) to query against.
         pattern : str
             A glob pattern.
+        path_range : pfs_pb2.PathRange, optional
+            If set, only lists files in this range, e.g. a shard from
+            :meth:`shard_commit`.
 
         Returns
         -------
@@ -1468,21 +2263,86 @@ class PFSMixin:
 
         return True
 
+    def _cached(self, key: tuple, inspect: Callable[[], Any]) -> Any:
+        """Returns the metadata cache's entry for `key`, or the result of
+        `inspect`, which is then added to the cache.
+        """
+        cache = self.metadata_cache
+        if cache is None:
+            return inspect()
+        info = cache.get(key)
+        if info is None:
+            info = inspect()
+            cache.put(key, info)
+        return info
+
+    def _inspect_commit(
+        self, message: pfs_pb2.InspectCommitRequest
+    ) -> pfs_pb2.CommitInfo:
+        cache = self.metadata_cache
+        if cache is None:
+            return self.__stub.InspectCommit(message)
+        commit = message.commit
+        repo = MetadataCache.repo_key(commit_repo(commit))
+        # A full ID names the same commit whatever branch is given with it,
+        # while anything else (i.e. a branch or ancestry) may move.
+        by_id = uuid_re.fullmatch(commit.id) is not None
+        key = ("commit", repo, commit.id, "" if by_id else commit.branch.name)
+        info = cache.get(key)
+        if info is not None and (
+            info.HasField("finished") or message.wait <= pfs_pb2.CommitState.STARTED
+        ):
+            return info
+        info = self.__stub.InspectCommit(message)
+        finished = info.HasField("finished")
+        cache.put(key, info, permanent=finished and by_id)
+        if finished and not by_id:
+            cache.put(("commit", repo, info.commit.id, ""), info, permanent=True)
+        return info
+
+    def _invalidate(self, repo: pfs_pb2.Repo = None, permanent: bool = False) -> None:
+        """Drops the metadata cache's entries of `repo` that may have changed,
+        and, if `permanent`, its finished commits. Drops all entries if `repo`
+        is unset.
+        """
+        cache = self.metadata_cache
+        if cache is None:
+            return
+        if repo is None:
+            cache.clear()
+        else:
+            cache.invalidate(repo, permanent)
+
 
 class ModifyFileClient:
     """:class:`.ModifyFileClient` puts or deletes PFS files atomically.
     Replaces :class:`.PutFileClient` from python_pachyderm 6.x.
+
+    Attributes
+    ----------
+    file_set_id : str
+        For a client from :meth:`~.PFSMixin.create_file_set`, the ID of the
+        file set, once it is created.
     """
 
-    def __init__(self, commit: SubcommitType):
+    def __init__(self, commit: Optional[SubcommitType]):
         self._ops = []
         self.commit = commit_from(commit)
+        self.file_set_id: Optional[str] = None
+        self._response = None
 
     def _reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
-        yield pfs_pb2.ModifyFileRequest(set_commit=self.commit)
+        if self.commit is not None:
+            yield pfs_pb2.ModifyFileRequest(set_commit=self.commit)
         for op in self._ops:
             yield from op.reqs()
 
+    def _enqueue(self, op: "_AtomicOp", size: int = 0) -> None:
+        """Adds an operation. `size` is the amount of data it holds in
+        memory until it is sent.
+        """
+        self._ops.append(op)
+
     def put_file_from_filepath(
         self,
         pfs_path: str,
@@ -1507,7 +2367,7 @@ class ModifyFileClient:
             If true, appends the content of `local_path` to the file at
             `pfs_path`, if it already exists. Otherwise, overwrites the file.
         """
-        self._ops.append(
+        self._enqueue(
             _AtomicModifyFilepathOp(
                 pfs_path,
                 local_path,
@@ -1537,13 +2397,17 @@ class ModifyFileClient:
             If true, appends the content of `value` to the file at `path`,
             if it already exists. Otherwise, overwrites the file.
         """
-        self._ops.append(
+        size = 0
+        if isinstance(value, io.BytesIO):
+            size = len(value.getbuffer()) - value.tell()
+        self._enqueue(
             _AtomicModifyFileobjOp(
                 path,
                 value,
                 datum,
                 append,
-            )
+            ),
+            size,
         )
 
     def put_file_from_bytes(
@@ -1567,13 +2431,59 @@ class ModifyFileClient:
             If true, appends the content of `value` to the file at `path`,
             if it already exists. Otherwise, overwrites the file.
         """
-        self.put_file_from_fileobj(
-            path,
-            io.BytesIO(value),
-            datum=datum,
-            append=append,
+        value = _check_bytes(path, value)
+        self._enqueue(
+            _AtomicModifyBytesOp([(path, value)], datum=datum, append=append),
+            len(value),
         )
 
+    def append_files_from_bytes(
+        self,
+        files: IterableType[Tuple[str, bytes]],
+        datum: str = None,
+    ) -> None:
+        """Appends bytestrings to many PFS files, creating those that do not
+        exist. This is a fast path for uploading many small new files:
+        unlike ``put_file_from_bytes``, a file is not deleted before it is
+        written, and the files are enqueued as a single operation. A file of
+        up to 19MB is sent as a single message.
+
+        Files that already exist in the commit are appended to, not
+        overwritten, so use ``put_file_from_bytes`` for those.
+
+        Parameters
+        ----------
+        files : Iterable[Tuple[str, bytes]]
+            The (path, content) pairs of the files. A list is enqueued at
+            once; any other iterable is iterated as the files are sent, so it
+            can be a generator that produces them on demand.
+        datum : str, optional
+            A tag for the added files.
+
+        Raises
+        ------
+        TypeError
+            If the content of a file does not support the buffer protocol.
+            The files of a list are checked when they are enqueued, and
+            those of other iterables as they are sent.
+
+        Examples
+        --------
+        >>> with client.modify_file_client(("foo", "master")) as mfc:
+        >>>     mfc.append_files_from_bytes(
+        ...         (f"/records/{i}.json", record) for i, record in enumerate(records)
+        ...     )
+
+        .. # noqa: W505
+        """
+        size = 0
+        if isinstance(files, (list, tuple)):
+            files = [(path, _check_bytes(path, value)) for path, value in files]
+            size = sum(len(value) for _, value in files)
+        else:
+            files = ((path, _check_bytes(path, value)) for path, value in files)
+        self._enqueue(_AtomicModifyBytesOp(files, datum=datum, append=True), size)
+
     def put_file_from_url(
         self,
         path: str,
@@ -1604,7 +2514,7 @@ class ModifyFileClient:
             The maximum number of threads used to complete the request.
             Defaults to 50.
         """
-        self._ops.append(
+        self._enqueue(
             _AtomicModifyFileURLOp(
                 path,
                 url,
@@ -1625,7 +2535,7 @@ class ModifyFileClient:
         datum : str, optional
             A tag that filters the files.
         """
-        self._ops.append(_AtomicDeleteFileOp(path, datum=datum))
+        self._enqueue(_AtomicDeleteFileOp(path, datum=datum))
 
     def copy_file(
         self,
@@ -1652,7 +2562,7 @@ class ModifyFileClient:
             destination file, if it already exists. Otherwise, overwrites
             the file.
         """
-        self._ops.append(
+        self._enqueue(
             _AtomicCopyFileOp(
                 source_commit,
                 source_path,
@@ -1663,6 +2573,138 @@ class ModifyFileClient:
         )
 
 
+class _StreamingModifyFileClient(ModifyFileClient):
+    """A :class:`.ModifyFileClient` whose ModifyFile call starts as soon as it
+    is created. Operations wait in a queue until gRPC's request thread sends
+    them, and enqueueing blocks while the queued operations hold more than
+    `max_buffer_bytes` of data.
+    """
+
+    def __init__(self, commit: SubcommitType, max_buffer_bytes: int):
+        super().__init__(commit)
+        self.max_buffer_bytes = max_buffer_bytes
+        self._queue: Deque[Tuple[_AtomicOp, int]] = deque()
+        self._buffered = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._call: Optional[grpc.Future] = None
+
+    def _start(self, modify_file: Callable) -> None:
+        self._call = modify_file.future(self._reqs())
+        # If the call fails early, stops the request thread and wakes up
+        # blocked callers so they see the error.
+        self._call.add_done_callback(lambda _: self._close(abort=True))
+
+    def _reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
+        if self.commit is not None:
+            yield pfs_pb2.ModifyFileRequest(set_commit=self.commit)
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                op, size = self._queue.popleft()
+            yield from op.reqs()
+            if size:
+                with self._cond:
+                    self._buffered -= size
+                    self._cond.notify_all()
+
+    def _enqueue(self, op: "_AtomicOp", size: int = 0) -> None:
+        with self._cond:
+            while (
+                self._buffered
+                and self._buffered + size > self.max_buffer_bytes
+                and not self._closed
+            ):
+                self._cond.wait()
+            if self._closed:
+                if self._call.done() and self._call.exception() is not None:
+                    raise self._call.exception()
+                raise ValueError("the ModifyFileClient is closed")
+            self._queue.append((op, size))
+            self._buffered += size
+            self._cond.notify_all()
+
+    def _close(self, abort: bool = False) -> None:
+        with self._cond:
+            self._closed = True
+            if abort:
+                self._queue.clear()
+                self._buffered = 0
+            self._cond.notify_all()
+
+    def _finish(self):
+        """Sends the remaining operations, waits for the call to end and
+        returns its response.
+        """
+        self._close()
+        return self._call.result()
+
+    def _abort(self) -> None:
+        self._close(abort=True)
+        self._call.cancel()
+
+
+class FileSetRenewer:
+    """Keeps file sets alive by renewing them from a background thread, every
+    half of their time-to-live. Created by
+    :meth:`~.PFSMixin.renew_file_sets`.
+
+    Attributes
+    ----------
+    errors : Dict[str, Exception]
+        The errors of file sets that could not be renewed (e.g. because they
+        expired), by file set ID. They are no longer renewed.
+    """
+
+    def __init__(self, renew: Callable[[str, int], None], ttl_seconds: int):
+        self._renew = renew
+        self.ttl_seconds = ttl_seconds
+        self.errors: Dict[str, Exception] = {}
+        self._ids: List[str] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def file_set_ids(self) -> List[str]:
+        """The IDs of the file sets being renewed, in the order they were
+        added.
+        """
+        with self._lock:
+            return list(self._ids)
+
+    def add(self, file_set_id: str) -> None:
+        """Renews a file set now, which raises if it no longer exists, and
+        from then on until the renewer is closed.
+        """
+        self._renew(file_set_id, self.ttl_seconds)
+        with self._lock:
+            self._ids.append(file_set_id)
+
+    def remove(self, file_set_id: str) -> None:
+        """Stops renewing a file set."""
+        with self._lock:
+            self._ids.remove(file_set_id)
+
+    def close(self) -> None:
+        """Stops renewing all file sets."""
+        self._closed.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.ttl_seconds / 2):
+            for file_set_id in self.file_set_ids:
+                try:
+                    self._renew(file_set_id, self.ttl_seconds)
+                except grpc.RpcError as err:
+                    self.errors[file_set_id] = err
+                    self.remove(file_set_id)
+
+
 class _AtomicOp:
     """Represents an operation in a `ModifyFile` call."""
 
@@ -1693,10 +2735,9 @@ class _AtomicModifyFilepathOp(_AtomicOp):
     def reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
         if not self.append:
             yield _delete_file_req(self.path, self.datum)
-        with open(self.local_path, "rb") as f:
-            yield _add_file_req(path=self.path, datum=self.datum)
-            for _, chunk in enumerate(f):
-                yield _add_file_req(path=self.path, datum=self.datum, chunk=chunk)
+        with open(self.local_path, "rb", buffering=0) as f:
+            size_hint = os.fstat(f.fileno()).st_size
+            yield from _add_file_reqs(self.path, self.datum, _read_chunks(f, size_hint))
 
 
 class _AtomicModifyFileobjOp(_AtomicOp):
@@ -1712,12 +2753,29 @@ class _AtomicModifyFileobjOp(_AtomicOp):
     def reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
         if not self.append:
             yield _delete_file_req(self.path, self.datum)
-        yield _add_file_req(path=self.path, datum=self.datum)
-        for _ in itertools.count():
-            chunk = self.fobj.read(BUFFER_SIZE)
-            if len(chunk) == 0:
-                return
-            yield _add_file_req(path=self.path, datum=self.datum, chunk=chunk)
+        yield from _add_file_reqs(self.path, self.datum, _read_chunks(self.fobj))
+
+
+class _AtomicModifyBytesOp(_AtomicOp):
+    """A `ModifyFile` operation to put files from bytestrings. Files that do
+    not need to be split are sent as a single message each.
+    """
+
+    def __init__(
+        self,
+        files: IterableType[Tuple[str, bytes]],
+        datum: str = None,
+        append: bool = False,
+    ):
+        super().__init__(None, datum)
+        self.files = files
+        self.append = append
+
+    def reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
+        for path, value in self.files:
+            if not self.append:
+                yield _delete_file_req(path, self.datum)
+            yield from _add_file_reqs(path, self.datum, _split_chunks(value))
 
 
 class _AtomicModifyFileURLOp(_AtomicOp):
@@ -1792,6 +2850,88 @@ class _AtomicDeleteFileOp(_AtomicOp):
         yield _delete_file_req(self.path, self.datum)
 
 
+def _read_chunks(fobj: BinaryIO, size_hint: int = None) -> Iterator[bytes]:
+    """Reads `fobj` in fixed-size chunks of at most ``BUFFER_SIZE`` bytes,
+    independent of the content (i.e. newlines) of the file.
+
+    If `size_hint` is given and `fobj` supports ``readinto``, every chunk is
+    read into a single reused buffer sized to `size_hint` (but at least
+    ``MIN_BUFFER_SIZE``), so small files do not allocate a full
+    ``BUFFER_SIZE`` buffer. Otherwise falls back to ``read``.
+    """
+    if size_hint is None or not hasattr(fobj, "readinto"):
+        while True:
+            chunk = fobj.read(BUFFER_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    buffer_size = min(max(size_hint, MIN_BUFFER_SIZE), BUFFER_SIZE)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while True:
+        # Fill the buffer completely before sending (raw files and pipes may
+        # return short reads) so that every message but the last is full.
+        filled = 0
+        while filled < buffer_size:
+            n = fobj.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        if filled == 0:
+            return
+        # The protobuf message needs to own its bytes, so this is the one copy
+        # made per chunk. The buffer itself is reused for the next read.
+        yield bytes(view[:filled])
+        if filled < buffer_size:
+            return
+
+
+def _check_bytes(path: str, value: bytes) -> Union[bytes, memoryview]:
+    """Returns `value`, or a byte view of it if it is another object
+    supporting the buffer protocol, e.g. an ``array.array`` or an ``mmap``.
+    Anything else is rejected, as ``bytes(value)`` would otherwise accept
+    e.g. an int, and upload that many zero bytes.
+    """
+    if isinstance(value, bytes):
+        return value
+    try:
+        return memoryview(value).cast("B")
+    except TypeError:
+        raise TypeError(
+            "the content of {} must be bytes-like, not {}".format(
+                path, type(value).__name__
+            )
+        ) from None
+
+
+def _split_chunks(value: bytes) -> Iterator[bytes]:
+    """Splits `value` into chunks of at most ``BUFFER_SIZE`` bytes. A value
+    that fits is yielded as is, without a copy.
+    """
+    if len(value) <= BUFFER_SIZE:
+        if value:
+            yield bytes(value)
+        return
+    view = memoryview(value)
+    for i in range(0, len(view), BUFFER_SIZE):
+        yield bytes(view[i : i + BUFFER_SIZE])
+
+
+def _add_file_reqs(
+    path: str, datum: str, chunks: Iterator[bytes]
+) -> Iterator[pfs_pb2.ModifyFileRequest]:
+    """Yields an ``AddFile`` request for each chunk of a file. An empty file
+    is sent as one ``AddFile`` without content, so that it is still created.
+    """
+    empty = True
+    for chunk in chunks:
+        empty = False
+        yield _add_file_req(path=path, datum=datum, chunk=chunk)
+    if empty:
+        yield _add_file_req(path=path, datum=datum)
+
+
 def _add_file_req(path: str, datum: str = None, chunk: bytes = None):
     return pfs_pb2.ModifyFileRequest(
         add_file=pfs_pb2.AddFile(
@@ -1,7 +1,13 @@
+from __future__ import annotations
+
 import json
 import base64
+import heapq
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timedelta
-from typing import Dict, Iterator, List, Union
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple, Union
 
 try:
     from collections.abc import Iterable
@@ -13,7 +19,15 @@ from google.protobuf import empty_pb2, duration_pb2
 
 from python_pachyderm.pfs import commit_from, SubcommitType
 from python_pachyderm.proto.v2.pfs import pfs_pb2
-from python_pachyderm.proto.v2.pps import pps_pb2, pps_pb2_grpc
+from python_pachyderm._batch import DEFAULT_CONCURRENCY, call_many
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+pps_pb2 = lazy_import("python_pachyderm.proto.v2.pps.pps_pb2")
+pps_pb2_grpc = lazy_import("python_pachyderm.proto.v2.pps.pps_pb2_grpc")
+transaction_pb2 = lazy_import("python_pachyderm.proto.v2.transaction.transaction_pb2")
+
+# The default number of jobs or datums fetched per call when paginating.
+DEFAULT_PAGE_SIZE = 1000
 
 
 class PPSMixin:
@@ -21,9 +35,7 @@ class PPSMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = pps_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(pps_pb2_grpc, "APIStub")
 
     def inspect_job(
         self,
@@ -187,6 +199,172 @@ class PPSMixin:
             )
             return self.__stub.ListJobSet(message)
 
+    def list_job_paginated(
+        self,
+        pipeline_name: str = None,
+        input_commit: SubcommitType = None,
+        history: int = 0,
+        details: bool = False,
+        jqFilter: str = None,
+        project_name: str = None,
+        projects_filter: List[str] = None,
+        reverse: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+        retries: int = 5,
+    ) -> Iterator[pps_pb2.JobInfo]:
+        """Lists subjobs (jobs at the pipeline-level) a page at a time, newest
+        first unless `reverse`, following the pagination markers. See
+        :meth:`list_job` for the parameters it shares.
+
+        Each page is a separate ``ListJob`` call of about `page_size`
+        subjobs, so no stream stays open for long. If fetching a page fails
+        with ``UNAVAILABLE``, it is fetched again from the same marker.
+
+        The marker is the creation time of the last subjob of a page, which
+        other subjobs may share. Each page is therefore requested from that
+        time on inclusively, and the subjobs already returned are skipped.
+
+        Parameters
+        ----------
+        pipeline_name : str, optional
+            The name of a pipeline. If unset, lists the subjobs of all
+            pipelines.
+        page_size : int, optional
+            The number of subjobs to fetch per call.
+        prefetch : bool, optional
+            If true, fetches the next page in the background while the
+            current one is iterated through.
+        retries : int, optional
+            How many times in a row to fetch a page again before raising.
+
+        Returns
+        -------
+        Iterator[pps_pb2.JobInfo]
+            An iterator of protobuf objects that contain info on subjobs.
+
+        Examples
+        --------
+        >>> for job in client.list_job_paginated("foo", page_size=100):
+        >>>     print(job.job.id)
+        """
+        if isinstance(projects_filter, Iterable):
+            projects_filter = [pfs_pb2.Project(name=p.name) for p in projects_filter]
+        if isinstance(input_commit, list):
+            input_commit = [commit_from(ic) for ic in input_commit]
+        elif input_commit is not None:
+            input_commit = [commit_from(input_commit)]
+        message = pps_pb2.ListJobRequest(
+            details=details,
+            history=history,
+            input_commit=input_commit,
+            jqFilter=jqFilter,
+            projects=projects_filter,
+            number=page_size,
+            reverse=reverse,
+        )
+        if pipeline_name is not None:
+            message.pipeline.CopyFrom(
+                pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                )
+            )
+
+        def list_page(
+            last: Optional[pps_pb2.JobInfo], number: int
+        ) -> Iterator[pps_pb2.JobInfo]:
+            request = pps_pb2.ListJobRequest()
+            request.CopyFrom(message)
+            request.number = number
+            if last is not None:
+                # The marker is exclusive, so it is moved one nanosecond past
+                # the last creation time to include the subjobs sharing it.
+                step = -1 if reverse else 1
+                request.paginationMarker.FromNanoseconds(
+                    last.created.ToNanoseconds() + step
+                )
+            return self.__stub.ListJob(request)
+
+        def boundary(info: pps_pb2.JobInfo) -> Tuple[Tuple, Tuple]:
+            # Subjobs of different pipelines can share an ID.
+            pipeline = info.job.pipeline
+            return (
+                (info.created.seconds, info.created.nanos),
+                (pipeline.project.name, pipeline.name, info.job.id),
+            )
+
+        return _paginate(list_page, page_size, prefetch, retries, boundary)
+
+    def subscribe_job(
+        self,
+        pipeline_name: str,
+        details: bool = False,
+        project_name: str = None,
+        states: Iterable[pps_pb2.JobState] = None,
+        retries: int = 5,
+    ) -> Iterator[pps_pb2.JobInfo]:
+        """Returns the subjobs (jobs at the pipeline-level) of a pipeline, and
+        then listens for new subjobs and changes to them.
+
+        If the stream fails with ``UNAVAILABLE``, e.g. because pachd
+        restarted, it is reopened. pachd then sends every subjob again, so
+        those already returned unchanged are skipped, and the stream carries
+        on where it left off. Only the 10,000 subjobs that finished most
+        recently are remembered, so older ones may be returned again.
+
+        Parameters
+        ----------
+        pipeline_name : str
+            The name of the pipeline.
+        details : bool, optional
+            If true, return worker details.
+        project_name : str
+            The name of the project.
+        states : Iterable[pps_pb2.JobState], optional
+            If set, return subjobs only when they are in one of these states,
+            e.g. ``JOB_SUCCESS`` and ``JOB_FAILURE`` to only return subjobs
+            as they finish. Filtering happens client-side.
+        retries : int, optional
+            How many times in a row to reopen the stream before raising.
+
+        Returns
+        -------
+        Iterator[pps_pb2.JobInfo]
+            An iterator of protobuf objects that contain info on subjobs. Use
+            ``next()`` to iterate through as the returned stream is
+            potentially endless. Might block your code otherwise.
+
+        Examples
+        --------
+        >>> for job in client.subscribe_job("foo", states=[pps_pb2.JobState.JOB_SUCCESS]):
+        >>>     print(job.job.id)
+
+        .. # noqa: W505
+        """
+        message = pps_pb2.SubscribeJobRequest(
+            pipeline=pps_pb2.Pipeline(
+                name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+            ),
+            details=details,
+        )
+        changed = _JobChanges(states)
+        failures = 0
+        while True:
+            stream = self.__stub.SubscribeJob(message)
+            try:
+                for info in stream:
+                    failures = 0
+                    if changed(info):
+                        yield info
+                return
+            except grpc.RpcError as error:
+                failures += 1
+                if error.code() != grpc.StatusCode.UNAVAILABLE or failures > retries:
+                    raise
+            finally:
+                stream.cancel()
+            time.sleep(0.1 * 2**failures)
+
     def delete_job(
         self, job_id: str, pipeline_name: str, project_name: str = None
     ) -> None:
@@ -353,6 +531,76 @@ class PPSMixin:
             message.input.CopyFrom(input)
         return self.__stub.ListDatum(message)
 
+    def list_datum_paginated(
+        self,
+        pipeline_name: str,
+        job_id: str,
+        project_name: str = None,
+        datum_filter: pps_pb2.ListDatumRequest.Filter = None,
+        reverse: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+        retries: int = 5,
+    ) -> Iterator[pps_pb2.DatumInfo]:
+        """Lists the datums of a subjob a page at a time, following the
+        pagination markers. See :meth:`list_datum` for the parameters it
+        shares.
+
+        Each page is a separate ``ListDatum`` call of up to `page_size`
+        datums, so listing a job with millions of datums does not rely on
+        one long-lived stream. If fetching a page fails with
+        ``UNAVAILABLE``, it is fetched again from the same marker rather
+        than from the first datum.
+
+        Parameters
+        ----------
+        page_size : int, optional
+            The number of datums to fetch per call.
+        prefetch : bool, optional
+            If true, fetches the next page in the background while the
+            current one is iterated through.
+        retries : int, optional
+            How many times in a row to fetch a page again before raising.
+
+        Returns
+        -------
+        Iterator[pps_pb2.DatumInfo]
+            An iterator of protobuf objects that contain info on a datum.
+
+        Examples
+        --------
+        >>> failed = client.list_datum_paginated(
+        ...     "foo",
+        ...     "467c580611234cdb8cc9758c7aa96087",
+        ...     datum_filter=pps_pb2.ListDatumRequest.Filter(
+        ...         state=[pps_pb2.DatumState.FAILED]
+        ...     ),
+        ... )
+        """
+        message = pps_pb2.ListDatumRequest(
+            job=pps_pb2.Job(
+                pipeline=pps_pb2.Pipeline(
+                    name=pipeline_name, project=pfs_pb2.Project(name=project_name)
+                ),
+                id=job_id,
+            ),
+            filter=datum_filter,
+            number=page_size,
+            reverse=reverse,
+        )
+
+        def list_page(
+            last: Optional[pps_pb2.DatumInfo], number: int
+        ) -> Iterator[pps_pb2.DatumInfo]:
+            request = pps_pb2.ListDatumRequest()
+            request.CopyFrom(message)
+            request.number = number
+            if last is not None:
+                request.paginationMarker = last.datum.id
+            return self.__stub.ListDatum(request)
+
+        return _paginate(list_page, page_size, prefetch, retries)
+
     def restart_datum(
         self,
         pipeline_name: str,
@@ -567,6 +815,43 @@ class PPSMixin:
         """
         self.__stub.CreatePipeline(req)
 
+    def create_pipelines(
+        self, requests: Iterable[pps_pb2.CreatePipelineRequest]
+    ) -> transaction_pb2.TransactionInfo:
+        """Creates several pipelines, e.g. a DAG, atomically in one batch
+        transaction. Pipelines are created after those whose output repos
+        they take as input, regardless of the order of `requests`.
+
+        Parameters
+        ----------
+        requests : Iterable[pps_pb2.CreatePipelineRequest]
+            The ``CreatePipelineRequest`` objects, e.g. from
+            ``util.parse_json_pipeline_spec()``.
+
+        Returns
+        -------
+        transaction_pb2.TransactionInfo
+            A protobuf object with info on the transaction.
+
+        Raises
+        ------
+        ValueError
+            If the pipelines take each other's output as input in a cycle.
+
+        Examples
+        --------
+        >>> client.create_pipelines(
+        ...     python_pachyderm.parse_dict_pipeline_spec(spec)
+        ...     for spec in (edges_spec, montage_spec)
+        ... )
+        """
+        return self.batch_transaction(
+            [
+                transaction_pb2.TransactionRequest(create_pipeline=request)
+                for request in _topological_order(list(requests))
+            ]
+        )
+
     def inspect_pipeline(
         self,
         pipeline_name: str,
@@ -628,6 +913,44 @@ class PPSMixin:
             )
             return self.__stub.ListPipeline(message)
 
+    def inspect_pipelines(
+        self,
+        pipeline_names: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        details: bool = False,
+        project_name: str = None,
+    ) -> List[pps_pb2.PipelineInfo]:
+        """Inspects the current version of many pipelines, with up to
+        `concurrency` calls in flight at once on the client's channel.
+
+        Parameters
+        ----------
+        pipeline_names : Iterable[str]
+            The names of the pipelines.
+        concurrency : int, optional
+            The most calls to have in flight at once.
+        details : bool, optional
+            If true, return pipeline details.
+        project_name : str
+            The name of the project.
+
+        Returns
+        -------
+        List[pps_pb2.PipelineInfo]
+            Protobuf objects with info on the pipelines, in the order of
+            `pipeline_names`. If any call fails, its error is raised.
+        """
+        messages = (
+            pps_pb2.InspectPipelineRequest(
+                details=details,
+                pipeline=pps_pb2.Pipeline(
+                    name=name, project=pfs_pb2.Project(name=project_name)
+                ),
+            )
+            for name in pipeline_names
+        )
+        return call_many(self.__stub.InspectPipeline, messages, concurrency)
+
     def list_pipeline(
         self,
         history: int = 0,
@@ -714,6 +1037,45 @@ class PPSMixin:
         message = empty_pb2.Empty()
         self.__stub.DeleteAll(message)
 
+    def delete_pipelines(
+        self,
+        project_names: List[str] = None,
+        all: bool = False,
+        force: bool = False,
+        keep_repo: bool = False,
+    ) -> List[pps_pb2.Pipeline]:
+        """Deletes the pipelines of some projects, or of all projects, in one
+        call.
+
+        Parameters
+        ----------
+        project_names : List[str], optional
+            The projects whose pipelines to delete.
+        all : bool, optional
+            If true, deletes the pipelines of all projects, and
+            `project_names` is ignored.
+        force : bool, optional
+            If true, forces the pipeline deletion.
+        keep_repo : bool, optional
+            If true, keeps the output repos.
+
+        Returns
+        -------
+        List[pps_pb2.Pipeline]
+            The pipelines that were deleted.
+
+        Examples
+        --------
+        >>> client.delete_pipelines(["staging"])
+        """
+        message = pps_pb2.DeletePipelinesRequest(
+            projects=[pfs_pb2.Project(name=name) for name in project_names or []],
+            all=all,
+            force=force,
+            keep_repo=keep_repo,
+        )
+        return list(self.__stub.DeletePipelines(message).pipelines)
+
     def start_pipeline(self, pipeline_name: str, project_name: str = None) -> None:
         """Starts a pipeline.
 
@@ -1004,3 +1366,172 @@ class PPSMixin:
         message = pps_pb2.LokiRequest(query=query, since=since)
         for item in self.__stub.QueryLoki(message):
             yield item
+
+
+class _JobChanges:
+    """Tells which JobInfos of a job subscription are new to the caller.
+    A reopened subscription sends every subjob again, so those already seen
+    unchanged are dropped, as are those not in `states`.
+
+    Only the subjobs still running are kept with their last JobInfo. Those
+    that finished, which no longer change, are kept by ID and only the most
+    recent `max_finished` of them, so memory stays bounded however long the
+    subscription lasts.
+    """
+
+    def __init__(
+        self,
+        states: Optional[Iterable[pps_pb2.JobState]],
+        max_finished: int = 10_000,
+    ):
+        self._states: Optional[Set[int]] = None if states is None else set(states)
+        self._max_finished = max_finished
+        # Built here rather than in the class body, which would import the
+        # lazily loaded pps_pb2 with python_pachyderm.
+        self._terminal = {
+            pps_pb2.JobState.JOB_SUCCESS,
+            pps_pb2.JobState.JOB_FAILURE,
+            pps_pb2.JobState.JOB_KILLED,
+            pps_pb2.JobState.JOB_UNRUNNABLE,
+        }
+        # The hash of the last JobInfo seen of each running subjob.
+        self._seen: Dict[str, int] = {}
+        # The IDs of the subjobs seen finished, least recent first.
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def __call__(self, info: pps_pb2.JobInfo) -> bool:
+        job_id = info.job.id
+        if job_id in self._finished:
+            self._finished.move_to_end(job_id)
+            return False
+        if info.state in self._terminal:
+            self._seen.pop(job_id, None)
+            self._finished[job_id] = None
+            if len(self._finished) > self._max_finished:
+                self._finished.popitem(last=False)
+            return self._states is None or info.state in self._states
+        if self._states is not None and info.state not in self._states:
+            return False
+        digest = hash(info.SerializeToString(deterministic=True))
+        if self._seen.get(job_id) == digest:
+            return False
+        self._seen[job_id] = digest
+        return True
+
+
+def _topological_order(
+    requests: List[pps_pb2.CreatePipelineRequest],
+) -> List[pps_pb2.CreatePipelineRequest]:
+    """Orders `requests` so that each pipeline comes after the pipelines of
+    `requests` whose output repos it takes as input, and otherwise keeps
+    their order.
+    """
+
+    def key(project: str, name: str) -> Tuple[str, str]:
+        return (project or "default", name)
+
+    def input_repos(input: pps_pb2.Input) -> Iterator[Tuple[str, str]]:
+        if input.HasField("pfs"):
+            yield key(input.pfs.project, input.pfs.repo)
+        for inputs in (input.join, input.group, input.cross, input.union):
+            for i in inputs:
+                yield from input_repos(i)
+
+    outputs = {
+        key(r.pipeline.project.name, r.pipeline.name): i for i, r in enumerate(requests)
+    }
+    # The requests each request waits for, and those waiting for each.
+    waits_for: List[Set[int]] = []
+    waiters: List[List[int]] = [[] for _ in requests]
+    for i, request in enumerate(requests):
+        waits_for.append(set())
+        for repo in input_repos(request.input):
+            j = outputs.get(repo)
+            if j is not None and j != i and j not in waits_for[i]:
+                waits_for[i].add(j)
+                waiters[j].append(i)
+
+    ready = [i for i in range(len(requests)) if not waits_for[i]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        j = heapq.heappop(ready)
+        order.append(requests[j])
+        for i in waiters[j]:
+            waits_for[i].discard(j)
+            if not waits_for[i]:
+                heapq.heappush(ready, i)
+    if len(order) < len(requests):
+        cycle = [
+            requests[i].pipeline.name for i in range(len(requests)) if waits_for[i]
+        ]
+        raise ValueError(f"the inputs of pipelines {cycle} form a cycle")
+    return order
+
+
+def _paginate(
+    list_page: Callable[[Optional[object], int], Iterator],
+    page_size: int,
+    prefetch: bool,
+    retries: int,
+    boundary: Optional[Callable[[object], Tuple[Hashable, Hashable]]] = None,
+) -> Iterator:
+    """Yields the items of the pages returned by `list_page`, which is
+    called with the last item of the previous page (or None for the first)
+    and the number of items to fetch, and returns the next page, until a
+    page comes back short.
+
+    If the pagination marker of an item is not unique, `boundary` returns
+    the marker and a unique key of an item. `list_page` must then return
+    the items from the marker of the last item on inclusively, and those
+    already yielded are skipped. Each page is made larger by the number of
+    items skipped, so listing carries on however many items share a marker.
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+
+    def fetch(last, number: int) -> List:
+        failures = 0
+        while True:
+            try:
+                return list(list_page(last, number))
+            except grpc.RpcError as error:
+                failures += 1
+                if error.code() != grpc.StatusCode.UNAVAILABLE or failures > retries:
+                    raise
+            time.sleep(0.1 * 2**failures)
+
+    def new(page: List, skip: Set[Hashable]) -> Iterator:
+        if boundary is None:
+            return iter(page)
+        return (item for item in page if boundary(item)[1] not in skip)
+
+    def pages() -> Iterator:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            number = page_size
+            page = fetch(None, number)
+            # The marker of the last item yielded, and the keys of the items
+            # yielded that share it.
+            marker, skip = None, set()
+            following: Optional[Future] = None
+            try:
+                while len(page) == number:
+                    yielded = skip
+                    if boundary is not None:
+                        last = boundary(page[-1])[0]
+                        if last != marker:
+                            marker, skip = last, set()
+                        skip = skip | {
+                            key for m, key in map(boundary, page) if m == marker
+                        }
+                        number = page_size + len(skip)
+                    if prefetch:
+                        following = executor.submit(fetch, page[-1], number)
+                    yield from new(page, yielded)
+                    page = following.result() if prefetch else fetch(page[-1], number)
+                yield from new(page, skip)
+            finally:
+                if following is not None:
+                    following.cancel()
+
+    return pages()
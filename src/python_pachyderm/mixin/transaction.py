@@ -1,9 +1,16 @@
+from __future__ import annotations
+
 from contextlib import contextmanager
 from typing import Iterator, List, Union
 
 import grpc
 
-from python_pachyderm.proto.v2.transaction import transaction_pb2, transaction_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+transaction_pb2 = lazy_import("python_pachyderm.proto.v2.transaction.transaction_pb2")
+transaction_pb2_grpc = lazy_import(
+    "python_pachyderm.proto.v2.transaction.transaction_pb2_grpc"
+)
 
 
 def _transaction_from(transaction):
@@ -18,9 +25,7 @@ class TransactionMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = transaction_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(transaction_pb2_grpc, "APIStub")
 
     def batch_transaction(
         self, requests: List[transaction_pb2.TransactionRequest]
@@ -49,7 +54,9 @@ class TransactionMixin:
         ])
         """
         message = transaction_pb2.BatchTransactionRequest(requests=requests)
-        return self.__stub.BatchTransaction(message)
+        info = self.__stub.BatchTransaction(message)
+        self._transaction_finished()
+        return info
 
     def start_transaction(self) -> transaction_pb2.Transaction:
         """Starts a transaction.
@@ -160,7 +167,16 @@ class TransactionMixin:
         message = transaction_pb2.FinishTransactionRequest(
             transaction=_transaction_from(transaction)
         )
-        return self.__stub.FinishTransaction(message)
+        info = self.__stub.FinishTransaction(message)
+        self._transaction_finished()
+        return info
+
+    def _transaction_finished(self) -> None:
+        # The writes of a transaction take effect only once it finishes, and
+        # may touch any repo, so the whole metadata cache is dropped.
+        cache = getattr(self, "metadata_cache", None)
+        if cache is not None:
+            cache.clear()
 
     @contextmanager
     def transaction(self) -> Iterator[transaction_pb2.Transaction]:
@@ -1,7 +1,14 @@
+from __future__ import annotations
+
 import grpc
 from google.protobuf import empty_pb2
 
-from python_pachyderm.proto.v2.version.versionpb import version_pb2, version_pb2_grpc
+from python_pachyderm._lazy import lazy_import, lazy_stub
+
+version_pb2 = lazy_import("python_pachyderm.proto.v2.version.versionpb.version_pb2")
+version_pb2_grpc = lazy_import(
+    "python_pachyderm.proto.v2.version.versionpb.version_pb2_grpc"
+)
 
 
 class VersionMixin:
@@ -9,9 +16,7 @@ class VersionMixin:
 
     _channel: grpc.Channel
 
-    def __init__(self):
-        self.__stub = version_pb2_grpc.APIStub(self._channel)
-        super().__init__()
+    __stub = lazy_stub(version_pb2_grpc, "APIStub")
 
     def get_remote_version(self) -> version_pb2.Version:
         """Gets version of Pachyderm server.
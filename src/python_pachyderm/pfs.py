@@ -122,3 +122,10 @@ def commit_from(
         return None
 
     raise TypeError("Please provide a tuple, dict, or Commit object")
+
+
+def commit_repo(commit: pfs_pb2.Commit) -> pfs_pb2.Repo:
+    """Returns the repo of `commit`, which is set either on the commit (as
+    by pachd) or on its branch (as by :func:`commit_from`).
+    """
+    return commit.repo if commit.repo.name else commit.branch.repo
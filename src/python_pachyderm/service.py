@@ -1,29 +1,35 @@
+import json
 from enum import Enum
+from typing import Any, List, NamedTuple, Optional, Tuple
 
-from grpc_health.v1 import health_pb2 as health_proto
-from grpc_health.v1 import health_pb2_grpc as health_grpc
-from python_pachyderm.proto.v2.admin import admin_pb2 as admin_proto
-from python_pachyderm.proto.v2.admin import admin_pb2_grpc as admin_grpc
-from python_pachyderm.proto.v2.auth import auth_pb2 as auth_proto
-from python_pachyderm.proto.v2.auth import auth_pb2_grpc as auth_grpc
-from python_pachyderm.proto.v2.debug import debug_pb2 as debug_proto
-from python_pachyderm.proto.v2.debug import debug_pb2_grpc as debug_grpc
-from python_pachyderm.proto.v2.enterprise import enterprise_pb2 as enterprise_proto
-from python_pachyderm.proto.v2.enterprise import enterprise_pb2_grpc as enterprise_grpc
-from python_pachyderm.proto.v2.identity import identity_pb2 as identity_proto
-from python_pachyderm.proto.v2.identity import identity_pb2_grpc as identity_grpc
-from python_pachyderm.proto.v2.license import license_pb2 as license_proto
-from python_pachyderm.proto.v2.license import license_pb2_grpc as license_grpc
-from python_pachyderm.proto.v2.pfs import pfs_pb2 as pfs_proto
-from python_pachyderm.proto.v2.pfs import pfs_pb2_grpc as pfs_grpc
-from python_pachyderm.proto.v2.pps import pps_pb2 as pps_proto
-from python_pachyderm.proto.v2.pps import pps_pb2_grpc as pps_grpc
-from python_pachyderm.proto.v2.transaction import transaction_pb2 as transaction_proto
-from python_pachyderm.proto.v2.transaction import (
-    transaction_pb2_grpc as transaction_grpc,
-)
-from python_pachyderm.proto.v2.version.versionpb import version_pb2 as version_proto
-from python_pachyderm.proto.v2.version.versionpb import version_pb2_grpc as version_grpc
+import grpc
+
+from python_pachyderm._lazy import lazy_import
+
+_PROTO = "python_pachyderm.proto.v2"
+
+health_proto = lazy_import("grpc_health.v1.health_pb2")
+health_grpc = lazy_import("grpc_health.v1.health_pb2_grpc")
+admin_proto = lazy_import(f"{_PROTO}.admin.admin_pb2")
+admin_grpc = lazy_import(f"{_PROTO}.admin.admin_pb2_grpc")
+auth_proto = lazy_import(f"{_PROTO}.auth.auth_pb2")
+auth_grpc = lazy_import(f"{_PROTO}.auth.auth_pb2_grpc")
+debug_proto = lazy_import(f"{_PROTO}.debug.debug_pb2")
+debug_grpc = lazy_import(f"{_PROTO}.debug.debug_pb2_grpc")
+enterprise_proto = lazy_import(f"{_PROTO}.enterprise.enterprise_pb2")
+enterprise_grpc = lazy_import(f"{_PROTO}.enterprise.enterprise_pb2_grpc")
+identity_proto = lazy_import(f"{_PROTO}.identity.identity_pb2")
+identity_grpc = lazy_import(f"{_PROTO}.identity.identity_pb2_grpc")
+license_proto = lazy_import(f"{_PROTO}.license.license_pb2")
+license_grpc = lazy_import(f"{_PROTO}.license.license_pb2_grpc")
+pfs_proto = lazy_import(f"{_PROTO}.pfs.pfs_pb2")
+pfs_grpc = lazy_import(f"{_PROTO}.pfs.pfs_pb2_grpc")
+pps_proto = lazy_import(f"{_PROTO}.pps.pps_pb2")
+pps_grpc = lazy_import(f"{_PROTO}.pps.pps_pb2_grpc")
+transaction_proto = lazy_import(f"{_PROTO}.transaction.transaction_pb2")
+transaction_grpc = lazy_import(f"{_PROTO}.transaction.transaction_pb2_grpc")
+version_proto = lazy_import(f"{_PROTO}.version.versionpb.version_pb2")
+version_grpc = lazy_import(f"{_PROTO}.version.versionpb.version_pb2_grpc")
 
 MB = 1024**2
 MAX_RECEIVE_MESSAGE_SIZE = 20 * MB
@@ -35,6 +41,142 @@ GRPC_CHANNEL_OPTIONS = [
     # ("grpc.secondary_user_agent", SECONDARY_USER_AGENT),
 ]
 
+# Unary RPCs that only read state, and so are safe to retry.
+IDEMPOTENT_METHODS = [
+    ("admin_v2.API", "InspectCluster"),
+    ("auth_v2.API", "GetConfiguration"),
+    ("auth_v2.API", "GetGroups"),
+    ("auth_v2.API", "GetGroupsForPrincipal"),
+    ("auth_v2.API", "GetPermissions"),
+    ("auth_v2.API", "GetPermissionsForPrincipal"),
+    ("auth_v2.API", "GetRoleBinding"),
+    ("auth_v2.API", "GetRolesForPermission"),
+    ("auth_v2.API", "GetUsers"),
+    ("auth_v2.API", "WhoAmI"),
+    ("enterprise_v2.API", "GetState"),
+    ("grpc.health.v1.Health", "Check"),
+    ("identity_v2.API", "GetIDPConnector"),
+    ("identity_v2.API", "GetIdentityServerConfig"),
+    ("identity_v2.API", "GetOIDCClient"),
+    ("identity_v2.API", "ListIDPConnectors"),
+    ("identity_v2.API", "ListOIDCClients"),
+    ("license_v2.API", "ListClusters"),
+    ("pfs_v2.API", "InspectBranch"),
+    ("pfs_v2.API", "InspectCommit"),
+    ("pfs_v2.API", "InspectFile"),
+    ("pfs_v2.API", "InspectProject"),
+    ("pfs_v2.API", "InspectRepo"),
+    ("pps_v2.API", "InspectDatum"),
+    ("pps_v2.API", "InspectJob"),
+    ("pps_v2.API", "InspectPipeline"),
+    ("pps_v2.API", "InspectSecret"),
+    ("transaction_v2.API", "InspectTransaction"),
+    ("versionpb_v2.API", "GetVersion"),
+]
+
+DEFAULT_RETRY_POLICY = {
+    "maxAttempts": 4,
+    "initialBackoff": "0.1s",
+    "maxBackoff": "5s",
+    "backoffMultiplier": 2,
+    "retryableStatusCodes": ["UNAVAILABLE"],
+}
+
+
+class ChannelOptions(NamedTuple):
+    """Settings for the gRPC channel a :class:`.Client` connects with. All
+    fields are optional; the defaults match the client's previous behavior,
+    plus retries of ``IDEMPOTENT_METHODS``.
+
+    Parameters
+    ----------
+    max_receive_message_length : int, optional
+        The largest message the client accepts, in bytes.
+    max_send_message_length : int, optional
+        The largest message the client sends, in bytes. Unlimited if unset.
+    keepalive_time_ms : int, optional
+        If set, send HTTP/2 keepalive pings at this interval, so that long
+        idle streams (e.g. ``subscribe_commit``) survive load balancers.
+    keepalive_timeout_ms : int, optional
+        How long to wait for a keepalive ping to be acknowledged before the
+        connection is considered dead.
+    keepalive_permit_without_calls : bool, optional
+        Whether to send keepalive pings when there are no calls in flight.
+    http2_lookahead_bytes : int, optional
+        The initial HTTP/2 stream window size. Raise this for links with a
+        high bandwidth-delay product.
+    compression : grpc.Compression, optional
+        The compression used for requests. Responses are compressed at the
+        server's discretion.
+    streaming_compression : grpc.Compression, optional
+        Overrides `compression` for client-streaming RPCs, i.e. file
+        uploads through ``ModifyFile``.
+    retry_policy : dict, optional
+        A gRPC service config retry policy applied to `retry_methods`, or
+        None to disable retries.
+    retry_methods : List[Tuple[str, str]], optional
+        The (service, method) pairs to retry.
+    extra_options : List[Tuple[str, Any]], optional
+        Any other gRPC channel arguments.
+
+    Examples
+    --------
+    >>> options = python_pachyderm.ChannelOptions(
+    ...     keepalive_time_ms=30_000,
+    ...     streaming_compression=grpc.Compression.Gzip,
+    ... )
+    >>> client = python_pachyderm.Client(channel_options=options)
+    """
+
+    max_receive_message_length: int = MAX_RECEIVE_MESSAGE_SIZE
+    max_send_message_length: Optional[int] = None
+    keepalive_time_ms: Optional[int] = None
+    keepalive_timeout_ms: Optional[int] = None
+    keepalive_permit_without_calls: bool = False
+    http2_lookahead_bytes: Optional[int] = None
+    compression: Optional[grpc.Compression] = None
+    streaming_compression: Optional[grpc.Compression] = None
+    retry_policy: Optional[dict] = DEFAULT_RETRY_POLICY
+    retry_methods: List[Tuple[str, str]] = IDEMPOTENT_METHODS
+    extra_options: List[Tuple[str, Any]] = []
+
+    def to_grpc_options(self) -> List[Tuple[str, Any]]:
+        """Returns the settings as gRPC channel arguments."""
+        options = [
+            ("grpc.max_receive_message_length", self.max_receive_message_length),
+            ("grpc.primary_user_agent", PRIMARY_USER_AGENT),
+        ]
+        if self.max_send_message_length is not None:
+            options.append(
+                ("grpc.max_send_message_length", self.max_send_message_length)
+            )
+        if self.keepalive_time_ms is not None:
+            options.append(("grpc.keepalive_time_ms", self.keepalive_time_ms))
+            # Otherwise only two pings are sent while no data is exchanged.
+            options.append(("grpc.http2.max_pings_without_data", 0))
+        if self.keepalive_timeout_ms is not None:
+            options.append(("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms))
+        if self.keepalive_permit_without_calls:
+            options.append(("grpc.keepalive_permit_without_calls", 1))
+        if self.http2_lookahead_bytes is not None:
+            options.append(("grpc.http2.lookahead_bytes", self.http2_lookahead_bytes))
+        if self.retry_policy is not None and self.retry_methods:
+            service_config = {
+                "methodConfig": [
+                    {
+                        "name": [
+                            {"service": service, "method": method}
+                            for service, method in self.retry_methods
+                        ],
+                        "retryPolicy": self.retry_policy,
+                    }
+                ]
+            }
+            options.append(("grpc.enable_retries", 1))
+            options.append(("grpc.service_config", json.dumps(service_config)))
+        options.extend(self.extra_options)
+        return options
+
 
 class Service(Enum):
     ADMIN = 0
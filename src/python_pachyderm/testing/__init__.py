@@ -0,0 +1,21 @@
+"""
+Testing utilities. :class:`.FakePachd` is an in-process, in-memory gRPC
+server that implements enough of pachd to test and benchmark the client
+without a cluster.
+
+>>> from python_pachyderm.testing import FakePachd
+>>> with FakePachd() as pachd:
+>>>     client = pachd.client()
+>>>     client.create_repo("foo")
+"""
+from .pfs import FakePFS
+from .pps import FakePPS
+from .server import FakePachd
+from .shaping import NetworkConditions
+
+__all__ = [
+    "FakePachd",
+    "FakePFS",
+    "FakePPS",
+    "NetworkConditions",
+]
@@ -0,0 +1,999 @@
+"""An in-memory implementation of the PFS API."""
+
+import bisect
+import hashlib
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import grpc
+from google.protobuf import empty_pb2, timestamp_pb2, wrappers_pb2
+
+from python_pachyderm.proto.v2.pfs import pfs_pb2, pfs_pb2_grpc
+
+# The payload size of each GetFile message; pachd sends up to ~19MB.
+CHUNK_SIZE = 19 * 1024 * 1024
+DEFAULT_PROJECT = "default"
+# How long file sets live unless renewed, in seconds, as in pachd.
+FILE_SET_TTL = 600
+
+# A commit ID or branch name, followed by any number of ancestry suffixes,
+# e.g. "master^" (the parent of master's head) or "master~2".
+_ancestry_re = re.compile(r"^(.*?)((?:\^|~\d+)*)$")
+_ancestry_step_re = re.compile(r"\^|~(\d+)")
+
+
+def _now() -> timestamp_pb2.Timestamp:
+    timestamp = timestamp_pb2.Timestamp()
+    timestamp.GetCurrentTime()
+    return timestamp
+
+
+def _clean_path(path: str) -> str:
+    """Normalizes `path` to an absolute path without a trailing slash. The
+    root directory is the empty string.
+    """
+    return "/" + "/".join(p for p in path.split("/") if p) if path.strip("/") else ""
+
+
+def _glob_re(pattern: str) -> "re.Pattern":
+    """Translates a PFS glob pattern into a regex. ``*`` and ``?`` do not
+    match across path separators, ``**`` does, and ``{a,b}`` matches
+    either alternative.
+    """
+    out, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "{":
+            out.append("(?:")
+        elif c == "}":
+            out.append(")")
+        elif c == "," and "(?:" in out:
+            out.append("|")
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class _Commit:
+    """A commit and its files. Files are shared with the parent commit until
+    they are modified (copy-on-write).
+    """
+
+    def __init__(
+        self,
+        commit: pfs_pb2.Commit,
+        parent: Optional["_Commit"] = None,
+        description: str = "",
+    ):
+        self.info = pfs_pb2.CommitInfo(
+            commit=commit,
+            origin=pfs_pb2.CommitOrigin(kind=pfs_pb2.OriginKind.USER),
+            description=description,
+            started=_now(),
+        )
+        self.parent = parent
+        self.files: Dict[str, bytearray] = {}
+        self.hashes: Dict[str, bytes] = {}
+        # The number of files under each directory, so that directories can
+        # be told apart from missing paths without a scan.
+        self.dirs: Dict[str, int] = {}
+        if parent is not None:
+            self.info.parent_commit.CopyFrom(parent.info.commit)
+            parent.info.child_commits.append(commit)
+            self.files.update(parent.files)
+            self.hashes.update(parent.hashes)
+            self.dirs.update(parent.dirs)
+        self.infos: Dict[Tuple[str, bool], pfs_pb2.FileInfo] = {}
+        self._owned = set()
+        self._paths: Optional[List[str]] = None
+
+    @property
+    def id(self) -> str:
+        return self.info.commit.id
+
+    @property
+    def finished(self) -> bool:
+        return self.info.HasField("finished")
+
+    def finish(self, description: str = "", error: str = "") -> None:
+        now = _now()
+        self.info.finishing.CopyFrom(now)
+        self.info.finished.CopyFrom(now)
+        if description:
+            self.info.description = description
+        self.info.error = error
+        size = sum(len(data) for data in self.files.values())
+        self.info.details.size_bytes = size
+        self.info.size_bytes_upper_bound = size
+
+    def paths(self) -> List[str]:
+        """Returns the paths of all files, sorted."""
+        if self._paths is None:
+            self._paths = sorted(self.files)
+        return self._paths
+
+    def append(self, path: str, data: bytes) -> None:
+        if path not in self._owned:
+            if path not in self.files:
+                self._count(path, 1)
+            self.files[path] = bytearray(self.files.get(path, b""))
+            self._owned.add(path)
+        self.files[path] += data
+        self.hashes.pop(path, None)
+
+    def delete(self, path: str) -> None:
+        """Deletes the file at `path`, or everything under it if it is a
+        directory.
+        """
+        paths = list(self.under(path)) if path in self.dirs else []
+        if path in self.files:
+            paths.append(path)
+        for p in paths:
+            del self.files[p]
+            self.hashes.pop(p, None)
+            self._owned.discard(p)
+            self._count(p, -1)
+
+    def _count(self, path: str, delta: int) -> None:
+        self._paths = None
+        while path:
+            path = path.rsplit("/", 1)[0]
+            count = self.dirs.get(path, 0) + delta
+            if count:
+                self.dirs[path] = count
+            else:
+                del self.dirs[path]
+
+    def under(self, directory: str) -> Iterable[str]:
+        """Yields the sorted paths of all files under `directory`."""
+        paths = self.paths()
+        prefix = directory + "/"
+        for i in range(bisect.bisect_left(paths, prefix), len(paths)):
+            if not paths[i].startswith(prefix):
+                break
+            yield paths[i]
+
+    def is_dir(self, path: str) -> bool:
+        return path == "" or path in self.dirs
+
+    def file_hash(self, path: str) -> bytes:
+        digest = self.hashes.get(path)
+        if digest is None:
+            digest = self.hashes[path] = hashlib.sha256(self.files[path]).digest()
+        return digest
+
+
+class _FileSet:
+    """A file set, recorded as the file operations that make it up. It has
+    the same ``append`` and ``delete`` methods as a commit, so ModifyFile
+    requests can be applied to either.
+    """
+
+    def __init__(self, ttl: float):
+        self.ops: List[Tuple[str, Optional[bytes]]] = []
+        self.renew(ttl)
+
+    def renew(self, ttl: float) -> None:
+        self.expires = time.monotonic() + (ttl or FILE_SET_TTL)
+
+    def append(self, path: str, data: bytes) -> None:
+        self.ops.append((path, bytes(data)))
+
+    def delete(self, path: str) -> None:
+        self.ops.append((path, None))
+
+    def apply(self, commit: _Commit) -> None:
+        for path, data in self.ops:
+            if data is None:
+                commit.delete(path)
+            else:
+                commit.append(path, data)
+
+    def paths(self) -> List[str]:
+        """Returns the sorted paths of the files the file set adds."""
+        return sorted({path for path, data in self.ops if data is not None})
+
+
+class _Repo:
+    def __init__(self, repo: pfs_pb2.Repo, description: str = ""):
+        self.info = pfs_pb2.RepoInfo(repo=repo, created=_now(), description=description)
+        # Insertion ordered, so oldest first.
+        self.commits: Dict[str, _Commit] = {}
+        self.branches: Dict[str, pfs_pb2.BranchInfo] = {}
+
+
+class FakePFS(pfs_pb2_grpc.APIServicer):
+    """An in-memory PFS servicer.
+
+    Implements projects, repos, branches and commits (including commit sets
+    and ``SubscribeCommit``), files through ``ModifyFile``, ``GetFile``,
+    ``InspectFile``, ``ListFile``, ``WalkFile`` and ``GlobFile``, and file
+    sets. Writing to a branch whose head is finished opens and finishes a
+    new commit, like pachd does. Provenance and triggers are recorded but
+    have no effect, datums are ignored, URLs are not fetched, and file sets
+    are never compacted.
+
+    Other RPCs fail with ``UNIMPLEMENTED``.
+    """
+
+    chunk_size = CHUNK_SIZE
+    # The most files in each shard returned by ShardFileSet.
+    shard_files = 10_000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._projects: Dict[str, pfs_pb2.ProjectInfo] = {}
+        self._repos: Dict[Tuple[str, str, str], _Repo] = {}
+        self._file_sets: Dict[str, _FileSet] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Deletes all repos and projects, except the default project."""
+        with self._lock:
+            self._repos.clear()
+            self._projects.clear()
+            self._file_sets.clear()
+            self._add_project(DEFAULT_PROJECT)
+            self._changed.notify_all()
+
+    def add_files(
+        self,
+        repo: str,
+        branch: str,
+        files: Iterable[Tuple[str, bytes]],
+        project: str = DEFAULT_PROJECT,
+    ) -> pfs_pb2.Commit:
+        """Writes `files`, as (path, content) pairs, in a new commit on
+        `branch`, creating the repo if needed. This skips gRPC entirely, so
+        it is the quick way to set up large file trees.
+        """
+        key = (project, repo, "user")
+        with self._lock:
+            if project not in self._projects:
+                self._add_project(project)
+            if key not in self._repos:
+                self._repos[key] = _Repo(self._repo_pb(key))
+            commit = self._start_commit(self._repos[key], branch)
+            for path, data in files:
+                commit.append(_clean_path(path), data)
+            commit.finish()
+            self._changed.notify_all()
+            return commit.info.commit
+
+    # Helpers. These must be called with the lock held.
+
+    def _add_project(self, name: str, description: str = "") -> None:
+        self._projects[name] = pfs_pb2.ProjectInfo(
+            project=pfs_pb2.Project(name=name),
+            description=description,
+            created_at=_now(),
+        )
+
+    @staticmethod
+    def _repo_key(repo: pfs_pb2.Repo) -> Tuple[str, str, str]:
+        return (repo.project.name or DEFAULT_PROJECT, repo.name, repo.type or "user")
+
+    @staticmethod
+    def _repo_pb(key: Tuple[str, str, str]) -> pfs_pb2.Repo:
+        project, name, type = key
+        return pfs_pb2.Repo(name=name, type=type, project=pfs_pb2.Project(name=project))
+
+    def _repo(self, repo: pfs_pb2.Repo, context) -> _Repo:
+        key = self._repo_key(repo)
+        found = self._repos.get(key)
+        if found is None:
+            context.abort(
+                grpc.StatusCode.NOT_FOUND, f"repo {key[0]}/{key[1]} not found"
+            )
+        return found
+
+    def _branch(self, branch: pfs_pb2.Branch, context) -> pfs_pb2.BranchInfo:
+        repo = self._repo(branch.repo, context)
+        info = repo.branches.get(branch.name)
+        if info is None:
+            context.abort(
+                grpc.StatusCode.NOT_FOUND,
+                f"branch {branch.name} not found in repo {repo.info.repo.name}",
+            )
+        return info
+
+    def _commit(self, commit: pfs_pb2.Commit, context) -> _Commit:
+        """Resolves a commit by ID or branch, with optional ancestry."""
+        repo_pb = commit.repo if commit.repo.name else commit.branch.repo
+        repo = self._repo(repo_pb, context)
+        name, ancestry = _ancestry_re.match(commit.id or commit.branch.name).groups()
+        if commit.id and name not in repo.branches:
+            found = repo.commits.get(name)
+            if found is None:
+                context.abort(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"commit {commit.id} not found in repo {repo.info.repo.name}",
+                )
+        else:
+            # IDs that are branch names, like "master^", come from tuples.
+            branch = pfs_pb2.Branch(repo=repo_pb, name=name)
+            found = repo.commits[self._branch(branch, context).head.id]
+        for step in _ancestry_step_re.finditer(ancestry):
+            for _ in range(int(step.group(1) or 1)):
+                if found.parent is None:
+                    context.abort(
+                        grpc.StatusCode.NOT_FOUND,
+                        f"commit {commit.id or commit.branch.name} not found in "
+                        f"repo {repo.info.repo.name}",
+                    )
+                found = found.parent
+        return found
+
+    def _start_commit(
+        self,
+        repo: _Repo,
+        branch: str,
+        parent: Optional[_Commit] = None,
+        description: str = "",
+    ) -> _Commit:
+        repo_pb = repo.info.repo
+        branch_pb = pfs_pb2.Branch(repo=repo_pb, name=branch)
+        info = repo.branches.get(branch)
+        if parent is None and info is not None:
+            parent = repo.commits[info.head.id]
+        commit = _Commit(
+            pfs_pb2.Commit(repo=repo_pb, id=uuid.uuid4().hex, branch=branch_pb),
+            parent,
+            description,
+        )
+        repo.commits[commit.id] = commit
+        if info is None:
+            info = repo.branches[branch] = pfs_pb2.BranchInfo(branch=branch_pb)
+        info.head.CopyFrom(commit.info.commit)
+        self._changed.notify_all()
+        return commit
+
+    def _file_info(
+        self, commit: _Commit, path: str, is_dir: bool, size: int = None
+    ) -> pfs_pb2.FileInfo:
+        # A finished commit does not change, so its file infos are built once.
+        if commit.finished and (path, is_dir) in commit.infos:
+            return commit.infos[(path, is_dir)]
+        info = pfs_pb2.FileInfo(
+            file=pfs_pb2.File(commit=commit.info.commit, path=path + "/" * is_dir)
+        )
+        if is_dir:
+            info.file_type = pfs_pb2.FileType.DIR
+            info.size_bytes = size
+        else:
+            info.file_type = pfs_pb2.FileType.FILE
+            info.size_bytes = len(commit.files[path])
+            info.hash = commit.file_hash(path)
+        if commit.finished:
+            info.committed.CopyFrom(commit.info.finished)
+            commit.infos[(path, is_dir)] = info
+        return info
+
+    def _walk(self, commit: _Commit, path: str) -> Iterator[pfs_pb2.FileInfo]:
+        """Yields the directory at `path` and everything under it, in
+        lexicographic order.
+        """
+        files = list(commit.under(path))
+        sizes = {path: 0}
+        for p in files:
+            size = len(commit.files[p])
+            sizes[path] += size
+            directory = p.rsplit("/", 1)[0]
+            while directory != path:
+                sizes[directory] = sizes.get(directory, 0) + size
+                directory = directory.rsplit("/", 1)[0]
+        yield self._file_info(commit, path, True, sizes[path])
+        seen = {path}
+        for p in files:
+            # A file's directories sort immediately before it, so they can be
+            # emitted as they are first seen.
+            parts = p[len(path) + 1 :].split("/")[:-1]
+            directory = path
+            for part in parts:
+                directory += "/" + part
+                if directory not in seen:
+                    seen.add(directory)
+                    yield self._file_info(commit, directory, True, sizes[directory])
+            yield self._file_info(commit, p, False)
+
+    def _children(self, commit: _Commit, path: str) -> Iterator[pfs_pb2.FileInfo]:
+        """Yields the files and directories directly under `path`."""
+        directory, size = None, 0
+        for p in commit.under(path):
+            rest = p[len(path) + 1 :]
+            if "/" not in rest:
+                if directory is not None:
+                    yield self._file_info(commit, directory, True, size)
+                    directory = None
+                yield self._file_info(commit, p, False)
+                continue
+            child = path + "/" + rest.split("/", 1)[0]
+            if child != directory:
+                if directory is not None:
+                    yield self._file_info(commit, directory, True, size)
+                directory, size = child, 0
+            size += len(commit.files[p])
+        if directory is not None:
+            yield self._file_info(commit, directory, True, size)
+
+    def _lookup(self, file: pfs_pb2.File, context) -> Tuple[_Commit, str, bool]:
+        """Resolves a file to its commit, normalized path, and whether it is
+        a directory.
+        """
+        commit = self._commit(file.commit, context)
+        path = _clean_path(file.path)
+        if path in commit.files:
+            return commit, path, False
+        if commit.is_dir(path):
+            return commit, path, True
+        context.abort(
+            grpc.StatusCode.NOT_FOUND,
+            f"file {file.path} not found in repo "
+            f"{commit.info.commit.branch.repo.name} at commit {commit.id}",
+        )
+
+    def _wait_finished(self, commits: List[_Commit], context) -> None:
+        while not all(c.finished for c in commits) and context.is_active():
+            self._changed.wait(0.1)
+
+    @staticmethod
+    def _paginate(
+        infos: Iterable[pfs_pb2.FileInfo], request
+    ) -> Iterator[pfs_pb2.FileInfo]:
+        if request.reverse:
+            infos = reversed(list(infos))
+        marker = request.paginationMarker.path
+        number = request.number
+        for info in infos:
+            if marker:
+                if request.reverse and info.file.path >= marker:
+                    continue
+                if not request.reverse and info.file.path <= marker:
+                    continue
+            yield info
+            number -= 1
+            if number == 0:
+                return
+
+    # Projects
+
+    def CreateProject(self, request, context):
+        with self._lock:
+            name = request.project.name
+            if name in self._projects:
+                if not request.update:
+                    context.abort(
+                        grpc.StatusCode.ALREADY_EXISTS,
+                        f"project {name} already exists",
+                    )
+                self._projects[name].description = request.description
+            else:
+                self._add_project(name, request.description)
+        return empty_pb2.Empty()
+
+    def InspectProject(self, request, context):
+        with self._lock:
+            info = self._projects.get(request.project.name)
+            if info is None:
+                context.abort(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"project {request.project.name} not found",
+                )
+            return info
+
+    def ListProject(self, request, context):
+        with self._lock:
+            infos = list(self._projects.values())
+        yield from infos
+
+    def DeleteProject(self, request, context):
+        with self._lock:
+            name = request.project.name
+            if name not in self._projects:
+                context.abort(grpc.StatusCode.NOT_FOUND, f"project {name} not found")
+            repos = [key for key in self._repos if key[0] == name]
+            if repos and not request.force:
+                context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    f"project {name} still has repos",
+                )
+            for key in repos:
+                del self._repos[key]
+            del self._projects[name]
+        return empty_pb2.Empty()
+
+    # Repos
+
+    def CreateRepo(self, request, context):
+        with self._lock:
+            key = self._repo_key(request.repo)
+            if key[0] not in self._projects:
+                context.abort(grpc.StatusCode.NOT_FOUND, f"project {key[0]} not found")
+            repo = self._repos.get(key)
+            if repo is not None:
+                if not request.update:
+                    context.abort(
+                        grpc.StatusCode.ALREADY_EXISTS,
+                        f"repo {key[0]}/{key[1]} already exists",
+                    )
+                repo.info.description = request.description
+            else:
+                self._repos[key] = _Repo(self._repo_pb(key), request.description)
+        return empty_pb2.Empty()
+
+    def _repo_info(self, repo: _Repo) -> pfs_pb2.RepoInfo:
+        info = pfs_pb2.RepoInfo()
+        info.CopyFrom(repo.info)
+        info.branches.extend(b.branch for b in repo.branches.values())
+        master = repo.branches.get("master")
+        if master is not None:
+            size = sum(len(d) for d in repo.commits[master.head.id].files.values())
+            info.details.size_bytes = size
+            info.size_bytes_upper_bound = size
+        return info
+
+    def InspectRepo(self, request, context):
+        with self._lock:
+            return self._repo_info(self._repo(request.repo, context))
+
+    def ListRepo(self, request, context):
+        projects = {p.name for p in request.projects}
+        with self._lock:
+            infos = [
+                self._repo_info(repo)
+                for key, repo in self._repos.items()
+                if (not projects or key[0] in projects)
+                and (not request.type or key[2] == request.type)
+            ]
+        yield from reversed(infos)
+
+    def DeleteRepo(self, request, context):
+        with self._lock:
+            self._repo(request.repo, context)
+            del self._repos[self._repo_key(request.repo)]
+            self._changed.notify_all()
+        return empty_pb2.Empty()
+
+    def DeleteRepos(self, request, context):
+        projects = {p.name for p in request.projects}
+        response = pfs_pb2.DeleteReposResponse()
+        with self._lock:
+            for key in list(self._repos):
+                if request.all or key[0] in projects:
+                    response.repos.append(self._repo_pb(key))
+                    del self._repos[key]
+            self._changed.notify_all()
+        return response
+
+    def DeleteAll(self, request, context):
+        self.reset()
+        return empty_pb2.Empty()
+
+    # Commits
+
+    def StartCommit(self, request, context):
+        with self._lock:
+            repo = self._repo(request.branch.repo, context)
+            parent = None
+            if request.HasField("parent") and (
+                request.parent.id or request.parent.branch.name
+            ):
+                parent = self._commit(request.parent, context)
+            head = repo.branches.get(request.branch.name)
+            if parent is None and head is not None:
+                parent = repo.commits[head.head.id]
+            if parent is not None and not parent.finished:
+                context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    f"parent commit {parent.id} has not been finished",
+                )
+            commit = self._start_commit(
+                repo, request.branch.name, parent, request.description
+            )
+            return commit.info.commit
+
+    def FinishCommit(self, request, context):
+        with self._lock:
+            commit = self._commit(request.commit, context)
+            if commit.finished:
+                context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    f"commit {commit.id} has already finished",
+                )
+            commit.finish(request.description, request.error)
+            self._changed.notify_all()
+        return empty_pb2.Empty()
+
+    def InspectCommit(self, request, context):
+        with self._lock:
+            commit = self._commit(request.commit, context)
+            if request.wait >= pfs_pb2.CommitState.FINISHING:
+                self._wait_finished([commit], context)
+            return commit.info
+
+    def ListCommit(self, request, context):
+        with self._lock:
+            repo = self._repo(request.repo, context)
+            if request.HasField("to"):
+                commits, commit = [], self._commit(request.to, context)
+                while commit is not None:
+                    commits.append(commit)
+                    commit = commit.parent
+            else:
+                commits = list(reversed(repo.commits.values()))
+            start = getattr(request, "from")
+            if start.id or start.branch.name:
+                start = self._commit(start, context)
+                if start in commits:
+                    commits = commits[: commits.index(start) + 1]
+            if request.HasField("started_time"):
+                before = request.started_time.ToNanoseconds()
+                commits = [
+                    c for c in commits if c.info.started.ToNanoseconds() < before
+                ]
+            if request.number:
+                commits = commits[: request.number]
+            if request.reverse:
+                commits.reverse()
+            infos = [c.info for c in commits]
+        yield from infos
+
+    def SubscribeCommit(self, request, context):
+        state = request.state
+        with self._lock:
+            repo = self._repo(request.repo, context)
+            start = getattr(request, "from")
+            sent = set()
+            if start.id:
+                # Skip everything up to, but not including, `from`.
+                for commit in repo.commits.values():
+                    if commit.id == start.id:
+                        break
+                    sent.add(commit.id)
+        while context.is_active():
+            with self._lock:
+                pending = [
+                    commit
+                    for commit in repo.commits.values()
+                    if commit.id not in sent
+                    and (
+                        not request.branch
+                        or commit.info.commit.branch.name == request.branch
+                    )
+                ]
+                ready = []
+                for commit in pending:
+                    if state >= pfs_pb2.CommitState.FINISHING and not commit.finished:
+                        break
+                    ready.append(commit.info)
+                    sent.add(commit.id)
+                if not ready:
+                    self._changed.wait(0.1)
+                    continue
+            yield from ready
+
+    def InspectCommitSet(self, request, context):
+        with self._lock:
+            commits = [
+                repo.commits[request.commit_set.id]
+                for repo in self._repos.values()
+                if request.commit_set.id in repo.commits
+            ]
+            if not commits:
+                context.abort(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"no commits found for commit set {request.commit_set.id}",
+                )
+            if request.wait:
+                self._wait_finished(commits, context)
+            infos = [c.info for c in commits]
+        yield from infos
+
+    def ListCommitSet(self, request, context):
+        with self._lock:
+            sets: Dict[str, pfs_pb2.CommitSetInfo] = {}
+            for key, repo in self._repos.items():
+                if request.project.name and key[0] != request.project.name:
+                    continue
+                for commit in repo.commits.values():
+                    info = sets.setdefault(
+                        commit.id,
+                        pfs_pb2.CommitSetInfo(
+                            commit_set=pfs_pb2.CommitSet(id=commit.id)
+                        ),
+                    )
+                    info.commits.append(commit.info)
+            infos = sorted(
+                sets.values(),
+                key=lambda s: s.commits[0].started.ToNanoseconds(),
+                reverse=True,
+            )
+        yield from infos
+
+    def DropCommitSet(self, request, context):
+        with self._lock:
+            for repo in self._repos.values():
+                commit = repo.commits.get(request.commit_set.id)
+                if commit is None:
+                    continue
+                if commit.info.child_commits:
+                    context.abort(
+                        grpc.StatusCode.FAILED_PRECONDITION,
+                        f"commit {commit.id} has children",
+                    )
+                for name, branch in list(repo.branches.items()):
+                    if branch.head.id != commit.id:
+                        continue
+                    if commit.parent is None:
+                        del repo.branches[name]
+                    else:
+                        branch.head.CopyFrom(commit.parent.info.commit)
+                if commit.parent is not None:
+                    children = commit.parent.info.child_commits
+                    children.remove(commit.info.commit)
+                del repo.commits[commit.id]
+            self._changed.notify_all()
+        return empty_pb2.Empty()
+
+    # Branches
+
+    def CreateBranch(self, request, context):
+        with self._lock:
+            repo = self._repo(request.branch.repo, context)
+            name = request.branch.name
+            if request.head.id or request.head.branch.name:
+                head = self._commit(request.head, context)
+            elif name in repo.branches:
+                head = repo.commits[repo.branches[name].head.id]
+            else:
+                head = self._start_commit(repo, name)
+                head.finish()
+            info = repo.branches.setdefault(
+                name, pfs_pb2.BranchInfo(branch=pfs_pb2.Branch(repo=repo.info.repo))
+            )
+            info.branch.name = name
+            info.head.CopyFrom(head.info.commit)
+            for field in (info.provenance, info.direct_provenance):
+                del field[:]
+                field.extend(request.provenance)
+            if request.HasField("trigger"):
+                info.trigger.CopyFrom(request.trigger)
+            self._changed.notify_all()
+        return empty_pb2.Empty()
+
+    def InspectBranch(self, request, context):
+        with self._lock:
+            return self._branch(request.branch, context)
+
+    def ListBranch(self, request, context):
+        with self._lock:
+            infos = list(self._repo(request.repo, context).branches.values())
+        yield from (infos if request.reverse else reversed(infos))
+
+    def DeleteBranch(self, request, context):
+        with self._lock:
+            self._branch(request.branch, context)
+            del self._repo(request.branch.repo, context).branches[request.branch.name]
+        return empty_pb2.Empty()
+
+    # Files
+
+    def ModifyFile(self, request_iterator, context):
+        commit, opened = None, False
+        try:
+            for request in request_iterator:
+                with self._lock:
+                    if request.HasField("set_commit"):
+                        if opened:
+                            commit.finish()
+                        commit, opened = self._writable(request.set_commit, context)
+                        continue
+                    if commit is None:
+                        context.abort(
+                            grpc.StatusCode.INVALID_ARGUMENT,
+                            "the first ModifyFile request must set a commit",
+                        )
+                    self._modify(commit, request, context)
+        finally:
+            if opened:
+                with self._lock:
+                    commit.finish()
+                    self._changed.notify_all()
+        return empty_pb2.Empty()
+
+    def _writable(self, target: pfs_pb2.Commit, context) -> Tuple[_Commit, bool]:
+        """Resolves the commit to write to, and whether it was opened for the
+        write (and so should be finished after it).
+        """
+        if target.id:
+            commit = self._commit(target, context)
+            if commit.finished:
+                context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    f"commit {commit.id} has already finished",
+                )
+            return commit, False
+        repo = self._repo(target.branch.repo, context)
+        branch = repo.branches.get(target.branch.name)
+        if branch is not None and not repo.commits[branch.head.id].finished:
+            return repo.commits[branch.head.id], False
+        # Writing to a branch without an open commit opens one on it.
+        return self._start_commit(repo, target.branch.name), True
+
+    def _modify(self, commit: Union[_Commit, _FileSet], request, context) -> None:
+        if request.HasField("add_file"):
+            if request.add_file.HasField("url"):
+                context.abort(
+                    grpc.StatusCode.UNIMPLEMENTED,
+                    "the fake PFS server does not fetch URLs",
+                )
+            commit.append(
+                _clean_path(request.add_file.path), request.add_file.raw.value
+            )
+        elif request.HasField("delete_file"):
+            commit.delete(_clean_path(request.delete_file.path))
+        elif request.HasField("copy_file"):
+            source, src, is_dir = self._lookup(request.copy_file.src, context)
+            dst = _clean_path(request.copy_file.dst)
+            paths = list(source.under(src)) if is_dir else [src]
+            copies = [(dst + p[len(src) :], bytes(source.files[p])) for p in paths]
+            for path, data in copies:
+                if not request.copy_file.append:
+                    commit.delete(path)
+                commit.append(path, data)
+
+    def GetFile(self, request, context):
+        with self._lock:
+            commit, path, is_dir = self._lookup(request.file, context)
+            if is_dir:
+                context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    f"{request.file.path} is a directory",
+                )
+            data = commit.files[path]
+            if not commit.finished:
+                data = bytes(data)
+        # A finished commit's files are not modified again, so they can be
+        # read without holding the lock.
+        view = memoryview(data)
+        for offset in range(request.offset, len(view), self.chunk_size):
+            yield wrappers_pb2.BytesValue(
+                value=bytes(view[offset : offset + self.chunk_size])
+            )
+
+    def InspectFile(self, request, context):
+        with self._lock:
+            commit, path, is_dir = self._lookup(request.file, context)
+            if is_dir:
+                size = sum(len(commit.files[p]) for p in commit.under(path))
+                return self._file_info(commit, path, True, size)
+            return self._file_info(commit, path, False)
+
+    def ListFile(self, request, context):
+        with self._lock:
+            commit, path, is_dir = self._lookup(request.file, context)
+            if is_dir:
+                infos = list(self._children(commit, path))
+            else:
+                infos = [self._file_info(commit, path, False)]
+        yield from self._paginate(infos, request)
+
+    def WalkFile(self, request, context):
+        with self._lock:
+            commit, path, is_dir = self._lookup(request.file, context)
+            if is_dir:
+                infos = list(self._walk(commit, path))
+            else:
+                infos = [self._file_info(commit, path, False)]
+        yield from self._paginate(infos, request)
+
+    def GlobFile(self, request, context):
+        pattern = _glob_re(_clean_path(request.pattern))
+        lower, upper = request.path_range.lower, request.path_range.upper
+        with self._lock:
+            commit = self._commit(request.commit, context)
+            infos = [
+                info
+                for info in self._walk(commit, "")
+                if pattern.match(info.file.path.rstrip("/"))
+                and (not lower or info.file.path >= lower)
+                and (not upper or info.file.path < upper)
+            ]
+        yield from infos
+
+    # File sets
+
+    def _file_set(self, file_set_id: str, context) -> _FileSet:
+        file_set = self._file_sets.get(file_set_id)
+        if file_set is None or file_set.expires < time.monotonic():
+            context.abort(
+                grpc.StatusCode.NOT_FOUND, f"file set {file_set_id} not found"
+            )
+        return file_set
+
+    def _add_file_set(self, file_set: _FileSet) -> pfs_pb2.CreateFileSetResponse:
+        file_set_id = uuid.uuid4().hex
+        self._file_sets[file_set_id] = file_set
+        return pfs_pb2.CreateFileSetResponse(file_set_id=file_set_id)
+
+    def CreateFileSet(self, request_iterator, context):
+        file_set = _FileSet(FILE_SET_TTL)
+        for request in request_iterator:
+            with self._lock:
+                if request.HasField("set_commit"):
+                    context.abort(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        "file sets cannot set a commit",
+                    )
+                self._modify(file_set, request, context)
+        with self._lock:
+            return self._add_file_set(file_set)
+
+    def GetFileSet(self, request, context):
+        with self._lock:
+            commit = self._commit(request.commit, context)
+            file_set = _FileSet(FILE_SET_TTL)
+            for path in commit.paths():
+                file_set.append(path, commit.files[path])
+            return self._add_file_set(file_set)
+
+    def AddFileSet(self, request, context):
+        with self._lock:
+            file_set = self._file_set(request.file_set_id, context)
+            commit, opened = self._writable(request.commit, context)
+            file_set.apply(commit)
+            if opened:
+                commit.finish()
+            self._changed.notify_all()
+        return empty_pb2.Empty()
+
+    def RenewFileSet(self, request, context):
+        with self._lock:
+            self._file_set(request.file_set_id, context).renew(request.ttl_seconds)
+        return empty_pb2.Empty()
+
+    def ComposeFileSet(self, request, context):
+        with self._lock:
+            file_set = _FileSet(request.ttl_seconds)
+            for file_set_id in request.file_set_ids:
+                file_set.ops.extend(self._file_set(file_set_id, context).ops)
+            return self._add_file_set(file_set)
+
+    def ShardFileSet(self, request, context):
+        with self._lock:
+            paths = self._file_set(request.file_set_id, context).paths()
+        bounds = paths[self.shard_files :: self.shard_files]
+        lowers = [""] + bounds
+        uppers = bounds + [""]
+        return pfs_pb2.ShardFileSetResponse(
+            shards=[
+                pfs_pb2.PathRange(lower=lower, upper=upper)
+                for lower, upper in zip(lowers, uppers)
+            ]
+        )
+
+    def Fsck(self, request, context):
+        return iter(())
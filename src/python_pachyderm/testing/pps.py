@@ -0,0 +1,340 @@
+"""An in-memory implementation of the read side of the PPS API."""
+
+import threading
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+import grpc
+from google.protobuf import empty_pb2
+
+from python_pachyderm.proto.v2.pfs import pfs_pb2
+from python_pachyderm.proto.v2.pps import pps_pb2, pps_pb2_grpc
+from .pfs import DEFAULT_PROJECT, _now
+
+TERMINAL_JOB_STATES = (
+    pps_pb2.JobState.JOB_SUCCESS,
+    pps_pb2.JobState.JOB_FAILURE,
+    pps_pb2.JobState.JOB_KILLED,
+    pps_pb2.JobState.JOB_UNRUNNABLE,
+)
+
+_JobKey = Tuple[str, str, str]
+
+
+def _job_key(job: pps_pb2.Job) -> _JobKey:
+    return (job.pipeline.project.name or DEFAULT_PROJECT, job.pipeline.name, job.id)
+
+
+class FakePPS(pps_pb2_grpc.APIServicer):
+    """An in-memory PPS servicer that serves pipelines, jobs and datums
+    added with :meth:`add_pipeline` and :meth:`add_job`. Nothing is ever
+    run: jobs only change state through :meth:`set_job_state`.
+
+    Implements ``InspectPipeline``, ``ListPipeline``, ``InspectJob``,
+    ``InspectJobSet``, ``ListJob``, ``ListJobSet``, ``SubscribeJob``,
+    ``InspectDatum``, ``ListDatum``, ``DeletePipelines`` and ``DeleteAll``.
+    Other RPCs fail with ``UNIMPLEMENTED``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._pipelines: Dict[Tuple[str, str], pps_pb2.PipelineInfo] = {}
+        # Insertion ordered, so oldest first.
+        self._jobs: Dict[_JobKey, pps_pb2.JobInfo] = {}
+        self._datums: Dict[_JobKey, List[pps_pb2.DatumInfo]] = {}
+        # Bumped by drop_subscriptions, which ends the SubscribeJob streams
+        # opened before.
+        self._subscriptions = 0
+
+    def reset(self) -> None:
+        """Deletes all pipelines, jobs and datums."""
+        with self._lock:
+            self._pipelines.clear()
+            self._jobs.clear()
+            self._datums.clear()
+            self._changed.notify_all()
+
+    def add_pipeline(
+        self,
+        name: str,
+        project: str = DEFAULT_PROJECT,
+        state: "pps_pb2.PipelineState" = pps_pb2.PipelineState.PIPELINE_RUNNING,
+    ) -> pps_pb2.PipelineInfo:
+        """Adds a pipeline, or returns it if it already exists."""
+        with self._lock:
+            info = self._pipelines.get((project, name))
+            if info is None:
+                info = self._pipelines[(project, name)] = pps_pb2.PipelineInfo(
+                    pipeline=pps_pb2.Pipeline(
+                        name=name, project=pfs_pb2.Project(name=project)
+                    ),
+                    version=1,
+                    state=state,
+                    type=pps_pb2.PipelineInfo.PipelineType.PIPELINE_TYPE_TRANSFORM,
+                )
+            return info
+
+    def add_job(
+        self,
+        pipeline: str,
+        project: str = DEFAULT_PROJECT,
+        state: "pps_pb2.JobState" = pps_pb2.JobState.JOB_SUCCESS,
+        datums: int = 0,
+        job_id: str = None,
+    ) -> pps_pb2.JobInfo:
+        """Adds a job with `datums` successful datums to `pipeline`, adding
+        the pipeline if needed. Jobs added with the same `job_id` across
+        pipelines form a job set.
+        """
+        with self._lock:
+            pipeline_info = self.add_pipeline(pipeline, project)
+            job = pps_pb2.Job(
+                pipeline=pipeline_info.pipeline, id=job_id or uuid.uuid4().hex
+            )
+            info = pps_pb2.JobInfo(
+                job=job,
+                pipeline_version=pipeline_info.version,
+                output_commit=pfs_pb2.Commit(
+                    id=job.id,
+                    branch=pfs_pb2.Branch(
+                        name="master",
+                        repo=pfs_pb2.Repo(
+                            name=pipeline,
+                            type="user",
+                            project=pfs_pb2.Project(name=project),
+                        ),
+                    ),
+                ),
+                data_total=datums,
+                created=_now(),
+                started=_now(),
+            )
+            self._jobs[_job_key(job)] = info
+            self._datums[_job_key(job)] = [
+                pps_pb2.DatumInfo(
+                    datum=pps_pb2.Datum(job=job, id=uuid.uuid4().hex * 2),
+                    state=pps_pb2.DatumState.SUCCESS,
+                )
+                for _ in range(datums)
+            ]
+            self._datums[_job_key(job)].sort(key=lambda d: d.datum.id)
+            self.set_job_state(job, state)
+            return info
+
+    def set_job_state(self, job: pps_pb2.Job, state: "pps_pb2.JobState") -> None:
+        """Moves a job to `state`, waking up any ``InspectJob`` calls waiting
+        for it to finish.
+        """
+        with self._lock:
+            info = self._jobs[_job_key(job)]
+            info.state = state
+            if state in TERMINAL_JOB_STATES:
+                info.finished.CopyFrom(_now())
+                if state == pps_pb2.JobState.JOB_SUCCESS:
+                    info.data_processed = info.data_total
+            pipeline = self._pipelines[_job_key(job)[:2]]
+            pipeline.last_job_state = state
+            self._changed.notify_all()
+
+    def drop_subscriptions(self) -> None:
+        """Ends every open ``SubscribeJob`` stream with ``UNAVAILABLE``, as
+        when pachd restarts.
+        """
+        with self._lock:
+            self._subscriptions += 1
+            self._changed.notify_all()
+
+    def _job(self, job: pps_pb2.Job, context) -> pps_pb2.JobInfo:
+        info = self._jobs.get(_job_key(job))
+        if info is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"job {job.id} not found")
+        return info
+
+    def _wait(self, infos: List[pps_pb2.JobInfo], context) -> None:
+        while context.is_active() and not all(
+            info.state in TERMINAL_JOB_STATES for info in infos
+        ):
+            self._changed.wait(0.1)
+
+    @staticmethod
+    def _paginate(infos: Iterable[pps_pb2.JobInfo], request) -> List[pps_pb2.JobInfo]:
+        """Pages through jobs ordered newest first, where the pagination
+        marker is the creation time of the last job seen.
+        """
+        infos = list(infos)
+        if request.HasField("paginationMarker"):
+            marker = request.paginationMarker.ToNanoseconds()
+            if request.reverse:
+                infos = [i for i in infos if i.created.ToNanoseconds() > marker]
+            else:
+                infos = [i for i in infos if i.created.ToNanoseconds() < marker]
+        if request.reverse:
+            infos.reverse()
+        if request.number:
+            infos = infos[: request.number]
+        return infos
+
+    def InspectPipeline(self, request, context):
+        with self._lock:
+            key = (
+                request.pipeline.project.name or DEFAULT_PROJECT,
+                request.pipeline.name,
+            )
+            info = self._pipelines.get(key)
+            if info is None:
+                context.abort(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"pipeline {request.pipeline.name} not found",
+                )
+            return info
+
+    def ListPipeline(self, request, context):
+        projects = {p.name for p in request.projects}
+        with self._lock:
+            infos = [
+                info
+                for (project, name), info in self._pipelines.items()
+                if (not projects or project in projects)
+                and (not request.pipeline.name or name == request.pipeline.name)
+            ]
+        yield from reversed(infos)
+
+    def InspectJob(self, request, context):
+        with self._lock:
+            info = self._job(request.job, context)
+            if request.wait:
+                self._wait([info], context)
+            return info
+
+    def InspectJobSet(self, request, context):
+        with self._lock:
+            infos = [
+                info for key, info in self._jobs.items() if key[2] == request.job_set.id
+            ]
+            if request.wait:
+                self._wait(infos, context)
+        yield from infos
+
+    def ListJob(self, request, context):
+        projects = {p.name for p in request.projects}
+        pipeline = request.pipeline
+        with self._lock:
+            infos = [
+                info
+                for key, info in reversed(self._jobs.items())
+                if (not projects or key[0] in projects)
+                and (
+                    not pipeline.name
+                    or key[:2]
+                    == (pipeline.project.name or DEFAULT_PROJECT, pipeline.name)
+                )
+            ]
+        yield from self._paginate(infos, request)
+
+    def ListJobSet(self, request, context):
+        projects = {p.name for p in request.projects}
+        with self._lock:
+            sets: Dict[str, pps_pb2.JobSetInfo] = {}
+            for key, info in reversed(self._jobs.items()):
+                if projects and key[0] not in projects:
+                    continue
+                sets.setdefault(
+                    key[2], pps_pb2.JobSetInfo(job_set=pps_pb2.JobSet(id=key[2]))
+                ).jobs.append(info)
+        infos = list(sets.values())
+        if request.reverse:
+            infos.reverse()
+        if request.number:
+            infos = infos[: request.number]
+        yield from infos
+
+    def SubscribeJob(self, request, context):
+        pipeline = (
+            request.pipeline.project.name or DEFAULT_PROJECT,
+            request.pipeline.name,
+        )
+        with self._lock:
+            subscriptions = self._subscriptions
+        # The state last sent of each job.
+        sent: Dict[str, int] = {}
+        while context.is_active():
+            with self._lock:
+                if self._subscriptions != subscriptions:
+                    context.abort(grpc.StatusCode.UNAVAILABLE, "pachd restarted")
+                # Copied, as jobs change state while the stream sends them.
+                infos = []
+                for key, info in self._jobs.items():
+                    if key[:2] == pipeline and sent.get(key[2]) != info.state:
+                        infos.append(pps_pb2.JobInfo())
+                        infos[-1].CopyFrom(info)
+                if not infos:
+                    self._changed.wait(0.1)
+                    continue
+            for info in infos:
+                sent[info.job.id] = info.state
+                yield info
+
+    def InspectDatum(self, request, context):
+        with self._lock:
+            self._job(request.datum.job, context)
+            for info in self._datums[_job_key(request.datum.job)]:
+                if info.datum.id == request.datum.id:
+                    return info
+            context.abort(
+                grpc.StatusCode.NOT_FOUND, f"datum {request.datum.id} not found"
+            )
+
+    def ListDatum(self, request, context):
+        if request.HasField("input"):
+            context.abort(
+                grpc.StatusCode.UNIMPLEMENTED,
+                "the fake PPS server cannot list the datums of an input",
+            )
+        states = set(request.filter.state)
+        marker = request.paginationMarker
+        with self._lock:
+            self._job(request.job, context)
+            infos = [
+                info
+                for info in self._datums[_job_key(request.job)]
+                if not states or info.state in states
+            ]
+        if request.reverse:
+            infos.reverse()
+        if marker:
+            infos = [
+                info
+                for info in infos
+                if (
+                    info.datum.id < marker
+                    if request.reverse
+                    else info.datum.id > marker
+                )
+            ]
+        if request.number:
+            infos = infos[: request.number]
+        yield from infos
+
+    def DeletePipelines(self, request, context):
+        projects = {p.name or DEFAULT_PROJECT for p in request.projects}
+        with self._lock:
+            deleted = [
+                key for key in self._pipelines if request.all or key[0] in projects
+            ]
+            for key in deleted:
+                del self._pipelines[key]
+            for key in [key for key in self._jobs if key[:2] in deleted]:
+                del self._jobs[key]
+                del self._datums[key]
+            self._changed.notify_all()
+        return pps_pb2.DeletePipelinesResponse(
+            pipelines=[
+                pps_pb2.Pipeline(name=name, project=pfs_pb2.Project(name=project))
+                for project, name in deleted
+            ]
+        )
+
+    def DeleteAll(self, request, context):
+        self.reset()
+        return empty_pb2.Empty()
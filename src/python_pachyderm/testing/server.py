@@ -0,0 +1,160 @@
+"""An in-process fake pachd server."""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import grpc
+from google.protobuf import empty_pb2
+from grpc_health.v1 import health_pb2, health_pb2_grpc
+
+from python_pachyderm.client import Client
+from python_pachyderm.proto.v2.admin import admin_pb2, admin_pb2_grpc
+from python_pachyderm.proto.v2.auth import auth_pb2_grpc
+from python_pachyderm.proto.v2.identity import identity_pb2_grpc
+from python_pachyderm.proto.v2.license import license_pb2_grpc
+from python_pachyderm.proto.v2.pfs import pfs_pb2_grpc
+from python_pachyderm.proto.v2.pps import pps_pb2_grpc
+from python_pachyderm.proto.v2.transaction import transaction_pb2_grpc
+from python_pachyderm.proto.v2.version.versionpb import version_pb2, version_pb2_grpc
+from .pfs import FakePFS
+from .pps import FakePPS
+from .shaping import NetworkConditions, ShapingInterceptor
+
+# The version reported by the fake server.
+VERSION = version_pb2.Version(major=2, minor=7, micro=0, additional="fake")
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+class _VersionServicer(version_pb2_grpc.APIServicer):
+    def GetVersion(self, request, context):
+        return VERSION
+
+
+class _HealthServicer(health_pb2_grpc.HealthServicer):
+    def Check(self, request, context):
+        return health_pb2.HealthCheckResponse(
+            status=health_pb2.HealthCheckResponse.SERVING
+        )
+
+
+class _AdminServicer(admin_pb2_grpc.APIServicer):
+    def InspectCluster(self, request, context):
+        return admin_pb2.ClusterInfo(id="fake", deployment_id="fake")
+
+
+def _auth_not_activated(request, context):
+    context.abort(grpc.StatusCode.UNIMPLEMENTED, "the auth service is not activated")
+
+
+class _AuthServicer(auth_pb2_grpc.APIServicer):
+    Deactivate = staticmethod(_auth_not_activated)
+
+
+class _IdentityServicer(identity_pb2_grpc.APIServicer):
+    DeleteAll = staticmethod(_auth_not_activated)
+
+
+class _LicenseServicer(license_pb2_grpc.APIServicer):
+    DeleteAll = staticmethod(_auth_not_activated)
+
+
+class _TransactionServicer(transaction_pb2_grpc.APIServicer):
+    def DeleteAll(self, request, context):
+        return empty_pb2.Empty()
+
+
+class FakePachd:
+    """An in-process, in-memory stand-in for pachd, for tests and benchmarks
+    that should not need a cluster.
+
+    It serves the PFS API (see :class:`.FakePFS`), the read side of the PPS
+    API (see :class:`.FakePPS`), and the version, health and admin APIs.
+    Auth is never activated and there are no transactions, which is enough
+    for :meth:`.Client.delete_all` to reset the server. All state is kept in
+    memory and lost when the server stops.
+
+    Parameters
+    ----------
+    conditions : NetworkConditions, optional
+        The simulated latency and bandwidth between clients and the server.
+        Defaults to no added latency and unlimited bandwidth.
+    max_workers : int, optional
+        The number of threads handling calls. Each open stream, including
+        ``PFSFile`` downloads and ``SubscribeCommit``, occupies one.
+    port : int, optional
+        The port to listen on. By default, a free port is picked.
+
+    Examples
+    --------
+    >>> from python_pachyderm.testing import FakePachd, NetworkConditions
+    >>> with FakePachd(NetworkConditions(latency=0.01)) as pachd:
+    >>>     client = pachd.client()
+    >>>     client.create_repo("foo")
+    >>>     client.put_file_bytes(("foo", "master"), "/file.dat", b"DATA")
+    >>>     pachd.pps.add_job("bar", datums=10)
+    """
+
+    def __init__(
+        self,
+        conditions: NetworkConditions = None,
+        max_workers: int = 16,
+        port: int = 0,
+    ):
+        self.conditions = conditions or NetworkConditions()
+        self.pfs = FakePFS()
+        self.pps = FakePPS()
+        self._server = grpc.server(
+            ThreadPoolExecutor(max_workers=max_workers),
+            interceptors=[ShapingInterceptor(self.conditions)],
+            options=[
+                ("grpc.max_receive_message_length", MAX_MESSAGE_SIZE),
+                ("grpc.max_send_message_length", MAX_MESSAGE_SIZE),
+            ],
+        )
+        pfs_pb2_grpc.add_APIServicer_to_server(self.pfs, self._server)
+        pps_pb2_grpc.add_APIServicer_to_server(self.pps, self._server)
+        version_pb2_grpc.add_APIServicer_to_server(_VersionServicer(), self._server)
+        health_pb2_grpc.add_HealthServicer_to_server(_HealthServicer(), self._server)
+        for module, servicer in [
+            (admin_pb2_grpc, _AdminServicer()),
+            (auth_pb2_grpc, _AuthServicer()),
+            (identity_pb2_grpc, _IdentityServicer()),
+            (license_pb2_grpc, _LicenseServicer()),
+            (transaction_pb2_grpc, _TransactionServicer()),
+        ]:
+            module.add_APIServicer_to_server(servicer, self._server)
+        self.port = self._server.add_insecure_port(f"localhost:{port}")
+        self._started = False
+
+    @property
+    def address(self) -> str:
+        """The address to connect to, e.g. ``"localhost:40123"``."""
+        return f"localhost:{self.port}"
+
+    def start(self) -> "FakePachd":
+        """Starts serving. Returns the server, for chaining."""
+        if not self._started:
+            self._server.start()
+            self._started = True
+        return self
+
+    def stop(self, grace: Optional[float] = None) -> None:
+        """Stops serving, cancelling calls in flight after `grace` seconds."""
+        self._server.stop(grace).wait()
+        self._started = False
+
+    def __enter__(self) -> "FakePachd":
+        return self.start()
+
+    def __exit__(self, type, val, tb):
+        self.stop()
+
+    def reset(self) -> None:
+        """Deletes all PFS and PPS state."""
+        self.pfs.reset()
+        self.pps.reset()
+
+    def client(self, **kwargs) -> Client:
+        """Returns a new :class:`.Client` connected to this server.
+        `kwargs` are passed on to the client.
+        """
+        return Client("localhost", self.port, **kwargs)
@@ -0,0 +1,115 @@
+"""Simulated network conditions for the fake pachd server."""
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
+
+import grpc
+
+
+class NetworkConditions(NamedTuple):
+    """The network between the client and the fake pachd server.
+
+    Parameters
+    ----------
+    latency : float, optional
+        The round-trip time in seconds, added once to every call before it
+        is handled.
+    bandwidth : float, optional
+        The link speed in bytes per second, shared by all calls and applied
+        separately to each direction. Unlimited if unset. Only message
+        payloads are counted, not gRPC framing.
+    """
+
+    latency: float = 0.0
+    bandwidth: Optional[float] = None
+
+
+class _Link:
+    """One direction of a link with limited bandwidth. Messages are sent one
+    after another, so concurrent calls share the bandwidth.
+    """
+
+    def __init__(self, bandwidth: float):
+        self._bandwidth = bandwidth
+        self._lock = threading.Lock()
+        self._free_at = 0.0
+
+    def send(self, size: int) -> None:
+        """Blocks for as long as sending `size` bytes takes."""
+        with self._lock:
+            start = max(time.monotonic(), self._free_at)
+            self._free_at = start + size / self._bandwidth
+            done = self._free_at
+        delay = done - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ShapingInterceptor(grpc.ServerInterceptor):
+    """A server interceptor that delays calls and throttles their messages
+    according to a :class:`.NetworkConditions`.
+    """
+
+    def __init__(self, conditions: NetworkConditions):
+        self.conditions = conditions
+        self._up = self._down = None
+        if conditions.bandwidth:
+            self._up = _Link(conditions.bandwidth)
+            self._down = _Link(conditions.bandwidth)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or self.conditions == NetworkConditions():
+            return handler
+
+        def requests(request_or_iterator, streaming: bool):
+            if not streaming:
+                self._send(self._up, request_or_iterator)
+                return request_or_iterator
+            return self._send_all(self._up, request_or_iterator)
+
+        def wrap(behavior, response_streaming: bool, request_streaming: bool):
+            def shaped(request_or_iterator, context):
+                if self.conditions.latency:
+                    time.sleep(self.conditions.latency)
+                request = requests(request_or_iterator, request_streaming)
+                response = behavior(request, context)
+                if response_streaming:
+                    return self._send_all(self._down, response)
+                self._send(self._down, response)
+                return response
+
+            return shaped
+
+        if handler.request_streaming and handler.response_streaming:
+            behavior, factory = (
+                handler.stream_stream,
+                grpc.stream_stream_rpc_method_handler,
+            )
+        elif handler.request_streaming:
+            behavior, factory = (
+                handler.stream_unary,
+                grpc.stream_unary_rpc_method_handler,
+            )
+        elif handler.response_streaming:
+            behavior, factory = (
+                handler.unary_stream,
+                grpc.unary_stream_rpc_method_handler,
+            )
+        else:
+            behavior, factory = handler.unary_unary, grpc.unary_unary_rpc_method_handler
+        return factory(
+            wrap(behavior, handler.response_streaming, handler.request_streaming),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+    @staticmethod
+    def _send(link: Optional[_Link], message) -> None:
+        if link is not None and message is not None:
+            link.send(message.ByteSize())
+
+    def _send_all(self, link: Optional[_Link], messages) -> Iterator:
+        for message in messages:
+            self._send(link, message)
+            yield message
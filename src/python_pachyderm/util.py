@@ -1,14 +1,63 @@
+import hashlib
+import heapq
+import io
+import json
+import multiprocessing
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import grpc
 from google.protobuf import json_format
 
 from python_pachyderm import Client
-from python_pachyderm.pfs import SubcommitType
+from python_pachyderm.mixin.pfs import _AtomicModifyFilepathOp, _delete_file_req
+from python_pachyderm.pfs import Commit, SubcommitType, commit_from, commit_repo
+from python_pachyderm.proto.v2.pfs import pfs_pb2
 from python_pachyderm.proto.v2.pps import pps_pb2
 
 
+class PutFilesResult(NamedTuple):
+    """A namedtuple subclass summarizing a ``put_files()`` upload."""
+
+    files: int
+    bytes: int
+    seconds: float
+    errors: Dict[str, Exception]
+    skipped: int = 0
+    deleted: int = 0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
 def put_files(
-    client: Client, source_path: str, commit: SubcommitType, dest_path: str, **kwargs
-) -> None:
+    client: Client,
+    source_path: str,
+    commit: SubcommitType,
+    dest_path: str,
+    parallelism: int = 1,
+    manifest: str = None,
+    **kwargs,
+) -> PutFilesResult:
     """Utility function for inserting files from the local `source_path`
     into Pachyderm. Roughly equivalent to ``pachctl put file [-r]``.
 
@@ -22,10 +71,35 @@ def put_files(
         The open commit to add files to.
     dest_path : str
         The destination path in PFS.
+    parallelism : int, optional
+        The number of concurrent ModifyFile streams to upload with. If greater
+        than 1, files are split across the streams (balanced by size), which
+        all write to the same open commit: `commit` itself if given by ID,
+        or else the head of its branch, started first if it is finished (and
+        then finished once the upload completes). Each stream holds at
+        most one chunk (``BUFFER_SIZE`` bytes) in memory at a time, so at most
+        `parallelism` chunks are in flight. Files that fail to upload are
+        removed from the commit and reported in ``PutFilesResult.errors``
+        rather than raised.
+    manifest : str, optional
+        The path of a local manifest file that makes repeated uploads of the
+        same directory to the same branch incremental. It records the size,
+        mtime and SHA-256 of each uploaded file, and the PFS hash it was
+        given. A file is skipped if it is unchanged locally (by size and
+        mtime, or else by content hash) and unchanged in the parent of
+        `commit`, as listed by ``walk_file``. Previously uploaded files that
+        no longer exist locally are deleted. Created if it doesn't exist.
     **kwargs : dict
         Keyword arguments to forward. See
         ``ModifyFileClient.put_file_from_filepath()`` for more details.
 
+    Returns
+    -------
+    PutFilesResult
+        The number of files and bytes uploaded, how long it took, if
+        `parallelism` is greater than 1, any per-file errors and, with a
+        `manifest`, the number of files skipped and deleted.
+
     Examples
     --------
     >>> source_dir = "data/training/"
@@ -35,22 +109,770 @@ def put_files(
     >>> with client.commit("repo_name", "master") as commit2:
     >>>     python_pachyderm.put_files(client, "metadata/params.csv", commit2, "/hyperparams.csv")
     >>>     python_pachyderm.put_files(client, "spec.json", commit2, "/spec.json")
+    ...
+    >>> with client.commit("repo_name", "master") as commit3:
+    >>>     result = python_pachyderm.put_files(client, source_dir, commit3, "/", parallelism=8)
+    >>> print(result.bytes_per_second, result.errors)
+    ...
+    >>> # Nightly, upload only what changed since the last run.
+    >>> with client.commit("repo_name", "master") as commit4:
+    >>>     result = python_pachyderm.put_files(
+    ...         client, source_dir, commit4, "/", manifest="training.manifest"
+    ...     )
+    >>> print(result.files, result.skipped, result.deleted)
 
     .. # noqa: W505
     """
-    with client.modify_file_client(commit) as mfc:
-        if os.path.isfile(source_path):
-            mfc.put_file_from_filepath(dest_path, source_path, **kwargs)
-        elif os.path.isdir(source_path):
-            for root, _, filenames in os.walk(source_path):
-                for filename in filenames:
-                    source_filepath = os.path.join(root, filename)
-                    dest_filepath = os.path.join(
-                        dest_path, os.path.relpath(source_filepath, start=source_path)
-                    )
+    if not os.path.isfile(source_path) and not os.path.isdir(source_path):
+        raise Exception("Please provide an existing directory or file")
+    if manifest is not None and kwargs.get("append"):
+        raise ValueError("a manifest cannot be used to append to files")
+
+    start = time.perf_counter()
+    pairs = _walk_files(source_path, dest_path)
+    tracker, deletes = None, []
+    if manifest is not None:
+        tracker = _UploadManifest(client, manifest, commit)
+        pairs, deletes = tracker.diff(pairs, dest_path)
+        if not pairs and not deletes:
+            tracker.save([], [])
+            return PutFilesResult(
+                0, 0, time.perf_counter() - start, {}, skipped=tracker.skipped
+            )
+
+    target, started = commit, False
+    if tracker is not None or parallelism > 1:
+        # Parallel streams must share one commit (writing to a branch would
+        # give each its own), and the manifest records the commit written.
+        target, started = _open_commit(client, commit)
+    try:
+        return _put_files(
+            client, target, pairs, deletes, tracker, parallelism, start, kwargs
+        )
+    finally:
+        if started:
+            client.finish_commit(target)
+
+
+def _put_files(
+    client: Client,
+    commit: SubcommitType,
+    pairs: Iterable[Tuple[str, str]],
+    deletes: List[str],
+    tracker: Optional["_UploadManifest"],
+    parallelism: int,
+    start: float,
+    kwargs: dict,
+) -> PutFilesResult:
+    if parallelism <= 1:
+        files = total_bytes = 0
+        with client.modify_file_client(commit) as mfc:
+            for source_filepath, dest_filepath in pairs:
+                if tracker is None:
                     mfc.put_file_from_filepath(dest_filepath, source_filepath, **kwargs)
-        else:
-            raise Exception("Please provide an existing directory or file")
+                else:
+                    mfc._enqueue(
+                        _HashingFilepathOp(
+                            dest_filepath, source_filepath, tracker.digests, **kwargs
+                        )
+                    )
+                files += 1
+                total_bytes += os.path.getsize(source_filepath)
+            for path in deletes:
+                mfc.delete_file(path, datum=kwargs.get("datum"))
+        if tracker is not None:
+            tracker.save(pairs, deletes, commit.id)
+        return PutFilesResult(
+            files,
+            total_bytes,
+            time.perf_counter() - start,
+            {},
+            skipped=tracker.skipped if tracker else 0,
+            deleted=len(deletes),
+        )
+
+    errors = {}
+    sizes = {}
+    for source_filepath, dest_filepath in pairs:
+        try:
+            sizes[(source_filepath, dest_filepath)] = os.path.getsize(source_filepath)
+        except OSError as err:
+            errors[source_filepath] = err
+
+    # Greedily assign the largest remaining file to the least loaded stream.
+    partitions = [[] for _ in range(parallelism)]
+    loads = [(0, i) for i in range(parallelism)]
+    for pair, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        load, i = heapq.heappop(loads)
+        partitions[i].append(pair)
+        heapq.heappush(loads, (load + size, i))
+
+    digests = tracker.digests if tracker else None
+    deleted = []
+
+    def upload(partition, deletes):
+        with client.modify_file_client(commit) as mfc:
+            for source_filepath, dest_filepath in partition:
+                mfc._enqueue(
+                    _ReportingFilepathOp(
+                        dest_filepath, source_filepath, errors, digests, **kwargs
+                    )
+                )
+            for path in deletes:
+                mfc.delete_file(path, datum=kwargs.get("datum"))
+        deleted.extend(deletes)
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        futures = {}
+        for i, partition in enumerate(partitions):
+            # The deletes go to the first stream.
+            if partition or (i == 0 and deletes):
+                future = executor.submit(upload, partition, deletes if i == 0 else [])
+                futures[future] = partition
+        for future in as_completed(futures):
+            err = future.exception()
+            if err is not None:
+                for source_filepath, _ in futures[future]:
+                    errors.setdefault(source_filepath, err)
+
+    uploaded = [pair for pair in sizes if pair[0] not in errors]
+    if tracker is not None:
+        tracker.save(uploaded, deleted, commit.id)
+    return PutFilesResult(
+        files=len(uploaded),
+        bytes=sum(sizes[pair] for pair in uploaded),
+        seconds=time.perf_counter() - start,
+        errors=errors,
+        skipped=tracker.skipped if tracker else 0,
+        deleted=len(deleted),
+    )
+
+
+def _open_commit(client: Client, commit: SubcommitType) -> Tuple[pfs_pb2.Commit, bool]:
+    """Resolves `commit` to an open commit given by ID, which several
+    ModifyFile streams can write to together. If `commit` is a branch whose
+    head is finished, a commit is started on it, and the second element of
+    the result is true so that the caller finishes it.
+    """
+    commit = commit_from(commit)
+    try:
+        info = next(client.inspect_commit(commit))
+    except grpc.RpcError as err:
+        # A branch that does not exist yet is created by starting a commit.
+        if err.code() != grpc.StatusCode.NOT_FOUND or commit.id:
+            raise
+    else:
+        if not info.HasField("finishing"):
+            return info.commit, False
+        if commit.id:
+            raise ValueError(f"commit {commit.id} is finished")
+    repo = commit_repo(commit)
+    started = client.start_commit(
+        repo.name, commit.branch.name, project_name=repo.project.name or None
+    )
+    return started, True
+
+
+def _walk_files(source_path: str, dest_path: str) -> Iterator[Tuple[str, str]]:
+    """Yields (local path, PFS path) pairs for every file in `source_path`."""
+    if os.path.isfile(source_path):
+        yield source_path, dest_path
+        return
+    for root, _, filenames in os.walk(source_path):
+        for filename in filenames:
+            source_filepath = os.path.join(root, filename)
+            dest_filepath = os.path.join(
+                dest_path, os.path.relpath(source_filepath, start=source_path)
+            )
+            yield source_filepath, dest_filepath
+
+
+class _HashingFilepathOp(_AtomicModifyFilepathOp):
+    """A `ModifyFile` operation that records the SHA-256 of the content it
+    sent in `digests`, keyed by PFS path, once the whole file is sent. Does
+    nothing more if `digests` is None.
+    """
+
+    def __init__(
+        self,
+        pfs_path: str,
+        local_path: str,
+        digests: Optional[Dict[str, str]],
+        datum: str = None,
+        append: bool = False,
+    ):
+        super().__init__(pfs_path, local_path, datum, append)
+        self.digests = digests
+
+    def reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
+        if self.digests is None:
+            yield from super().reqs()
+            return
+        digest = hashlib.sha256()
+        for req in super().reqs():
+            digest.update(req.add_file.raw.value)
+            yield req
+        self.digests[_pfs_path(self.path)] = digest.hexdigest()
+
+
+class _ReportingFilepathOp(_HashingFilepathOp):
+    """A `ModifyFile` operation that records local read errors in `errors`
+    instead of failing the whole stream. Since part of the file may already
+    have been sent, the file is deleted again from the commit.
+    """
+
+    def __init__(
+        self,
+        pfs_path: str,
+        local_path: str,
+        errors: Dict[str, Exception],
+        digests: Optional[Dict[str, str]] = None,
+        datum: str = None,
+        append: bool = False,
+    ):
+        super().__init__(pfs_path, local_path, digests, datum, append)
+        self.errors = errors
+
+    def reqs(self) -> Iterator[pfs_pb2.ModifyFileRequest]:
+        try:
+            yield from super().reqs()
+        except OSError as err:
+            self.errors[self.local_path] = err
+            yield _delete_file_req(self.path, self.datum)
+
+
+class _UploadManifest:
+    """The local manifest of the files ``put_files()`` uploaded from a
+    directory, keyed by PFS path. Each entry records the local size, mtime
+    and SHA-256 of the file when it was uploaded, the commit it was uploaded
+    to and the hash PFS gave the file, which is only known once that commit
+    is finished and so is filled in by the next upload.
+    """
+
+    def __init__(self, client: Client, path: str, commit: SubcommitType):
+        self.client = client
+        self.path = path
+        self.commit = commit_from(commit)
+        self.entries: Dict[str, dict] = _read_manifest(path)
+        self.stats: Dict[str, os.stat_result] = {}
+        # The SHA-256 of uploaded files, filled in as they are sent.
+        self.digests: Dict[str, str] = {}
+        # The (size, hash) of the files in PFS, by path.
+        self.remote: Dict[str, Tuple[int, str]] = {}
+        self.skipped = 0
+
+    def diff(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        dest_path: str,
+        mirror: bool = False,
+        hash_files: Callable[[List[str]], Iterable[str]] = None,
+    ) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """Returns the (local path, PFS path) pairs to upload, and the PFS
+        paths to delete: previously uploaded files that no longer exist
+        locally or, if `mirror` is set, any file under `dest_path` that does
+        not exist locally.
+
+        `hash_files` computes the SHA-256 of a list of local files, e.g. in
+        parallel. It is used for files whose mtime changed since they were
+        uploaded.
+        """
+        # The files already in PFS are listed even on a first upload, as
+        # writing a file that exists without deleting it first appends to it.
+        base = self._base()
+        if base is not None:
+            self.remote = self._walk(base, dest_path)
+            self._resolve_hashes(base, self.remote, dest_path)
+
+        upload, seen, to_hash = [], set(), []
+        for source_filepath, dest_filepath in pairs:
+            path = _pfs_path(dest_filepath)
+            seen.add(path)
+            stat = os.stat(source_filepath)
+            self.stats[path] = stat
+            unchanged = self._unchanged(path, stat, self.remote.get(path))
+            if unchanged is None:
+                to_hash.append((source_filepath, dest_filepath))
+            elif unchanged:
+                self.skipped += 1
+            else:
+                upload.append((source_filepath, dest_filepath))
+
+        if to_hash:
+            hash_files = hash_files or (lambda paths: map(_sha256_file, paths))
+            digests = hash_files([source_filepath for source_filepath, _ in to_hash])
+            for (source_filepath, dest_filepath), digest in zip(to_hash, digests):
+                path = _pfs_path(dest_filepath)
+                entry = self.entries[path]
+                if digest == entry["sha256"]:
+                    entry["mtime_ns"] = self.stats[path].st_mtime_ns
+                    self.skipped += 1
+                else:
+                    upload.append((source_filepath, dest_filepath))
+
+        root = _pfs_path(dest_path)
+        candidates = self.remote if mirror else self.entries
+        deletes = [
+            path
+            for path in candidates
+            if path not in seen and path in self.remote and _is_under(path, root)
+        ]
+        return upload, deletes
+
+    def _base(self) -> Optional[pfs_pb2.Commit]:
+        """Returns the commit holding what was uploaded before, i.e. the
+        parent of the target commit if it is open, or else the commit itself
+        (writing to a branch with no open commit opens one on its head).
+        """
+        try:
+            info = next(self.client.inspect_commit(self.commit))
+        except grpc.RpcError as err:
+            if err.code() == grpc.StatusCode.NOT_FOUND:
+                return None
+            raise
+        if info.HasField("finished"):
+            return info.commit
+        return info.parent_commit if info.HasField("parent_commit") else None
+
+    def _walk(self, commit: pfs_pb2.Commit, path: str) -> Dict[str, Tuple[int, str]]:
+        remote = {}
+        try:
+            for file_info in self.client.walk_file(commit, path):
+                if file_info.file_type == pfs_pb2.FileType.FILE:
+                    remote[file_info.file.path] = (
+                        file_info.size_bytes,
+                        file_info.hash.hex(),
+                    )
+        except grpc.RpcError as err:
+            if err.code() != grpc.StatusCode.NOT_FOUND:
+                raise
+        return remote
+
+    def _resolve_hashes(
+        self,
+        base: pfs_pb2.Commit,
+        remote: Dict[str, Tuple[int, str]],
+        dest_path: str,
+    ) -> None:
+        """Fills in the PFS hash of files recorded without one, from a listing
+        of the commit they were uploaded to. That commit is usually `base`,
+        whose listing is `remote`.
+        """
+        pending: Dict[str, List[str]] = {}
+        for path, entry in self.entries.items():
+            if entry["pfs_hash"] is None and entry["commit"]:
+                pending.setdefault(entry["commit"], []).append(path)
+        for commit_id, paths in pending.items():
+            listing = remote
+            if commit_id != base.id:
+                commit = pfs_pb2.Commit()
+                commit.CopyFrom(base)
+                commit.id = commit_id
+                listing = self._walk(commit, dest_path)
+            for path in paths:
+                entry = self.entries[path]
+                if path in listing and listing[path][0] == entry["size"]:
+                    entry["pfs_hash"] = listing[path][1]
+
+    def _unchanged(
+        self, path: str, stat: os.stat_result, remote: Optional[Tuple[int, str]]
+    ) -> Optional[bool]:
+        """Returns whether the file at `path` is unchanged since it was
+        uploaded, or None if that depends on its content hash.
+        """
+        entry = self.entries.get(path)
+        if entry is None or remote is None:
+            return False
+        size, pfs_hash = remote
+        if not stat.st_size == entry["size"] == size:
+            return False
+        if entry["pfs_hash"] != pfs_hash:
+            return False
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        return True
+
+    def save(
+        self,
+        uploaded: List[Tuple[str, str]],
+        deleted: List[str],
+        commit_id: str = None,
+    ) -> None:
+        """Records the files uploaded to and deleted from the commit with ID
+        `commit_id`, and writes the manifest.
+        """
+        for _, dest_filepath in uploaded:
+            path = _pfs_path(dest_filepath)
+            stat = self.stats[path]
+            self.entries[path] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": self.digests[path],
+                "commit": commit_id,
+                "pfs_hash": None,
+            }
+        for path in deleted:
+            self.entries.pop(path, None)
+        _write_manifest(self.entries, self.path)
+
+
+def _pfs_path(path: str) -> str:
+    return "/" + path.lstrip("/")
+
+
+def _is_under(path: str, root: str) -> bool:
+    return root == "/" or path == root or path.startswith(root.rstrip("/") + "/")
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb", buffering=0) as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncDirResult(NamedTuple):
+    """A namedtuple subclass summarizing a ``sync_dir()`` run."""
+
+    added: int
+    updated: int
+    deleted: int
+    unchanged: int
+    bytes: int
+    seconds: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+SYNC_DIR_MANIFEST = ".pfs-sync-manifest.json"
+
+
+def sync_dir(
+    client: Client,
+    local_dir: str,
+    repo: str,
+    branch: str,
+    path: str = "/",
+    workers: int = None,
+    delete: bool = True,
+    manifest: str = None,
+    project_name: str = None,
+) -> SyncDirResult:
+    """Utility function for making `path` on a PFS branch a copy of
+    `local_dir`, like ``rsync --delete``. Only files that were added or
+    changed locally are uploaded, and files that no longer exist locally are
+    deleted, all in a single commit. No commit is made if nothing changed.
+
+    PFS file hashes cannot be computed from local content, so changes are
+    detected with a manifest, like ``put_files(manifest=...)``. It records
+    the size, mtime and SHA-256 of each uploaded file and the hash PFS gave
+    it. A file is unchanged if its size and PFS hash match the manifest, and
+    either its size and mtime or its SHA-256 do too. Files are hashed on a
+    pool of `workers` processes. The first sync of a directory uploads every
+    file, as there is nothing to compare with yet.
+
+    Parameters
+    ----------
+    client : Client
+        A python_pachyderm client instance.
+    local_dir : str
+        The local directory to sync from.
+    repo : str
+        The repo to sync to.
+    branch : str
+        The branch to sync to. If it has an open commit, the changes are
+        written to it. Otherwise, a commit is made on it.
+    path : str, optional
+        The PFS directory to sync to.
+    workers : int, optional
+        The number of processes to hash files with. Defaults to the number
+        of CPUs.
+    delete : bool, optional
+        Whether to delete files under `path` that don't exist locally.
+    manifest : str, optional
+        The path of the manifest. Defaults to ``SYNC_DIR_MANIFEST`` in
+        `local_dir`, which is not synced.
+    project_name : str, optional
+        The name of the project the repo is in.
+
+    Returns
+    -------
+    SyncDirResult
+        The number of files added, updated, deleted and unchanged, the bytes
+        uploaded and how long it took.
+
+    Examples
+    --------
+    >>> result = python_pachyderm.sync_dir(
+    ...     client, "data/training/", "repo_name", "master", "/training_set/"
+    ... )
+    >>> print(result.added, result.updated, result.deleted, result.unchanged)
+    """
+    if not os.path.isdir(local_dir):
+        raise NotADirectoryError(local_dir)
+
+    start = time.perf_counter()
+    commit = Commit(repo=repo, branch=branch, project=project_name).to_pb()
+    manifest = manifest or os.path.join(local_dir, SYNC_DIR_MANIFEST)
+    tracker = _UploadManifest(client, manifest, commit)
+    manifest_path = os.path.abspath(manifest)
+    pairs = [
+        (source_filepath, dest_filepath)
+        for source_filepath, dest_filepath in _walk_files(local_dir, path)
+        if os.path.abspath(source_filepath) != manifest_path
+    ]
+
+    def hash_files(paths: List[str]) -> List[str]:
+        if len(paths) < 2 or workers == 1:
+            return [_sha256_file(p) for p in paths]
+        # Spawned rather than forked, as forking a process with open gRPC
+        # channels is not safe.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as executor:
+            return list(executor.map(_sha256_file, paths, chunksize=16))
+
+    upload, deletes = tracker.diff(pairs, path, mirror=delete, hash_files=hash_files)
+    added = sum(1 for _, dest in upload if _pfs_path(dest) not in tracker.remote)
+    total_bytes = 0
+    commit_id = None
+    if upload or deletes:
+        # The manifest records the commit written to, so it is opened first.
+        commit, started = _open_commit(client, commit)
+        try:
+            with client.modify_file_client(commit) as mfc:
+                for source_filepath, dest_filepath in upload:
+                    total_bytes += tracker.stats[_pfs_path(dest_filepath)].st_size
+                    # A file new to the commit needs no delete before it is
+                    # written. The remote files are those of the parent, so
+                    # that only holds for a commit opened here.
+                    new = started and _pfs_path(dest_filepath) not in tracker.remote
+                    mfc._enqueue(
+                        _HashingFilepathOp(
+                            dest_filepath, source_filepath, tracker.digests, append=new
+                        )
+                    )
+                for pfs_path in deletes:
+                    mfc.delete_file(pfs_path)
+        finally:
+            if started:
+                client.finish_commit(commit)
+        commit_id = commit.id
+    tracker.save(upload, deletes, commit_id)
+
+    return SyncDirResult(
+        added=added,
+        updated=len(upload) - added,
+        deleted=len(deletes),
+        unchanged=tracker.skipped,
+        bytes=total_bytes,
+        seconds=time.perf_counter() - start,
+    )
+
+
+class GetFilesResult(NamedTuple):
+    """A namedtuple subclass summarizing a ``get_files()`` download."""
+
+    files: int
+    skipped: int
+    bytes: int
+    seconds: float
+    errors: Dict[str, Exception]
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+GET_FILES_MANIFEST = ".pfs-manifest.json"
+
+
+def get_files(
+    client: Client,
+    commit: SubcommitType,
+    pfs_path: str,
+    local_dir: str,
+    workers: int = 4,
+    skip_unchanged: bool = True,
+) -> GetFilesResult:
+    """Utility function for downloading the files under `pfs_path` into
+    `local_dir`, mirroring the directory structure. The inverse of
+    ``put_files()``.
+
+    The ``WalkFile`` listing is consumed as the downloads progress, and at
+    most ``2 * workers`` files are queued at a time. Each file is written to
+    a temporary file next to its destination and renamed into place once
+    complete, so a local file is never left partially written. `commit` is
+    resolved to a commit ID first, so a branch that moves during the
+    download does not mix files from different commits.
+
+    PFS file hashes cannot be computed from local content, so the hash and
+    local size/mtime of each downloaded file are recorded in a manifest
+    (``GET_FILES_MANIFEST``) in `local_dir`. A file is skipped if the local
+    copy is unchanged since it was downloaded and its PFS hash still matches.
+
+    Parameters
+    ----------
+    client : Client
+        A python_pachyderm client instance.
+    commit : SubcommitType
+        The subcommit (commit at the repo-level) to download files from.
+    pfs_path : str
+        The file/directory in PFS to download.
+    local_dir : str
+        The local directory to download into. Created if it doesn't exist.
+    workers : int, optional
+        The number of files to download concurrently.
+    skip_unchanged : bool, optional
+        Whether to skip files that are unchanged since a previous download.
+        If False, every file is downloaded and no manifest is written.
+
+    Returns
+    -------
+    GetFilesResult
+        The number of files downloaded and skipped, the bytes downloaded,
+        how long it took and any per-file errors (keyed by PFS path).
+
+    Examples
+    --------
+    >>> result = python_pachyderm.get_files(
+    ...     client, ("repo_name", "master"), "/training_set/", "data/", 8
+    ... )
+    >>> print(result.bytes_per_second, result.skipped, result.errors)
+    """
+    start = time.perf_counter()
+    os.makedirs(local_dir, exist_ok=True)
+    manifest_path = os.path.join(local_dir, GET_FILES_MANIFEST)
+    manifest = _read_manifest(manifest_path) if skip_unchanged else {}
+
+    errors = {}
+    downloaded = []
+    skipped = 0
+    slots = threading.BoundedSemaphore(2 * workers)
+    commit = next(client.inspect_commit(commit)).commit
+    # Read before the workers start, as reading the umask briefly resets it.
+    mode = _file_mode()
+
+    def download(file_info: pfs_pb2.FileInfo, local_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            with client.get_file(commit, file_info.file.path) as src:
+                _write_atomic(src, local_path, file_info.size_bytes, mode)
+            stat = os.stat(local_path)
+            manifest[file_info.file.path] = {
+                "hash": file_info.hash.hex(),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            downloaded.append(stat.st_size)
+        except Exception as err:
+            errors[file_info.file.path] = err
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for file_info in client.walk_file(commit, pfs_path):
+            if file_info.file_type != pfs_pb2.FileType.FILE:
+                continue
+            local_path = _local_path(pfs_path, file_info.file.path, local_dir)
+            if skip_unchanged and _is_unchanged(manifest, file_info, local_path):
+                skipped += 1
+                continue
+            slots.acquire()
+            executor.submit(download, file_info, local_path)
+
+    if skip_unchanged:
+        _write_manifest(manifest, manifest_path)
+
+    return GetFilesResult(
+        files=len(downloaded),
+        skipped=skipped,
+        bytes=sum(downloaded),
+        seconds=time.perf_counter() - start,
+        errors=errors,
+    )
+
+
+def _local_path(pfs_root: str, pfs_path: str, local_dir: str) -> str:
+    relative = os.path.relpath(pfs_path, start=os.path.join("/", pfs_root))
+    if relative == ".":
+        # `pfs_root` is itself a file.
+        relative = os.path.basename(pfs_path)
+    return os.path.join(local_dir, relative)
+
+
+def _is_unchanged(
+    manifest: Dict[str, dict], file_info: pfs_pb2.FileInfo, local_path: str
+) -> bool:
+    entry = manifest.get(file_info.file.path)
+    if entry is None or entry["hash"] != file_info.hash.hex():
+        return False
+    try:
+        stat = os.stat(local_path)
+    except OSError:
+        return False
+    return (
+        stat.st_size == entry["size"] == file_info.size_bytes
+        and stat.st_mtime_ns == entry["mtime_ns"]
+    )
+
+
+def _file_mode() -> int:
+    """Returns the mode ``open()`` creates files with under the umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _write_atomic(
+    src: BinaryIO, local_path: str, size: int = None, mode: int = None
+) -> None:
+    """Copies `src` to a temporary file in the destination directory and
+    renames it to `local_path`. If `size` is set, fewer bytes are an error,
+    as a PFSFile whose stream breaks reads as if it ended early. The file
+    gets `mode`, by default that of a file created by ``open()``, rather
+    than the owner-only mode of temporary files.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(local_path) or ".",
+        prefix=".{}.".format(os.path.basename(local_path)),
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as dest:
+            os.fchmod(dest.fileno(), _file_mode() if mode is None else mode)
+            # read1 hands over whole gRPC messages from a PFSFile uncopied.
+            written = 0
+            for chunk in iter(src.read1, b""):
+                written += dest.write(chunk)
+        if size is not None and written != size:
+            raise ConnectionError(
+                "GetFile stream for {} ended at byte {} of {}".format(
+                    local_path, written, size
+                )
+            )
+        os.replace(tmp_path, local_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_manifest(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: Dict[str, dict], path: str) -> None:
+    _write_atomic(io.BytesIO(json.dumps(manifest).encode()), path)
 
 
 def parse_json_pipeline_spec(j: str) -> pps_pb2.CreatePipelineRequest:
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+"""Tests for the asyncio client, run against an in-process gRPC server."""
+
+import asyncio
+
+import grpc
+from google.protobuf import empty_pb2, wrappers_pb2
+
+from python_pachyderm.aio import AsyncClient
+from python_pachyderm.proto.v2.pfs import pfs_pb2, pfs_pb2_grpc
+from python_pachyderm.proto.v2.version.versionpb import version_pb2, version_pb2_grpc
+from python_pachyderm.testing import FakePachd
+
+
+class VersionServicer(version_pb2_grpc.APIServicer):
+    def __init__(self):
+        self.metadata = []
+
+    async def GetVersion(self, request, context):
+        self.metadata.append(dict(context.invocation_metadata()))
+        return version_pb2.Version(major=2)
+
+
+class PFSServicer(pfs_pb2_grpc.APIServicer):
+    def __init__(self):
+        self.modify_file_requests = []
+
+    async def GetFile(self, request, context):
+        for chunk in (b"foo", b"bar", b"baz"):
+            yield wrappers_pb2.BytesValue(value=chunk)
+
+    async def ModifyFile(self, request_iterator, context):
+        async for request in request_iterator:
+            self.modify_file_requests.append(request)
+        return empty_pb2.Empty()
+
+
+def run_with_server(test):
+    async def main():
+        version, pfs = VersionServicer(), PFSServicer()
+        server = grpc.aio.server()
+        version_pb2_grpc.add_APIServicer_to_server(version, server)
+        pfs_pb2_grpc.add_APIServicer_to_server(pfs, server)
+        port = server.add_insecure_port("localhost:0")
+        await server.start()
+        try:
+            async with AsyncClient("localhost", port) as client:
+                await test(client, version, pfs)
+        finally:
+            await server.stop(None)
+
+    asyncio.run(main())
+
+
+def test_metadata_follows_auth_token():
+    async def test(client, version, _):
+        assert (await client.get_remote_version()).major == 2
+        client.auth_token = "abc"
+        client.transaction_id = "123"
+        await client.get_remote_version()
+
+        assert "authn-token" not in version.metadata[0]
+        assert version.metadata[1]["authn-token"] == "abc"
+        assert version.metadata[1]["pach-transaction"] == "123"
+
+    run_with_server(test)
+
+
+def test_concurrent_calls_share_channel():
+    async def test(client, version, _):
+        channel = client._channel
+        results = await asyncio.gather(
+            *(client.get_remote_version() for _ in range(50))
+        )
+        assert [r.major for r in results] == [2] * 50
+        assert client._channel is channel
+
+    run_with_server(test)
+
+
+def test_get_file():
+    async def test(client, *_):
+        f = await client.get_file(("repo", "master"), "/file")
+        assert await f.read(4) == b"foob"
+        assert await f.read() == b"arbaz"
+
+        async with await client.get_file(("repo", "master"), "/file") as f:
+            assert [chunk async for chunk in f] == [b"foo", b"bar", b"baz"]
+
+    run_with_server(test)
+
+
+def test_modify_file_client():
+    async def test(client, _, pfs):
+        async with client.modify_file_client(("repo", "master")) as mfc:
+            mfc.put_file_from_bytes("/file", b"DATA")
+            mfc.delete_file("/old")
+
+        sent = pfs.modify_file_requests
+        assert sent[0].set_commit.branch.name == "master"
+        assert sent[-1].delete_file.path == "/old"
+        assert b"".join(r.add_file.raw.value for r in sent) == b"DATA"
+
+    run_with_server(test)
+
+
+def test_subscribe_job():
+    async def main(pachd):
+        async with AsyncClient("localhost", pachd.port) as client:
+            jobs = client.subscribe_job("foo")
+            assert (await jobs.__anext__()).job.id == first.id
+            # The stream is reopened, and skips the jobs it already returned.
+            pachd.pps.drop_subscriptions()
+            second = pachd.pps.add_job("foo").job
+            assert (await jobs.__anext__()).job.id == second.id
+            await jobs.aclose()
+
+    with FakePachd() as pachd:
+        first = pachd.pps.add_job("foo").job
+        asyncio.run(main(pachd))
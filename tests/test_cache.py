@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+"""Tests for the local file cache. These run against the fake pachd server."""
+
+import io
+import os
+import time
+
+import grpc
+import pytest
+
+from python_pachyderm.cache import FileCache, MetadataCache
+from python_pachyderm.metrics import MetricsRecorder
+from python_pachyderm.pfs import commit_from
+from python_pachyderm.service import pfs_proto
+from python_pachyderm.testing import FakePachd
+
+
+def test_get_file_cache(tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    data = os.urandom(3 * 1024**2)
+    with FakePachd() as pachd, pachd.client(file_cache=cache) as client:
+        commit = pachd.pfs.add_files("foo", "master", [("/big", data), ("/e", b"")])
+
+        # The first read streams from pachd, and caches the file once read.
+        assert client.get_file(("foo", "master"), "/big").read() == data
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert cache.size_bytes == len(data)
+
+        with client.get_file(("foo", "master"), "big") as f:
+            assert f.seekable()
+            assert f.read(10) == data[:10]
+            f.seek(-10, io.SEEK_END)
+            assert f.read() == data[-10:]
+            assert f.read() == b""
+        buf = bytearray(100)
+        assert client.get_file(commit, "/big", offset=50).readinto(buf) == 100
+        assert buf == data[50:150]
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        # Empty files cannot be mapped, but are cached nonetheless.
+        assert client.get_file(commit, "/e").read() == b""
+        assert client.get_file(commit, "/e").read() == b""
+        assert (cache.hits, cache.misses) == (3, 2)
+
+        # Files that fail or are not read to the end are not cached.
+        with pytest.raises(ConnectionError):
+            client.get_file(("foo", "master"), "/missing")
+        client.put_file_bytes(("foo", "master"), "/new", b"new")
+        client.get_file(("foo", "master"), "/new").read(1)
+        # Nor are files of open commits.
+        with client.commit("foo", "master") as c:
+            client.put_file_bytes(c, "/open", b"open")
+            assert client.get_file(c, "/open").read() == b"open"
+            assert client.get_file(c, "/open").read() == b"open"
+        assert cache.size_bytes == len(data)
+        assert not [p for p in os.listdir(cache.directory) if p.endswith(".partial")]
+
+
+def test_file_cache_eviction(tmp_path):
+    cache = FileCache(tmp_path, max_bytes=2500)
+    files = [(f"/{i}", bytes([i]) * 1000) for i in range(4)]
+    with FakePachd() as pachd, pachd.client(file_cache=cache) as client:
+        commit = pachd.pfs.add_files("foo", "master", files + [("/big", b"x" * 3000)])
+        for path, data in files[:2]:
+            assert client.get_file(commit, path).read() == data
+        for entry in os.scandir(cache.directory):
+            os.utime(entry.path, (0, 0))
+        # Using /0 makes /1 the least recently used, so /2 evicts it.
+        assert client.get_file(commit, "/0").read() == files[0][1]
+        assert client.get_file(commit, "/2").read() == files[2][1]
+        assert cache.size_bytes == 2000
+
+        hits = cache.hits
+        assert client.get_file(commit, "/0").read() == files[0][1]
+        assert client.get_file(commit, "/1").read() == files[1][1]
+        assert cache.hits == hits + 1
+        # Files over the limit are never cached.
+        assert client.get_file(commit, "/big").read() == b"x" * 3000
+        assert cache.size_bytes <= 2500
+
+    cache.clear()
+    assert cache.size_bytes == 0 and not os.listdir(tmp_path)
+
+
+def test_file_cache_key():
+    commit_id = "467c580611234cdb8cc9758c7aa96087"
+
+    def key(commit, path="/a"):
+        return FileCache.key(pfs_proto.File(commit=commit_from(commit), path=path))
+
+    # The commits of a commit set share an ID, so the repo is part of the key.
+    assert key(("foo", commit_id)) != key(("bar", commit_id))
+    assert key(("foo", commit_id)) == key(("foo", "master", commit_id), "a")
+    resolved = pfs_proto.Commit(id=commit_id, repo=pfs_proto.Repo(name="foo"))
+    assert key(resolved) == key(("foo", commit_id))
+
+
+def test_metadata_cache():
+    cache = MetadataCache(ttl=60)
+    recorder = MetricsRecorder()
+
+    def calls(name):
+        method = recorder.snapshot().get(f"/pfs_v2.API/{name}")
+        return method.calls if method else 0
+
+    with FakePachd() as pachd, pachd.client(
+        metadata_cache=cache, metrics=recorder
+    ) as client:
+        client.create_repo("foo")
+        client.put_file_bytes(("foo", "master"), "/a", b"a")
+
+        assert client.inspect_repo("foo").repo.name == "foo"
+        client.inspect_repo("foo").repo.name = "mutated"
+        assert client.inspect_repo("foo").repo.name == "foo"
+        assert calls("InspectRepo") == 1
+        first = client.inspect_branch("foo", "master").head
+        assert client.inspect_branch("foo", "master").head == first
+        assert calls("InspectBranch") == 1
+        for _ in range(2):
+            assert next(client.inspect_commit(("foo", first.id))).finished.seconds
+        assert calls("InspectCommit") == 1
+
+        # Writes through the client drop the entries that may have changed,
+        # but finished commits inspected by ID are kept.
+        client.put_file_bytes(("foo", "master"), "/b", b"b")
+        second = client.inspect_branch("foo", "master").head
+        assert second.id != first.id
+        assert calls("InspectBranch") == 2
+        next(client.inspect_commit(("foo", first.id)))
+        assert calls("InspectCommit") == 1
+        # A finished commit inspected by branch is also kept by ID.
+        assert next(client.inspect_commit(("foo", "master"))).commit.id == second.id
+        next(client.inspect_commit(("foo", second.id)))
+        assert calls("InspectCommit") == 2
+
+        # Open commits may change, and are re-inspected once finished.
+        commit = client.start_commit("foo", "master")
+        assert not next(client.inspect_commit(commit)).finished.seconds
+        client.finish_commit(commit)
+        assert next(client.inspect_commit(commit)).finished.seconds
+        assert calls("InspectCommit") == 4
+
+        client.delete_repo("foo")
+        with pytest.raises(grpc.RpcError):
+            client.inspect_repo("foo")
+        assert (cache.hits, cache.misses) == (6, 8)
+
+
+def test_metadata_cache_expiry():
+    cache = MetadataCache(ttl=0.05, max_entries=2)
+    info = pfs_proto.RepoInfo(description="foo")
+    for name in ("a", "b", "c"):
+        cache.put(("repo", ("default", name, "user")), info)
+    assert len(cache) == 2
+    assert cache.get(("repo", ("default", "a", "user"))) is None
+    cache.put(("commit", ("default", "c", "user"), "id", ""), info, permanent=True)
+    time.sleep(0.05)
+    assert cache.get(("repo", ("default", "c", "user"))) is None
+    assert cache.get(("commit", ("default", "c", "user"), "id", "")) == info
+
+    cache.put(("repo", ("default", "c", "user")), info)
+    cache.invalidate(pfs_proto.Repo(name="c"))
+    assert len(cache) == 1
+    cache.invalidate(pfs_proto.Repo(name="c"), permanent=True)
+    assert len(cache) == 0
@@ -2,11 +2,23 @@ import io
 import os
 import json
 import ssl
+import subprocess
+import sys
 from base64 import b64encode
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
+import grpc
 import pytest
 import python_pachyderm
+from google.protobuf.empty_pb2 import Empty
+from python_pachyderm.proto.v2.version.versionpb import version_pb2, version_pb2_grpc
+from grpc_interceptor import ClientCallDetails
+from python_pachyderm.interceptor import (
+    StreamingCompressionClientInterceptor,
+    _check_connection_error,
+)
+from python_pachyderm.service import MAX_RECEIVE_MESSAGE_SIZE, Service
 from tests import util
 
 """Tests generic client functionality"""
@@ -402,3 +414,187 @@ def test_client_root_certs():
     root_certs = f"{ssl.PEM_HEADER}\n I'm a certificate! \n{ssl.PEM_FOOTER}".encode()
     client = python_pachyderm.Client(host, port, root_certs=root_certs)
     assert client.root_certs == root_certs
+
+
+def test_client_shares_channel():
+    """Clients for the same address share one channel until all are closed."""
+    client1 = python_pachyderm.Client("pachd-share.example.com", 54321)
+    client2 = python_pachyderm.Client("pachd-share.example.com", 54321)
+    other_host = python_pachyderm.Client("pachd-other.example.com", 54321)
+    unshared = python_pachyderm.Client(
+        "pachd-share.example.com", 54321, share_channel=False
+    )
+
+    channel = client1._base_channel
+    assert client2._base_channel is channel
+    assert other_host._base_channel is not channel
+    assert unshared._base_channel is not channel
+
+    close = []
+    channel.close = lambda: close.append(channel)
+    client1.close()
+    client1.close()
+    assert close == []
+    with client2:
+        pass
+    assert close == [channel]
+
+    other_host.close()
+    unshared.close()
+    with python_pachyderm.Client("pachd-share.example.com", 54321) as client3:
+        assert client3._base_channel is not channel
+
+
+def _serve_version(invocation_metadata):
+    class VersionServicer(version_pb2_grpc.APIServicer):
+        def GetVersion(self, request, context):
+            invocation_metadata.append(list(context.invocation_metadata()))
+            return version_pb2.Version(major=2)
+
+    server = grpc.server(ThreadPoolExecutor(max_workers=1))
+    version_pb2_grpc.add_APIServicer_to_server(VersionServicer(), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, port
+
+
+def test_client_metadata_without_new_channel():
+    """Setting the auth token or transaction only changes the metadata sent,
+    the channel and stubs are kept."""
+    invocation_metadata = []
+    server, port = _serve_version(invocation_metadata)
+    try:
+        with python_pachyderm.Client("localhost", port) as client:
+            channel = client._channel
+            assert client.get_remote_version().major == 2
+            client.auth_token = "abc"
+            client.transaction_id = "123"
+            assert client.get_remote_version().major == 2
+            assert client._channel is channel
+    finally:
+        server.stop(None)
+
+    assert "authn-token" not in dict(invocation_metadata[0])
+    assert dict(invocation_metadata[1])["authn-token"] == "abc"
+    assert dict(invocation_metadata[1])["pach-transaction"] == "123"
+
+
+def test_client_req_uses_main_channel(mocker):
+    """`_req` calls go over the client's channel, with its metadata once."""
+    invocation_metadata = []
+    server, port = _serve_version(invocation_metadata)
+    try:
+        with python_pachyderm.Client("localhost", port, auth_token="abc") as client:
+            insecure_channel = mocker.spy(grpc, "insecure_channel")
+            for _ in range(2):
+                version = client._req(Service.VERSION, "GetVersion", req=Empty())
+                assert version.major == 2
+            assert insecure_channel.call_count == 0
+            assert len(client._methods) == 1
+    finally:
+        server.stop(None)
+
+    for metadata in invocation_metadata:
+        assert [v for k, v in metadata if k == "authn-token"] == ["abc"]
+
+
+def test_channel_options():
+    options = python_pachyderm.ChannelOptions(
+        max_send_message_length=1024,
+        keepalive_time_ms=30_000,
+        http2_lookahead_bytes=4 * 1024**2,
+        retry_policy=None,
+        extra_options=[("grpc.enable_http_proxy", 0)],
+    ).to_grpc_options()
+    assert dict(options) == {
+        "grpc.max_receive_message_length": MAX_RECEIVE_MESSAGE_SIZE,
+        "grpc.primary_user_agent": "python-pachyderm",
+        "grpc.max_send_message_length": 1024,
+        "grpc.keepalive_time_ms": 30_000,
+        "grpc.http2.max_pings_without_data": 0,
+        "grpc.http2.lookahead_bytes": 4 * 1024**2,
+        "grpc.enable_http_proxy": 0,
+    }
+
+    service_config = dict(python_pachyderm.ChannelOptions().to_grpc_options())[
+        "grpc.service_config"
+    ]
+    (method_config,) = json.loads(service_config)["methodConfig"]
+    assert {"service": "pfs_v2.API", "method": "InspectFile"} in method_config["name"]
+    assert {"service": "pfs_v2.API", "method": "ModifyFile"} not in method_config[
+        "name"
+    ]
+
+
+def test_client_retries_idempotent_calls():
+    """Idempotent unary calls are retried on UNAVAILABLE, unless disabled."""
+    calls = []
+
+    class FlakyVersionServicer(version_pb2_grpc.APIServicer):
+        def GetVersion(self, request, context):
+            calls.append(request)
+            if len(calls) % 2:
+                context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+            return version_pb2.Version(major=2)
+
+    server = grpc.server(ThreadPoolExecutor(max_workers=1))
+    version_pb2_grpc.add_APIServicer_to_server(FlakyVersionServicer(), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    try:
+        with python_pachyderm.Client("localhost", port) as client:
+            assert client.get_remote_version().major == 2
+        assert len(calls) == 2
+
+        options = python_pachyderm.ChannelOptions(retry_policy=None)
+        with python_pachyderm.Client(
+            "localhost", port, channel_options=options
+        ) as client:
+            with pytest.raises(grpc.RpcError):
+                client.get_remote_version()
+        assert len(calls) == 3
+    finally:
+        server.stop(None)
+
+
+def test_check_connection_error_cancelled():
+    """Cancelled calls, e.g. of aborted uploads, are not errors."""
+    future = Future()
+    future.cancel()
+    _check_connection_error(future)
+
+
+def test_streaming_compression_interceptor():
+    interceptor = StreamingCompressionClientInterceptor(grpc.Compression.Gzip)
+    details = ClientCallDetails(
+        method="/pfs_v2.API/ModifyFile",
+        timeout=None,
+        metadata=None,
+        credentials=None,
+        wait_for_ready=None,
+        compression=None,
+    )
+
+    sent = interceptor.intercept_stream_unary(lambda d, _: d, details, iter([]))
+    assert sent.compression == grpc.Compression.Gzip
+    assert sent.method == "/pfs_v2.API/ModifyFile"
+
+    explicit = details._replace(compression=grpc.Compression.NoCompression)
+    sent = interceptor.intercept_stream_unary(lambda d, _: d, explicit, iter([]))
+    assert sent.compression == grpc.Compression.NoCompression
+
+
+def test_lazy_imports():
+    """Importing python_pachyderm or creating a Client does not import the
+    protobuf modules of services that are not used."""
+    script = (
+        "import sys, python_pachyderm;"
+        "assert 'grpc' not in sys.modules;"
+        "client = python_pachyderm.Client('localhost', 30650);"
+        "assert 'python_pachyderm.proto.v2.pps.pps_pb2' not in sys.modules;"
+        "assert 'python_pachyderm.proto.v2.worker.worker_pb2' not in sys.modules;"
+        "client.list_pipeline;"
+        "assert 'python_pachyderm.proto.v2.pps.pps_pb2_grpc' not in sys.modules;"
+        "assert client._PPSMixin__stub.ListPipeline"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+"""Tests for per-RPC metrics. These run against the fake pachd server."""
+
+import grpc
+import pytest
+
+from python_pachyderm.metrics import MetricsRecorder
+from python_pachyderm.testing import FakePachd
+
+
+def test_metrics():
+    recorder = MetricsRecorder()
+    stats = []
+
+    def sink(s):
+        recorder(s)
+        stats.append(s)
+
+    with FakePachd() as pachd, pachd.client(metrics=sink) as client:
+        client.create_repo("foo")
+        client.put_file_bytes(("foo", "master"), "file.dat", b"x" * 1000)
+        assert client.get_file(("foo", "master"), "file.dat").read() == b"x" * 1000
+        with pytest.raises(grpc.RpcError):
+            client.inspect_repo("bar")
+        client.get_file(("foo", "master"), "file.dat").close()
+
+    # The closed file is cancelled, unless the server already sent all of it.
+    closed = stats.pop()
+    assert closed.name == "GetFile"
+    assert closed.code in (grpc.StatusCode.CANCELLED, grpc.StatusCode.OK)
+    by_method = [(s.name, s.code) for s in stats]
+    assert by_method == [
+        ("CreateRepo", grpc.StatusCode.OK),
+        ("ModifyFile", grpc.StatusCode.OK),
+        ("GetFile", grpc.StatusCode.OK),
+        ("InspectRepo", grpc.StatusCode.NOT_FOUND),
+    ]
+    modify_file = stats[1]
+    assert modify_file.service == "pfs_v2.API"
+    assert modify_file.messages_sent > 1 and modify_file.bytes_sent > 1000
+    assert stats[2].messages_received == 1 and stats[2].bytes_received > 1000
+
+    metrics = recorder.snapshot()
+    get_file = metrics["/pfs_v2.API/GetFile"]
+    assert get_file.calls == 2 and get_file.codes["OK"] >= 1
+    assert sum(get_file.buckets) == 2
+    assert 0 < get_file.quantile(0.5) < float("inf")
+    assert metrics["/pfs_v2.API/InspectRepo"].codes == {"NOT_FOUND": 1}
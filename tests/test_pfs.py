@@ -1,18 +1,25 @@
 #!/usr/bin/env python
 
 """Tests PFS-related functionality"""
+
+import array
 import os
+import pickle
+import shutil
 import tempfile
+import time
 from io import BytesIO
 from pathlib import Path
 from typing import NamedTuple
 
+import grpc
 import pytest
 from google.protobuf import wrappers_pb2
 
 import python_pachyderm
 from python_pachyderm import Client, PFSFile
 from python_pachyderm.service import pfs_proto, MAX_RECEIVE_MESSAGE_SIZE
+from python_pachyderm.testing import FakePachd, NetworkConditions
 from tests import util
 
 
@@ -281,6 +288,89 @@ def test_put_file_bytes_large():
     assert len(files) == 1
 
 
+def test_put_file_from_filepath_chunks(mocker, tmp_path: Path):
+    """
+    Files are sent in fixed-size chunks regardless of their newlines.
+    """
+    mocker.patch("python_pachyderm.mixin.pfs.BUFFER_SIZE", 64)
+    mocker.patch("python_pachyderm.mixin.pfs.MIN_BUFFER_SIZE", 16)
+    data = b"\n" * 100 + os.urandom(100)
+    local_path = tmp_path.joinpath("file.dat")
+    local_path.write_bytes(data)
+
+    mfc = python_pachyderm.ModifyFileClient(("repo", "master"))
+    mfc.put_file_from_filepath("/file.dat", str(local_path))
+    chunks = [
+        req.add_file.raw.value
+        for req in mfc._reqs()
+        if req.HasField("add_file") and req.add_file.raw.value
+    ]
+
+    assert [len(c) for c in chunks] == [64, 64, 64, 8]
+    assert b"".join(chunks) == data
+
+
+def test_append_files_from_bytes():
+    """
+    New files are sent as one message each, without a delete.
+    """
+    mfc = python_pachyderm.ModifyFileClient(("repo", "master"))
+    mfc.append_files_from_bytes([("/a", b"DATA"), ("/b", b"")])
+    mfc.put_file_from_bytes("/c", b"DATA")
+    reqs = list(mfc._reqs())[1:]
+
+    assert [r.WhichOneof("body") for r in reqs] == [
+        "add_file",
+        "add_file",
+        "delete_file",
+        "add_file",
+    ]
+    assert [(r.add_file.path, r.add_file.raw.value) for r in reqs[:2]] == [
+        ("/a", b"DATA"),
+        ("/b", b""),
+    ]
+
+    # Content that is not bytes-like is rejected when enqueued, or for
+    # generators when sent, rather than converted with bytes().
+    with pytest.raises(TypeError):
+        mfc.append_files_from_bytes([("/c", b"DATA"), ("/d", 5)])
+    with pytest.raises(TypeError):
+        mfc.put_file_from_bytes("/e", "DATA")
+    mfc = python_pachyderm.ModifyFileClient(("repo", "master"))
+    mfc.append_files_from_bytes((path, "DATA") for path in ("/f", "/g"))
+    with pytest.raises(TypeError):
+        list(mfc._reqs())
+
+    # Any object supporting the buffer protocol is sent as its bytes.
+    values = [bytearray(b"DATA"), array.array("i", [1, 2]), memoryview(b"DATA")]
+    mfc = python_pachyderm.ModifyFileClient(("repo", "master"))
+    mfc.put_file_from_bytes("/h", values[1])
+    mfc.append_files_from_bytes([("/i", v) for v in values])
+    mfc.append_files_from_bytes(("/j", v) for v in values)
+    sent = [r.add_file.raw.value for r in mfc._reqs() if r.HasField("add_file")]
+    assert sent == [bytes(values[1])] + [bytes(v) for v in values] * 2
+
+
+def test_put_file_from_filepath_binary():
+    """
+    Put a binary file that is mostly newlines, as well as one that is larger
+    than the maximum message size and contains none.
+    """
+    client, repo_name = sandbox("put_file_from_filepath_binary")
+    newlines = b"\n" * (1024 * 1024)
+    no_newlines = b"#" * (21 * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as d:
+        for name, data in (("newlines.dat", newlines), ("large.dat", no_newlines)):
+            with open(os.path.join(d, name), "wb") as f:
+                f.write(data)
+        with client.commit(repo_name, "master") as c:
+            python_pachyderm.put_files(client, d, c, "/")
+
+    assert client.get_file(c, "/newlines.dat").read() == newlines
+    assert client.get_file(c, "/large.dat").read() == no_newlines
+
+
 def test_put_file_url():
     client, repo_name = sandbox("put_file_url")
 
@@ -608,6 +698,95 @@ def test_inspect_file():
     # assert fi.size_bytes == 4
 
 
+def test_get_file_parallel():
+    client, repo_name = sandbox("get_file_parallel")
+    data = os.urandom(int(MAX_RECEIVE_MESSAGE_SIZE * 2.5))
+
+    with client.commit(repo_name, "master") as c:
+        client.put_file_bytes(c, "file.dat", data)
+
+    with tempfile.TemporaryDirectory() as d:
+        dest = os.path.join(d, "file.dat")
+        fi = client.get_file_parallel(c, "file.dat", dest, parts=3)
+        assert fi.size_bytes == len(data)
+        with open(dest, "rb") as f:
+            assert f.read() == data
+
+
+def test_get_file_parallel_retries(mocker, tmp_path: Path):
+    """
+    Ranges are written at their offsets, and a range whose stream breaks is
+    resumed from where it stopped.
+    """
+    mocker.patch("python_pachyderm.mixin.pfs.BUFFER_SIZE", 100)
+    mocker.patch("python_pachyderm.mixin.pfs.time.sleep")
+    data = os.urandom(1000)
+    broken = set()
+
+    def get_file(commit, path, datum=None, offset=0):
+        def stream():
+            for i in range(offset, len(data), 30):
+                # Break each range once, 60 bytes after its start.
+                if offset % 250 == 0 and i == offset + 60 and offset not in broken:
+                    broken.add(offset)
+                    raise grpc.RpcError()
+                yield wrappers_pb2.BytesValue(value=data[i : i + 30])
+
+        return PFSFile(stream())
+
+    client = Client("localhost", 1, use_default_host=False)
+    mocker.patch.object(
+        client, "inspect_file", return_value=pfs_proto.FileInfo(size_bytes=len(data))
+    )
+    mocker.patch.object(client, "get_file", side_effect=get_file)
+    dest = tmp_path.joinpath("file.dat")
+
+    client.get_file_parallel(("repo", "master"), "/file.dat", dest, parts=4)
+
+    assert dest.read_bytes() == data
+    assert len(broken) == 4
+    assert client.get_file.call_count == 8
+
+
+def test_get_file_parallel_gives_up(mocker, tmp_path: Path):
+    mocker.patch("python_pachyderm.mixin.pfs.time.sleep")
+    client = Client("localhost", 1, use_default_host=False)
+    mocker.patch.object(
+        client, "inspect_file", return_value=pfs_proto.FileInfo(size_bytes=10)
+    )
+    mocker.patch.object(client, "get_file", side_effect=ConnectionError)
+    dest = tmp_path.joinpath("file.dat")
+
+    with pytest.raises(ConnectionError):
+        client.get_file_parallel(("repo", "master"), "/file.dat", dest, retries=2)
+    assert client.get_file.call_count == 3
+    assert not dest.exists()
+
+
+def test_get_file_parallel_pins_commit(mocker, tmp_path: Path):
+    """Ranges are read from the inspected commit, even if the branch moves.
+    Runs against the fake server.
+    """
+    mocker.patch("python_pachyderm.mixin.pfs.BUFFER_SIZE", 100)
+    old, new = os.urandom(1000), os.urandom(1000)
+    with FakePachd() as pachd, pachd.client() as client:
+        pachd.pfs.add_files("foo", "master", [("/file.dat", old)])
+        get_file = client.get_file
+        moved = []
+
+        def get_file_and_move_branch(*args, **kwargs):
+            if not moved:
+                moved.append(True)
+                client.put_file_bytes(("foo", "master"), "/file.dat", new)
+            return get_file(*args, **kwargs)
+
+        mocker.patch.object(client, "get_file", side_effect=get_file_and_move_branch)
+        dest = tmp_path.joinpath("file.dat")
+        client.get_file_parallel(("foo", "master"), "/file.dat", dest, parts=4)
+        assert client.get_file.call_count == 4
+        assert dest.read_bytes() == old
+
+
 def test_list_file():
     client, repo_name = sandbox("list_file")
 
@@ -762,6 +941,151 @@ def test_modify_file_client():
     assert "/file3.txt" in [f.file.path for f in files]
 
 
+def test_modify_file_client_streaming():
+    # Runs against the fake server, throttled so that the buffer fills up.
+    conditions = NetworkConditions(bandwidth=10 * 1024**2)
+    with FakePachd(conditions) as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        c = client.start_commit("foo", "master")
+        budget, peak = 256 * 1024, 0
+        with client.modify_file_client(
+            c, streaming=True, max_buffer_bytes=budget
+        ) as mfc:
+            for i in range(100):
+                mfc.put_file_from_bytes(f"/file{i}", os.urandom(16 * 1024))
+                peak = max(peak, mfc._buffered)
+            # Files are sent before the with block exits.
+            assert client.path_exists(c, "/file0")
+        assert peak <= budget
+        assert len(list(client.list_file(c, "/"))) == 100
+
+        with pytest.raises(KeyError):
+            with client.modify_file_client(c, streaming=True) as mfc:
+                mfc.put_file_from_bytes("/file0", b"DATA")
+                raise KeyError("file")
+        assert mfc._call.cancelled()
+
+        # Errors from the server surface from the call that enqueues next.
+        with pytest.raises(grpc.RpcError) as err:
+            with client.modify_file_client(("bar", "master"), streaming=True) as mfc:
+                while True:
+                    mfc.put_file_from_bytes("/file", b"DATA")
+        assert err.value.code() == grpc.StatusCode.NOT_FOUND
+
+
+def test_inspect_commits():
+    # Runs against the fake server, with latency so that pipelining shows.
+    with FakePachd(NetworkConditions(latency=0.02)) as pachd, pachd.client() as client:
+        commits = [
+            pachd.pfs.add_files(f"repo{i % 4}", "master", [(f"/file{i}", b"x" * i)])
+            for i in range(40)
+        ]
+        start = time.perf_counter()
+        infos = client.inspect_commits(commits, concurrency=20)
+        # Sequential calls would take 40 round trips.
+        assert time.perf_counter() - start < 20 * 0.02
+        assert [i.commit.id for i in infos] == [c.id for c in commits]
+
+        files = [(c, f"/file{i}") for i, c in enumerate(commits)]
+        infos = client.inspect_files(files, concurrency=8)
+        assert [i.size_bytes for i in infos] == list(range(40))
+        infos = client.inspect_repos(["repo3", "repo1"], concurrency=1)
+        assert [i.repo.name for i in infos] == ["repo3", "repo1"]
+
+        with pytest.raises(grpc.RpcError) as err:
+            client.inspect_repos(["repo0", "missing", "repo1"])
+        assert err.value.code() == grpc.StatusCode.NOT_FOUND
+        with pytest.raises(ValueError):
+            client.inspect_repos(["repo0"], concurrency=0)
+
+
+def test_file_sets():
+    # Runs against the fake server.
+    with FakePachd() as pachd, pachd.client() as client:
+        pachd.pfs.shard_files = 2
+        client.create_repo("foo")
+        client.put_file_bytes(("foo", "master"), "/old", b"old")
+
+        file_set_ids = []
+        for worker in range(3):
+            with client.create_file_set(streaming=worker == 1) as fs:
+                fs.put_file_from_bytes(f"/w{worker}/a", b"a")
+                fs.put_file_from_bytes(f"/w{worker}/b", b"b" * worker)
+            file_set_ids.append(fs.file_set_id)
+        with client.create_file_set() as fs:
+            fs.delete_file("/old")
+        file_set_ids.append(fs.file_set_id)
+
+        with client.renew_file_sets(file_set_ids[:1], ttl_seconds=60) as renewer:
+            for file_set_id in file_set_ids[1:]:
+                renewer.add(file_set_id)
+            composed = client.compose_file_set(renewer.file_set_ids)
+        assert not renewer.errors
+        shards = client.shard_file_set(composed)
+        assert [(s.lower, s.upper) for s in shards] == [
+            ("", "/w1/a"),
+            ("/w1/a", "/w2/a"),
+            ("/w2/a", ""),
+        ]
+
+        client.add_file_set(("foo", "master"), composed)
+        files = [
+            (f.file.path, f.size_bytes)
+            for f in client.walk_file(("foo", "master"), "/")
+        ]
+        assert files == [
+            ("/", 6),
+            ("/w0/", 1),
+            ("/w0/a", 1),
+            ("/w0/b", 0),
+            ("/w1/", 2),
+            ("/w1/a", 1),
+            ("/w1/b", 1),
+            ("/w2/", 3),
+            ("/w2/a", 1),
+            ("/w2/b", 2),
+        ]
+        assert len(list(client.list_commit("foo"))) == 2
+
+        copy = client.get_file_set(("foo", "master"))
+        client.create_repo("bar")
+        client.add_file_set(("bar", "master"), copy)
+        assert client.inspect_file(("bar", "master"), "/").size_bytes == 6
+
+        # File sets expire unless renewed.
+        short = client.compose_file_set([composed], ttl_seconds=1)
+        with client.renew_file_sets([short], ttl_seconds=1):
+            time.sleep(1.2)
+            client.shard_file_set(short)
+        with pytest.raises(grpc.RpcError) as err:
+            client.renew_file_set("missing")
+        assert err.value.code() == grpc.StatusCode.NOT_FOUND
+
+
+def test_shard_commit():
+    # Runs against the fake server, which splits every 2 files.
+    with FakePachd() as pachd, pachd.client() as client:
+        pachd.pfs.shard_files = 2
+        paths = [f"/dir{i % 3}/file{i}" for i in range(10)]
+        commit = pachd.pfs.add_files("foo", "master", [(p, b"x") for p in paths])
+
+        for num_shards, expected in [(1, 1), (2, 2), (3, 3), (8, 5)]:
+            shards = pickle.loads(pickle.dumps(client.shard_commit(commit, num_shards)))
+            assert len(shards) == expected
+            assert shards[0].lower == "" and shards[-1].upper == ""
+            found = []
+            for shard in shards:
+                found.extend(
+                    info.file.path
+                    for info in client.glob_file(commit, "/**", path_range=shard)
+                    if info.file_type == pfs_proto.FileType.FILE
+                )
+            assert found == sorted(paths)
+
+        with pytest.raises(ValueError):
+            client.shard_commit(commit, 0)
+
+
 @pytest.fixture(name="repo")
 def _repo_fixture(request) -> str:
     """Create a repository name from the test function name."""
@@ -814,13 +1138,14 @@ class TestPFSFile:
         file = PFSFile(stream)
 
         # Assert
-        assert file._buffer == b"a"
+        assert len(file._buffer) == 1
         assert file.read(0) == b""
-        assert file._buffer == b"a"
+        assert len(file._buffer) == 1
         assert file.read(2) == b"ab"
-        assert file._buffer == b"c"
+        assert len(file._buffer) == 1
         assert file.read(5) == b"cdefg"
-        assert file._buffer == b"hij"
+        assert len(file._buffer) == 3
+        assert file.read() == b"hijklmno"
 
     @staticmethod
     def test_fail_early(client: Client, repo: str):
@@ -895,3 +1220,59 @@ class TestPFSFile:
             local_file = tmp_path.joinpath(test_file.path[1:])
             assert local_file.exists()
             assert local_file.read_bytes() == test_file.data
+
+    @staticmethod
+    def test_readinto():
+        """Test that readinto and readinto1 fill the given buffer in place."""
+        # Arrange
+        stream_items = [b"a", b"bc", b"def", b"ghij", b"klmno"]
+        stream = (wrappers_pb2.BytesValue(value=item) for item in stream_items)
+        file = PFSFile(stream)
+        buffer = bytearray(4)
+
+        # Act & Assert
+        assert file.readinto(buffer) == 4
+        assert buffer == b"abcd"
+        assert file.readinto1(buffer) == 2
+        assert buffer[:2] == b"ef"
+        assert file.readinto1(memoryview(buffer)[1:]) == 3
+        assert buffer == b"eghi"
+        assert file.readinto(buffer) == 4
+        assert buffer == b"jklm"
+        assert file.readinto(buffer) == 2
+        assert buffer[:2] == b"no"
+        assert file.readinto(buffer) == 0
+
+    @staticmethod
+    def test_read1():
+        """Test that read1 returns whole messages without copying them."""
+        # Arrange
+        stream_items = [b"abc", b"defg"]
+        stream = (wrappers_pb2.BytesValue(value=item) for item in stream_items)
+        file = PFSFile(stream)
+
+        # Act & Assert
+        assert file.read1(2) == b"ab"
+        assert file.read1() == b"c"
+        chunk = file.read1()
+        assert chunk == b"defg"
+        assert isinstance(chunk, bytes)
+        assert file.read1() == b""
+        assert file.read() == b""
+
+    @staticmethod
+    def test_copyfileobj(tmp_path: Path):
+        """Test that PFSFile works with the io and shutil helpers."""
+        # Arrange
+        data = os.urandom(100_000)
+        stream_items = [data[i : i + 7_000] for i in range(0, len(data), 7_000)]
+        stream = (wrappers_pb2.BytesValue(value=item) for item in stream_items)
+        dest = tmp_path.joinpath("dest.dat")
+
+        # Act
+        with PFSFile(stream) as file, open(dest, "wb") as f:
+            assert file.readable()
+            shutil.copyfileobj(file, f, 4096)
+
+        # Assert
+        assert dest.read_bytes() == data
@@ -4,11 +4,14 @@
 
 import time
 
+import grpc
 import pytest
 
 import python_pachyderm
 from python_pachyderm.service import pps_proto
 from python_pachyderm.service import pfs_proto
+from python_pachyderm.mixin.pps import _JobChanges
+from python_pachyderm.testing import FakePachd, FakePPS
 from tests import util
 
 
@@ -70,6 +73,74 @@ def test_list_job():
     assert len(jobs) == 4
 
 
+def test_list_paginated(mocker):
+    # Runs against the fake server, which fails a page of datums once.
+    mocker.patch("python_pachyderm.mixin.pps.time.sleep")
+    markers = []
+
+    class FlakyPPS(FakePPS):
+        def ListDatum(self, request, context):
+            markers.append(request.paginationMarker)
+            if (
+                request.paginationMarker
+                and markers.count(request.paginationMarker) == 1
+            ):
+                context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+            yield from super().ListDatum(request, context)
+
+    mocker.patch("python_pachyderm.testing.server.FakePPS", FlakyPPS)
+    with FakePachd() as pachd, pachd.client() as client:
+        job = pachd.pps.add_job("foo", datums=25).job
+        for _ in range(24):
+            pachd.pps.add_job("foo")
+
+        jobs = [j.job.id for j in client.list_job("foo")]
+        assert len(jobs) == 25
+        pages = client.list_job_paginated("foo", page_size=10, prefetch=False)
+        assert [j.job.id for j in pages] == jobs
+        pages = client.list_job_paginated("foo", page_size=5, reverse=True)
+        assert [j.job.id for j in pages] == jobs[::-1]
+
+        datums = [d.datum.id for d in client.list_datum("foo", job.id)]
+        pages = client.list_datum_paginated("foo", job.id, page_size=10)
+        assert [d.datum.id for d in pages] == datums
+        # Failed pages are fetched again from the same marker.
+        assert markers == ["", "", datums[9], datums[9], datums[19], datums[19]]
+
+
+def test_list_job_paginated_shared_created():
+    # Runs against the fake server. Jobs sharing a creation time straddle
+    # page boundaries, and one group is larger than a page.
+    with FakePachd() as pachd, pachd.client() as client:
+        sizes = [3, 12, 1, 1, 6, 2]
+        for created, size in enumerate(sizes):
+            for _ in range(size):
+                info = pachd.pps.add_job("foo")
+                info.created.FromSeconds(1_600_000_000 + created)
+            # A subjob of another pipeline in the same job.
+            info = pachd.pps.add_job("bar", job_id=info.job.id)
+            info.created.FromSeconds(1_600_000_000 + created)
+
+        jobs = [j.job.id for j in client.list_job("foo")]
+        assert len(jobs) == sum(sizes)
+        for page_size in (1, 2, 5, 10):
+            pages = client.list_job_paginated("foo", page_size=page_size)
+            assert [j.job.id for j in pages] == jobs
+            pages = client.list_job_paginated(
+                "foo", page_size=page_size, reverse=True, prefetch=False
+            )
+            assert [j.job.id for j in pages] == jobs[::-1]
+        # Subjobs of different pipelines that share an ID are told apart.
+        pages = [
+            (j.job.pipeline.name, j.job.id)
+            for j in client.list_job_paginated(page_size=4)
+        ]
+        assert len(pages) == len(jobs) + len(sizes)
+        assert set(pages) == {("foo", j) for j in jobs} | {
+            ("bar", j.job.id) for j in client.list_job("bar")
+        }
+
+
 def test_inspect_subjob():
     sandbox = Sandbox("inspect_subjob")
     job_id = sandbox.wait()
@@ -191,6 +262,58 @@ def test_inspect_pipeline():
     assert sandbox.pipeline_repo_name in [p.pipeline.name for p in pipelines]
 
 
+def test_inspect_pipelines():
+    # Runs against the fake server.
+    with FakePachd() as pachd, pachd.client() as client:
+        names = [f"pipe{i}" for i in range(10)]
+        for name in reversed(names):
+            pachd.pps.add_pipeline(name)
+        pipelines = client.inspect_pipelines(names, concurrency=4)
+        assert [p.pipeline.name for p in pipelines] == names
+
+
+def test_subscribe_job():
+    # Runs against the fake server.
+    running, success = pps_proto.JobState.JOB_RUNNING, pps_proto.JobState.JOB_SUCCESS
+    with FakePachd() as pachd, pachd.client() as client:
+        first = pachd.pps.add_job("foo", state=running).job
+        pachd.pps.add_job("bar")
+        jobs = client.subscribe_job("foo")
+        finished = client.subscribe_job("foo", states=[success])
+        info = next(jobs)
+        assert (info.job.id, info.state) == (first.id, running)
+
+        pachd.pps.set_job_state(first, success)
+        info = next(jobs)
+        assert (info.job.id, info.state) == (first.id, success)
+        assert next(finished).job.id == first.id
+
+        # A reconnected stream skips the jobs it already returned.
+        pachd.pps.drop_subscriptions()
+        second = pachd.pps.add_job("foo").job
+        assert next(jobs).job.id == second.id
+        assert next(finished).job.id == second.id
+        jobs.close()
+        finished.close()
+
+
+def test_subscribe_job_forgets_finished():
+    running, success = pps_proto.JobState.JOB_RUNNING, pps_proto.JobState.JOB_SUCCESS
+    changed = _JobChanges(None, max_finished=2)
+    infos = [pps_proto.JobInfo(job=pps_proto.Job(id=str(i))) for i in range(3)]
+    for info in infos:
+        info.state = running
+        assert changed(info)
+        assert not changed(info)
+        info.state = success
+        assert changed(info)
+        assert not changed(info)
+    # Finished subjobs are only remembered by ID, and only the latest ones.
+    assert changed._seen == {}
+    assert list(changed._finished) == ["1", "2"]
+    assert changed(infos[0])
+
+
 def test_list_pipeline():
     sandbox = Sandbox("list_pipeline")
     pipelines = list(sandbox.client.list_pipeline())
@@ -215,6 +338,19 @@ def test_delete_all_pipelines():
     assert len(pipelines) == 0
 
 
+def test_delete_pipelines():
+    # Runs against the fake server.
+    with FakePachd() as pachd, pachd.client() as client:
+        for name in ("a", "b"):
+            pachd.pps.add_job(name, project="foo")
+        pachd.pps.add_pipeline("c", project="bar")
+        deleted = client.delete_pipelines(["foo"])
+        assert sorted(p.name for p in deleted) == ["a", "b"]
+        assert [p.pipeline.name for p in client.list_pipeline()] == ["c"]
+        assert not list(client.list_job("a", project_name="foo"))
+        assert len(client.delete_pipelines(all=True)) == 1
+
+
 def test_restart_pipeline():
     sandbox = Sandbox("restart_job")
 
@@ -364,3 +500,31 @@ def test_create_pipeline_from_request():
     )
 
     assert any(p.pipeline.name == pipeline_name for p in list(client.list_pipeline()))
+
+
+def test_create_pipelines():
+    client = python_pachyderm.Client()
+    client.delete_all()
+
+    repo_name = util.create_test_repo(client, "test_create_pipelines")
+    names = [util.test_repo_name(f"test_create_pipelines_{i}") for i in range(3)]
+
+    def request(name, input_repo):
+        return pps_proto.CreatePipelineRequest(
+            pipeline=pps_proto.Pipeline(name=name),
+            input=pps_proto.Input(pfs=pps_proto.PFSInput(glob="/*", repo=input_repo)),
+            transform=pps_proto.Transform(cmd=["sh"], image="alpine"),
+        )
+
+    # Each pipeline takes the previous one's output, but is listed before it.
+    client.create_pipelines(
+        [
+            request(names[2], names[1]),
+            request(names[1], names[0]),
+            request(names[0], repo_name),
+        ]
+    )
+    assert {p.pipeline.name for p in client.list_pipeline()} == set(names)
+
+    with pytest.raises(ValueError):
+        client.create_pipelines([request("a", "b"), request("b", "a")])
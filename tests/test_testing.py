@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+"""Tests for the in-process fake pachd server. These run without a cluster."""
+
+import time
+
+import grpc
+import pytest
+
+from python_pachyderm.service import pfs_proto, pps_proto
+from python_pachyderm.testing import FakePachd, NetworkConditions
+
+
+@pytest.fixture(scope="module")
+def pachd():
+    with FakePachd() as server:
+        yield server
+
+
+@pytest.fixture
+def client(pachd):
+    pachd.reset()
+    with pachd.client() as client:
+        yield client
+
+
+def test_commits_and_branches(client):
+    client.create_repo("foo")
+    with client.commit("foo", "master") as c1:
+        client.put_file_bytes(c1, "file.dat", b"one")
+    # Writing to a branch without an open commit opens and finishes one.
+    client.put_file_bytes(("foo", "master"), "file.dat", b"two")
+
+    commits = list(client.list_commit("foo"))
+    assert len(commits) == 2
+    assert commits[1].commit.id == c1.id
+    assert commits[0].parent_commit.id == c1.id
+    assert all(c.finished.seconds for c in commits)
+    assert client.get_file(c1, "file.dat").read() == b"one"
+    assert client.get_file(("foo", "master"), "file.dat").read() == b"two"
+    assert client.get_file(("foo", "master^"), "file.dat").read() == b"one"
+
+    client.create_branch("foo", "dev", head_commit=c1)
+    branches = list(client.list_branch("foo"))
+    assert [b.branch.name for b in branches] == ["dev", "master"]
+    assert client.inspect_branch("foo", "dev").head.id == c1.id
+
+    with pytest.raises(grpc.RpcError) as err:
+        client.finish_commit(c1)
+    assert err.value.code() == grpc.StatusCode.FAILED_PRECONDITION
+    with pytest.raises(grpc.RpcError) as err:
+        client.inspect_repo("bar")
+    assert err.value.code() == grpc.StatusCode.NOT_FOUND
+
+
+def test_files(client):
+    client.create_repo("foo")
+    with client.commit("foo", "master") as c:
+        client.put_file_bytes(c, "/file1.dat", b"DATA")
+        client.put_file_bytes(c, "/a/file2.dat", b"DATA")
+        client.put_file_bytes(c, "/a/b/file3.dat", b"DATA")
+        client.put_file_bytes(c, "/a/b/file3.dat", b"MORE", append=True)
+
+    walked = [(f.file.path, f.size_bytes) for f in client.walk_file(c, "/a")]
+    assert walked == [
+        ("/a/", 12),
+        ("/a/b/", 8),
+        ("/a/b/file3.dat", 8),
+        ("/a/file2.dat", 4),
+    ]
+    listed = list(client.list_file(c, "/"))
+    assert [f.file.path for f in listed] == ["/a/", "/file1.dat"]
+    assert listed[0].file_type == pfs_proto.FileType.DIR
+    assert listed[1].file_type == pfs_proto.FileType.FILE
+    globbed = [f.file.path for f in client.glob_file(c, "/**.dat")]
+    assert globbed == ["/a/b/file3.dat", "/a/file2.dat", "/file1.dat"]
+    assert [f.file.path for f in client.glob_file(c, "/*")] == ["/a/", "/file1.dat"]
+
+    assert client.get_file(c, "/a/b/file3.dat").read() == b"DATAMORE"
+    assert client.path_exists(c, "/a/b")
+    assert not client.path_exists(c, "/a/c")
+
+    with client.commit("foo", "master") as c2:
+        client.delete_file(c2, "/a/b")
+        client.copy_file(c, "/a/b/file3.dat", c2, "/copy.dat")
+    paths = [f.file.path for f in client.walk_file(c2, "/")]
+    assert paths == ["/", "/a/", "/a/file2.dat", "/copy.dat", "/file1.dat"]
+    # The parent commit is unchanged.
+    assert client.inspect_file(c, "/a").size_bytes == 12
+
+
+def test_add_files(pachd, client):
+    commit = pachd.pfs.add_files("foo", "master", [("a/1", b"1"), ("a/2", b"22")])
+    assert client.inspect_file(commit, "/a").size_bytes == 3
+    assert list(client.inspect_commit(("foo", "master")))[0].finished.seconds
+
+
+def test_pps_listing(pachd, client):
+    first = pachd.pps.add_job("pipe", datums=3)
+    second = pachd.pps.add_job("pipe", state=pps_proto.JobState.JOB_RUNNING)
+    pachd.pps.add_job("other")
+
+    jobs = list(client.list_job("pipe"))
+    assert [j.job.id for j in jobs] == [second.job.id, first.job.id]
+    assert len(list(client.list_job())) == 3
+
+    datums = list(client.list_datum("pipe", first.job.id))
+    assert len(datums) == 3
+    assert [d.datum.id for d in datums] == sorted(d.datum.id for d in datums)
+    datum = client.inspect_datum("pipe", first.job.id, datums[1].datum.id)
+    assert datum.state == pps_proto.DatumState.SUCCESS
+
+    pachd.pps.set_job_state(second.job, pps_proto.JobState.JOB_SUCCESS)
+    job = next(client.inspect_job(second.job.id, "pipe", wait=True))
+    assert job.state == pps_proto.JobState.JOB_SUCCESS
+
+
+def test_network_conditions():
+    conditions = NetworkConditions(latency=0.05, bandwidth=10 * 1024**2)
+    with FakePachd(conditions) as pachd, pachd.client() as client:
+        start = time.perf_counter()
+        client.get_remote_version()
+        assert time.perf_counter() - start >= 0.05
+
+        client.create_repo("foo")
+        start = time.perf_counter()
+        client.put_file_bytes(("foo", "master"), "file.dat", b"x" * 5 * 1024**2)
+        assert time.perf_counter() - start >= 0.5
@@ -5,9 +5,16 @@
 import os
 import json
 import tempfile
+from contextlib import contextmanager
+from io import BytesIO
+
+import grpc
+import pytest
+from google.protobuf import wrappers_pb2
 
 import python_pachyderm
-from python_pachyderm.service import pps_proto
+from python_pachyderm.service import pfs_proto, pps_proto
+from python_pachyderm.testing import FakePachd
 from tests import util
 
 # script that copies a file using just stdlibs
@@ -122,6 +129,387 @@ def test_put_files_single_file():
     check_expected_files(client, commit, expected)
 
 
+def test_put_files_parallel():
+    client = python_pachyderm.Client()
+    client.delete_all()
+    repo_name = util.create_test_repo(client, "put_files_parallel")
+
+    with tempfile.TemporaryDirectory(suffix="python_pachyderm") as d:
+        expected = set(["/"])
+        for i in range(5):
+            os.makedirs(os.path.join(d, str(i)))
+            expected.add("/{}/".format(i))
+            for j in range(10):
+                with open(os.path.join(d, str(i), "{}.txt".format(j)), "w") as f:
+                    f.write(str(j) * (i + 1))
+                expected.add("/{}/{}.txt".format(i, j))
+
+        with client.commit(repo_name, "master") as commit:
+            result = python_pachyderm.put_files(client, d, commit, "/", parallelism=4)
+
+    assert result.files == 50
+    assert result.bytes == sum(10 * (i + 1) for i in range(5))
+    assert result.errors == {}
+    check_expected_files(client, commit, expected)
+
+
+def test_put_files_parallel_errors(mocker):
+    """Local read errors are reported per file, without failing the upload."""
+    sent = []
+
+    @contextmanager
+    def modify_file_client(commit):
+        mfc = python_pachyderm.ModifyFileClient(commit)
+        yield mfc
+        sent.extend(mfc._reqs())
+
+    open_commit = pfs_proto.CommitInfo(commit=pfs_proto.Commit(id="a" * 32))
+    client = mocker.Mock(
+        modify_file_client=modify_file_client,
+        inspect_commit=lambda commit: iter([open_commit]),
+    )
+
+    with tempfile.TemporaryDirectory(suffix="python_pachyderm") as d:
+        for name in ("a.txt", "b.txt", "c.txt"):
+            with open(os.path.join(d, name), "w") as f:
+                f.write(name)
+        real_open = open
+
+        def flaky_open(file, *args, **kwargs):
+            if file == os.path.join(d, "b.txt"):
+                raise PermissionError(file)
+            return real_open(file, *args, **kwargs)
+
+        mocker.patch("builtins.open", side_effect=flaky_open)
+        result = python_pachyderm.put_files(client, d, ("repo", "master"), "/", 2)
+
+    assert result.files == 2
+    assert result.bytes == len("a.txt") + len("c.txt")
+    assert list(result.errors) == [os.path.join(d, "b.txt")]
+    assert isinstance(result.errors[os.path.join(d, "b.txt")], PermissionError)
+    added = {r.add_file.path for r in sent if r.add_file.raw.value}
+    assert added == {"/a.txt", "/c.txt"}
+
+
+def test_put_files_parallel_branch(tmp_path):
+    """Streams writing to a branch share one commit. Runs against the fake
+    server.
+    """
+    for i in range(8):
+        tmp_path.joinpath(str(i)).write_bytes(b"x" * i)
+    with FakePachd() as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        client.put_file_bytes(("foo", "master"), "/old", b"old")
+        result = python_pachyderm.put_files(
+            client, str(tmp_path), ("foo", "master"), "/", parallelism=4
+        )
+        assert result.files == 8 and not result.errors
+        commits = list(client.list_commit("foo"))
+        assert len(commits) == 2
+        assert commits[0].finished.seconds
+        assert len(list(client.list_file(("foo", "master"), "/"))) == 9
+
+        # An open head is written to, and left open.
+        commit = client.start_commit("foo", "master")
+        python_pachyderm.put_files(
+            client, str(tmp_path), ("foo", "master"), "/new", parallelism=4
+        )
+        assert len(list(client.list_commit("foo"))) == 3
+        assert not next(client.inspect_commit(commit)).finished.seconds
+        client.finish_commit(commit)
+        with pytest.raises(ValueError):
+            python_pachyderm.put_files(
+                client, str(tmp_path), commit, "/", parallelism=4
+            )
+
+
+def test_put_files_manifest(tmp_path):
+    """Only files changed since the last upload are sent. Runs against the
+    fake server.
+    """
+    local = tmp_path.joinpath("data")
+    local.mkdir()
+    for name in ("a", "b", "c"):
+        local.joinpath(name).write_bytes(name.encode() * 10)
+    manifest = str(tmp_path.joinpath("manifest.json"))
+    branch = ("foo", "master")
+
+    def files(commit):
+        return {
+            f.file.path: client.get_file(commit, f.file.path).read()
+            for f in client.walk_file(commit, "/")
+            if f.file_type == pfs_proto.FileType.FILE
+        }
+
+    with FakePachd() as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        result = python_pachyderm.put_files(
+            client, str(local), branch, "/", manifest=manifest
+        )
+        assert (result.files, result.skipped, result.deleted) == (3, 0, 0)
+
+        # Nothing changed, so nothing is sent and no commit is made.
+        result = python_pachyderm.put_files(
+            client, str(local), branch, "/", manifest=manifest
+        )
+        assert (result.files, result.skipped, result.deleted) == (0, 3, 0)
+        assert len(list(client.list_commit("foo"))) == 1
+
+        local.joinpath("a").unlink()
+        local.joinpath("b").write_bytes(b"changed")
+        os.utime(local.joinpath("c"), ns=(0, 0))  # touched, but the same
+        local.joinpath("d").write_bytes(b"new")
+        with client.commit("foo", "master") as commit:
+            result = python_pachyderm.put_files(
+                client, str(local), commit, "/", parallelism=2, manifest=manifest
+            )
+        assert (result.files, result.skipped, result.deleted) == (2, 1, 1)
+        assert result.errors == {}
+        expected = {"/b": b"changed", "/c": b"c" * 10, "/d": b"new"}
+        assert files(commit) == expected
+
+        # A file changed in PFS is uploaded again.
+        client.put_file_bytes(branch, "/c", b"overwritten")
+        result = python_pachyderm.put_files(
+            client, str(local), branch, "/", manifest=manifest
+        )
+        assert (result.files, result.skipped, result.deleted) == (1, 2, 0)
+        assert files(branch) == expected
+
+
+def test_put_files_manifest_commit(tmp_path):
+    """The manifest records the commit the upload wrote, even if the branch
+    moves on before the manifest is saved. Runs against the fake server.
+    """
+    tmp_path.joinpath("a").write_bytes(b"a")
+    manifest = str(tmp_path.joinpath("manifest.json"))
+    with FakePachd() as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        finish_commit = client.finish_commit
+
+        def finish_commit_and_move_branch(commit, *args, **kwargs):
+            finish_commit(commit, *args, **kwargs)
+            client.put_file_bytes(("foo", "master"), "/other", b"other")
+
+        client.finish_commit = finish_commit_and_move_branch
+        python_pachyderm.put_files(
+            client,
+            str(tmp_path.joinpath("a")),
+            ("foo", "master"),
+            "/a",
+            manifest=manifest,
+        )
+        head = next(client.inspect_commit(("foo", "master")))
+        with open(manifest) as f:
+            assert json.load(f)["/a"]["commit"] == head.parent_commit.id
+
+
+def test_sync_dir(tmp_path):
+    """Runs against the fake server."""
+    for name in ("a", "b", "c"):
+        tmp_path.joinpath(name).write_bytes(name.encode() * 10)
+
+    with FakePachd() as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        client.put_file_bytes(("foo", "master"), "/data/a", b"stale")
+        client.put_file_bytes(("foo", "master"), "/data/z", b"removed")
+        client.put_file_bytes(("foo", "master"), "/other", b"kept")
+
+        def files():
+            return {
+                f.file.path: client.get_file(("foo", "master"), f.file.path).read()
+                for f in client.walk_file(("foo", "master"), "/")
+                if f.file_type == pfs_proto.FileType.FILE
+            }
+
+        def sync(**kwargs):
+            result = python_pachyderm.sync_dir(
+                client, str(tmp_path), "foo", "master", "/data", **kwargs
+            )
+            return result.added, result.updated, result.deleted, result.unchanged
+
+        assert sync() == (2, 1, 1, 0)
+        expected = {
+            "/data/a": b"a" * 10,
+            "/data/b": b"b" * 10,
+            "/data/c": b"c" * 10,
+            "/other": b"kept",
+        }
+        assert files() == expected
+        commits = len(list(client.list_commit("foo")))
+
+        # Nothing changed, so no commit is made.
+        assert sync() == (0, 0, 0, 3)
+        assert len(list(client.list_commit("foo"))) == commits
+
+        # Touched files are hashed, in parallel, to find they are unchanged.
+        for name in ("a", "b", "c"):
+            os.utime(tmp_path.joinpath(name), ns=(0, 0))
+        tmp_path.joinpath("b").write_bytes(b"B" * 10)
+        assert sync(workers=2) == (0, 1, 0, 2)
+        expected["/data/b"] = b"B" * 10
+        assert files() == expected
+
+
+def test_sync_dir_existing_files(tmp_path):
+    """Files already in PFS are overwritten, not appended to, even without a
+    manifest or deletes. Runs against the fake server.
+    """
+    tmp_path.joinpath("a").write_bytes(b"new")
+    tmp_path.joinpath("b").write_bytes(b"b")
+    with FakePachd() as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        client.put_file_bytes(("foo", "master"), "/data/a", b"stale")
+        result = python_pachyderm.sync_dir(
+            client, str(tmp_path), "foo", "master", "/data", delete=False
+        )
+        assert (result.added, result.updated) == (1, 1)
+        assert client.get_file(("foo", "master"), "/data/a").read() == b"new"
+        assert client.get_file(("foo", "master"), "/data/b").read() == b"b"
+
+
+def test_sync_dir_open_commit(tmp_path):
+    """Files written to an open head commit are overwritten, although its
+    parent does not have them. Runs against the fake server.
+    """
+    tmp_path.joinpath("a").write_bytes(b"new")
+    with FakePachd() as pachd, pachd.client() as client:
+        client.create_repo("foo")
+        commit = client.start_commit("foo", "master")
+        client.put_file_bytes(commit, "/data/a", b"stale")
+        result = python_pachyderm.sync_dir(
+            client, str(tmp_path), "foo", "master", "/data", delete=False
+        )
+        assert result.updated + result.added == 1
+        assert client.get_file(commit, "/data/a").read() == b"new"
+
+
+def test_get_files():
+    client = python_pachyderm.Client()
+    client.delete_all()
+    repo_name = util.create_test_repo(client, "get_files")
+
+    with client.commit(repo_name, "master") as commit:
+        for i in range(3):
+            for j in range(10):
+                path = "/data/{}/{}.txt".format(i, j)
+                client.put_file_bytes(commit, path, path.encode())
+
+    with tempfile.TemporaryDirectory(suffix="python_pachyderm") as d:
+        result = python_pachyderm.get_files(client, commit, "/data", d, workers=4)
+        assert result.files == 30
+        assert result.errors == {}
+        with open(os.path.join(d, "1", "2.txt"), "rb") as f:
+            assert f.read() == b"/data/1/2.txt"
+
+        result = python_pachyderm.get_files(client, commit, "/data", d, workers=4)
+        assert result.files == 0
+        assert result.skipped == 30
+
+
+def test_get_files_skips_unchanged(mocker):
+    """Files are written atomically, and only downloaded again if either the
+    PFS hash or the local copy changed."""
+    contents = {"/dir/a.txt": b"aaa", "/dir/sub/b.txt": b"bb", "/dir/c.txt": b"c"}
+    hashes = {path: path.encode() for path in contents}
+
+    def walk_file(commit, path):
+        yield pfs_proto.FileInfo(
+            file=pfs_proto.File(path="/dir/"), file_type=pfs_proto.FileType.DIR
+        )
+        for file_path, data in contents.items():
+            yield pfs_proto.FileInfo(
+                file=pfs_proto.File(path=file_path),
+                file_type=pfs_proto.FileType.FILE,
+                size_bytes=len(data),
+                hash=hashes[file_path],
+            )
+
+    def get_file(commit, path):
+        if path == "/dir/c.txt":
+            raise ConnectionError(path)
+        return BytesIO(contents[path])
+
+    client = mocker.Mock(
+        walk_file=walk_file,
+        get_file=mocker.Mock(wraps=get_file),
+        inspect_commit=lambda commit: iter([pfs_proto.CommitInfo()]),
+    )
+
+    with tempfile.TemporaryDirectory(suffix="python_pachyderm") as d:
+        result = python_pachyderm.get_files(client, ("repo", "master"), "/dir", d)
+        assert result.files == 2
+        assert result.bytes == 5
+        assert list(result.errors) == ["/dir/c.txt"]
+        assert sorted(os.listdir(d)) == [".pfs-manifest.json", "a.txt", "sub"]
+        with open(os.path.join(d, "sub", "b.txt"), "rb") as f:
+            assert f.read() == b"bb"
+
+        # Change one file in PFS and another locally.
+        del contents["/dir/c.txt"]
+        hashes["/dir/a.txt"] = b"new"
+        with open(os.path.join(d, "sub", "b.txt"), "wb") as f:
+            f.write(b"xx")
+        client.get_file.reset_mock()
+
+        result = python_pachyderm.get_files(client, ("repo", "master"), "/dir", d)
+        assert result.files == 2
+        assert result.skipped == 0
+        with open(os.path.join(d, "sub", "b.txt"), "rb") as f:
+            assert f.read() == b"bb"
+
+        result = python_pachyderm.get_files(client, ("repo", "master"), "/dir", d)
+        assert result.files == 0
+        assert result.skipped == 2
+
+
+def test_get_files_broken_stream(tmp_path):
+    """A download whose stream breaks is an error, and is not saved. All
+    files are read from the commit the branch pointed to at the start. Runs
+    against the fake server.
+    """
+    with FakePachd() as pachd, pachd.client() as client:
+        files = [("/a", b"a" * 100), ("/b", b"b" * 100)]
+        pachd.pfs.add_files("foo", "master", files)
+        get_file = client.get_file
+
+        def get_file_and_break(commit, path):
+            # Moves the branch, and breaks the stream of /b after 10 bytes.
+            client.put_file_bytes(("foo", "master"), path, b"new")
+            f = get_file(commit, path)
+            if path != "/b":
+                return f
+
+            def broken():
+                yield wrappers_pb2.BytesValue(value=f.read(10))
+                raise grpc.RpcError()
+
+            return python_pachyderm.PFSFile(broken())
+
+        client.get_file = get_file_and_break
+        result = python_pachyderm.get_files(client, ("foo", "master"), "/", tmp_path)
+        assert result.files == 1
+        assert list(result.errors) == ["/b"]
+        assert isinstance(result.errors["/b"], ConnectionError)
+        assert tmp_path.joinpath("a").read_bytes() == b"a" * 100
+        assert sorted(os.listdir(tmp_path)) == [".pfs-manifest.json", "a"]
+
+
+def test_get_files_mode(tmp_path):
+    """Downloaded files and the manifest follow the umask, like files made
+    by open(). Runs against the fake server.
+    """
+    umask = os.umask(0o027)
+    try:
+        with FakePachd() as pachd, pachd.client() as client:
+            pachd.pfs.add_files("foo", "master", [("/a", b"a")])
+            python_pachyderm.get_files(client, ("foo", "master"), "/", tmp_path)
+    finally:
+        os.umask(umask)
+    for name in ("a", ".pfs-manifest.json"):
+        assert tmp_path.joinpath(name).stat().st_mode & 0o777 == 0o640
+
+
 def test_parse_json_pipeline_spec():
     req = python_pachyderm.parse_json_pipeline_spec(TEST_PIPELINE_SPEC)
     check_pipeline_spec(req)